@@ -0,0 +1,241 @@
+#!/usr/bin/env python3
+"""
+On-demand vs capacity (slot) break-even analysis for BigQuery results.
+
+For every query, take the best run (lowest runtime, as everywhere else in
+bench2cost) and price it under:
+
+  - OnDemand: billed bytes, rounded up to the next MiB with the 10 MiB
+    minimum per query (queries that bill 0 bytes, e.g. metadata-only
+    COUNT(*), stay free);
+  - each capacity edition (Standard / Enterprise / Enterprise Plus) twice:
+      * "@100%": slot-seconds consumed x slot price, i.e. a perfectly
+        utilised reservation;
+      * "isolated": autoscaled slots rounded up to 50-slot increments held
+        for max(runtime, 60 s), i.e. the 1-minute minimum when the query
+        runs alone.
+
+The break-even utilisation of an edition is capacity@100% / on-demand: a
+reservation must be busier than that on average to beat on-demand (values
+above 1.0 mean on-demand always wins).
+
+Each query gets two verdicts: "cheapest" compares on-demand with the
+isolated capacity prices (what a lone query is actually billed, minimums
+included) and "cheapest_reserved" compares it with the @100% prices (a
+reservation that is kept busy).
+
+Weighted query mixes are supported via --weights (JSON list or
+{"<query index>": weight} object, 0-based); the mix break-even is the
+weighted capacity cost over the weighted on-demand cost.
+
+Usage:
+    python analyze_pricing.py results_100B/result_enriched.json pricings/serverless.json
+    python analyze_pricing.py results_100B/result_enriched.json pricings/serverless.json \
+        --weights mix.json --json
+    python analyze_pricing.py results_100B/result_enriched.json pricings/serverless.json --write
+
+--write stores the per-query verdicts in the result file under
+"pricing_models", which generate_visualization.py shows in the explorer.
+Only that key is rewritten; enrich.sh carries it over when it regenerates
+the file.
+"""
+
+import argparse
+import json
+import math
+import sys
+from pathlib import Path
+
+# price_matrix.py lives at the repository root
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+from price_matrix import splice_json
+
+MIB = 1024 * 1024
+MIN_BILLED_BYTES = 10 * MIB
+MIN_BILLED_SECONDS = 60
+AUTOSCALE_INCREMENT = 50
+
+
+def best_run_index(runs):
+    """Index of the fastest non-null run, or None if all runs failed."""
+    valid = [(t, i) for i, t in enumerate(runs) if t is not None]
+    return min(valid)[1] if valid else None
+
+
+def billed_on_demand_bytes(bytes_billed):
+    """Apply per-MiB rounding and the 10 MiB per-query minimum."""
+    if not bytes_billed:
+        return 0
+    return max(math.ceil(bytes_billed / MIB) * MIB, MIN_BILLED_BYTES)
+
+
+def isolated_slot_seconds(slot_sec, runtime):
+    """Slot-seconds billed for a query running alone on autoscaled capacity."""
+    if not slot_sec or not runtime:
+        return 0
+    avg_slots = slot_sec / runtime
+    slots = math.ceil(avg_slots / AUTOSCALE_INCREMENT) * AUTOSCALE_INCREMENT
+    return slots * max(runtime, MIN_BILLED_SECONDS)
+
+
+def load_models(pricing, region):
+    """Return (on_demand price per byte, {edition: price per slot-second})."""
+    compute = pricing['regions'][region]['pricing_compute']
+    od = compute['on_demand']['monthly']
+    editions = {}
+    for variant in compute.get('capacity', {}).values():
+        for period in variant.values():
+            for tier in period.get('tiers', []):
+                editions[tier['name']] = tier['price_usd'] / tier['price_unit_seconds']
+    return od['price_usd'] / od['price_unit_bytes'], editions
+
+
+def cheapest(costs, variant):
+    """Cheapest of on-demand and the given capacity variant."""
+    candidates = {m: c for m, c in costs.items() if m == 'OnDemand' or m.endswith(variant)}
+    return min(candidates, key=candidates.get)
+
+
+def analyze_queries(result_data, per_byte, editions):
+    """Per-query cost under every model plus break-even utilisation."""
+    rows = []
+    for q_idx, runs in enumerate(result_data.get('result', [])):
+        best = best_run_index(runs)
+        if best is None:
+            rows.append({'query': q_idx, 'failed': True})
+            continue
+        runtime = runs[best]
+        slot_sec = result_data['billed_slot_sec'][q_idx][best] or 0
+        bytes_billed = result_data['billed_bytes'][q_idx][best] or 0
+
+        on_demand = billed_on_demand_bytes(bytes_billed) * per_byte
+        costs = {'OnDemand': on_demand}
+        break_even = {}
+        for name, per_slot_sec in editions.items():
+            full = slot_sec * per_slot_sec
+            costs[f'{name} @100%'] = full
+            costs[f'{name} isolated'] = isolated_slot_seconds(slot_sec, runtime) * per_slot_sec
+            break_even[name] = full / on_demand if on_demand else None
+
+        rows.append({
+            'query': q_idx,
+            'runtime': runtime,
+            'slot_sec': slot_sec,
+            'billed_bytes': bytes_billed,
+            'costs': costs,
+            'break_even_utilization': break_even,
+            'cheapest': cheapest(costs, 'isolated'),
+            'cheapest_reserved': cheapest(costs, '@100%'),
+        })
+    return rows
+
+
+def analyze_mix(rows, weights, editions):
+    """Weighted totals for a query mix; failed queries are skipped."""
+    totals = {}
+    for row in rows:
+        if row.get('failed'):
+            continue
+        w = weights.get(row['query'], 0)
+        for model, cost in row['costs'].items():
+            totals[model] = totals.get(model, 0) + w * cost
+    on_demand = totals.get('OnDemand', 0)
+    return {
+        'costs': totals,
+        'break_even_utilization': {
+            name: (totals[f'{name} @100%'] / on_demand if on_demand else None)
+            for name in editions
+        },
+        'cheapest': cheapest(totals, 'isolated') if totals else None,
+        'cheapest_reserved': cheapest(totals, '@100%') if totals else None,
+    }
+
+
+def load_weights(path, query_count):
+    if not path:
+        return {i: 1.0 for i in range(query_count)}
+    raw = json.loads(Path(path).read_text())
+    if isinstance(raw, list):
+        return {i: float(w) for i, w in enumerate(raw)}
+    return {int(k): float(v) for k, v in raw.items()}
+
+
+def fmt_ratio(value):
+    return 'n/a' if value is None else f'{value:.2f}'
+
+
+def render_markdown(rows, mix, editions):
+    models = ['OnDemand'] + [f'{n} {kind}' for n in editions for kind in ('@100%', 'isolated')]
+    lines = ['#### Per-query cost by pricing model (best run)', '']
+    lines.append('| Query | ' + ' | '.join(models) + ' | ' +
+                 ' | '.join(f'Break-even {n}' for n in editions) + ' | Cheapest | Cheapest reserved |')
+    lines.append('|---' * (len(models) + len(editions) + 3) + '|')
+    for row in rows:
+        if row.get('failed'):
+            lines.append(f"| Q{row['query']} | " + ' | '.join(['FAIL'] * (len(models) + len(editions) + 2)) + ' |')
+            continue
+        cells = [f"${row['costs'][m]:.6f}" for m in models]
+        cells += [fmt_ratio(row['break_even_utilization'][n]) for n in editions]
+        lines.append(f"| Q{row['query']} | " + ' | '.join(cells) + f" | {row['cheapest']} | {row['cheapest_reserved']} |")
+    lines.append('')
+    lines.append('#### Weighted query mix')
+    lines.append('')
+    lines.append('| Model | Cost |')
+    lines.append('|-------|------|')
+    for model in models:
+        lines.append(f"| {model} | ${mix['costs'].get(model, 0):.6f} |")
+    lines.append('')
+    for name in editions:
+        lines.append(f"- {name} beats on-demand above {fmt_ratio(mix['break_even_utilization'][name])} "
+                     'average slot utilisation')
+    lines.append(f"- Cheapest for this mix: **{mix['cheapest']}** "
+                 f"(with a busy reservation: **{mix['cheapest_reserved']}**)")
+    lines.append('')
+    return '\n'.join(lines)
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='BigQuery on-demand vs capacity break-even analysis'
+    )
+    parser.add_argument('result', help='BigQuery result JSON with billed_bytes and billed_slot_sec')
+    parser.add_argument('pricing', help='Pricing JSON (pricings/serverless.json)')
+    parser.add_argument('--region', default='us-east1', help='Pricing region (default: us-east1)')
+    parser.add_argument('--weights', help='JSON list or {query_index: weight} for the query mix')
+    parser.add_argument('--json', action='store_true', help='Emit JSON instead of markdown')
+    parser.add_argument('--write', action='store_true',
+                        help='Store per-query cheapest models in the result file ("pricing_models")')
+
+    args = parser.parse_args()
+
+    try:
+        result_text = Path(args.result).read_text()
+        result_data = json.loads(result_text)
+        pricing = json.loads(Path(args.pricing).read_text())
+    except Exception as e:
+        print(f'Error loading files: {e}', file=sys.stderr)
+        sys.exit(1)
+
+    per_byte, editions = load_models(pricing, args.region)
+    rows = analyze_queries(result_data, per_byte, editions)
+    mix = analyze_mix(rows, load_weights(args.weights, len(rows)), editions)
+
+    if args.write:
+        updated = dict(result_data)
+        updated['pricing_models'] = {
+            'cheapest': [row.get('cheapest') for row in rows],
+            'cheapest_reserved': [row.get('cheapest_reserved') for row in rows],
+            'break_even_utilization': [row.get('break_even_utilization') for row in rows],
+            'mix': mix,
+        }
+        Path(args.result).write_text(splice_json(result_text, result_data, updated)[0] + '\n')
+        print(f'Pricing models saved to {args.result}', file=sys.stderr)
+
+    if args.json:
+        print(json.dumps({'queries': rows, 'mix': mix}, indent=2))
+    else:
+        print(render_markdown(rows, mix, editions))
+
+
+if __name__ == '__main__':
+    main()
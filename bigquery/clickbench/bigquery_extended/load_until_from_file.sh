@@ -9,14 +9,22 @@ set -euo pipefail
 #
 # Default csv_file: hits.csv
 # Default target_rows: 1000000000
+#
+# Load statistics (wall time, rows/s, bytes/s) are written to $LOAD_STATS
+# (default: load_stats_<table>.json); pass the same LOAD_STATS to
+# run_bq_bench.sh. Batch `bq load` jobs run on the free shared slot pool, so
+# the billed slot-seconds and bytes recorded for them are 0.
 
 TABLE="${1:?Usage: $0 <dataset.table> [csv_file] [target_rows] }"
 CSV="${2:-hits.csv}"
 TARGET="${3:-1000000000}"
+LOAD_STATS="${LOAD_STATS:-load_stats_${TABLE//./_}.json}"
 
 # -------- helpers ---------
 need() { command -v "$1" >/dev/null 2>&1 || { echo "ERROR: '$1' not found in PATH" >&2; exit 1; }; }
-need bq; need jq
+need bq; need jq; need python3
+# Shared load-stats writer (repository root), so every loader writes one schema
+LOAD_STATS_PY="$(cd "$(dirname "$0")/../../.." && pwd)/load_stats.py"
 
 [[ -f "$CSV" ]] || { echo "ERROR: CSV file not found: $CSV" >&2; exit 1; }
 
@@ -29,11 +37,23 @@ row_count() {
     fi
     jq -r '(.numRows // 0) | tonumber' <<<"$json"
 }
+
+table_bytes() {
+    local json
+    if ! json="$(bq show --format=json "$TABLE" 2>/dev/null)"; then
+        echo 0
+        return
+    fi
+    jq -r '(.numBytes // 0) | tonumber' <<<"$json"
+}
 # --------------------------
 
 echo "Checking current row count for $TABLE ..."
 current=$(row_count)
 echo "Rows before loading: $current"
+rows_before=$current
+bytes_before=$(table_bytes)
+load_start=$(date +%s)
 
 iter=0
 while (( current < TARGET )); do
@@ -49,4 +69,9 @@ while (( current < TARGET )); do
     echo "Rows now: $current"
 done
 
-echo "Target reached (>= $TARGET rows). Final row count: $current"
\ No newline at end of file
+echo "Target reached (>= $TARGET rows). Final row count: $current"
+
+load_seconds=$(( $(date +%s) - load_start ))
+python3 "$LOAD_STATS_PY" --output "$LOAD_STATS" --table "$TABLE" \
+    --rows "$(( current - rows_before ))" --bytes "$(( $(table_bytes) - bytes_before ))" \
+    --seconds "$load_seconds" --billed '{"billed_slot_sec": 0, "billed_bytes": 0}'
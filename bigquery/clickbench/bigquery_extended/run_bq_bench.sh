@@ -10,6 +10,8 @@ PROPRIETARY="yes"
 TUNED="no"
 COMMENT=""
 LOAD_TIME_SEC=0
+LOAD_JSON="null"
+LOAD_STATS="${LOAD_STATS:-}"     # load_stats_*.json from load_until_from_file.sh
 DATA_SIZE_BYTES=0
 TAGS='["serverless","column-oriented","gcp","managed"]'
 VERBOSE="${VERBOSE:-0}"          # set VERBOSE=1 to see extra debug
@@ -20,6 +22,11 @@ need bq; need jq; need uuidgen; need awk; need sed
 
 [[ -f "$QUERY_FILE" ]] || { echo "ERROR: Query file not found: $QUERY_FILE" >&2; exit 1; }
 
+if [[ -n "$LOAD_STATS" ]]; then
+  LOAD_JSON="$(jq -c . "$LOAD_STATS")"
+  LOAD_TIME_SEC="$(jq -r '.seconds // 0' <<<"$LOAD_JSON")"
+fi
+
 # Read queries from file, split by semicolon, trim whitespace, ignore empties.
 mapfile -t QUERIES < <(awk '
   BEGIN{RS=";"; ORS=""}
@@ -125,6 +132,7 @@ cat <<JSON
   "comment": "$COMMENT",
   "tags": $TAGS,
   "load_time": $LOAD_TIME_SEC,
+  "load": $LOAD_JSON,
   "data_size": $DATA_SIZE_BYTES,
 
   "result": [
@@ -0,0 +1,216 @@
+#!/usr/bin/env python3
+# -----------------------------------------------------------------------------
+# run_bq_jobs.py — Submit ClickBench jobs, then resolve job statistics in bulk
+#
+# Python replacement for run_bq_bench.sh. Instead of one `bq query` + one
+# `bq show -j` per run, it:
+#   1. submits every (query, run) job through one BigQuery client, either
+#      sequentially (--mode latency, one job in flight) or with bounded
+#      parallelism (--mode throughput --parallelism N);
+#   2. resolves all job statistics in one batched pass over
+#      INFORMATION_SCHEMA.JOBS_BY_PROJECT (polling briefly until every job
+#      shows up), including the slot-usage timeline and shuffle bytes.
+#
+# Output has the same schema as run_bq_bench.sh ("result", "billed_slot_sec",
+# "billed_bytes"), so bigquery/enrich.sh works unchanged, plus per run:
+#   job_ids        – BigQuery job id
+#   shuffle_bytes  – sum of shuffle_output_bytes over all stages
+#   slot_timeline  – [[elapsed_ms, total_slot_ms, active_units], ...]
+#
+# Note: in throughput mode runs compete for slots, so "result" reflects
+# latency under concurrency rather than isolated latency.
+# -----------------------------------------------------------------------------
+
+import sys
+import json
+import time
+import uuid
+import queue
+import argparse
+from collections import deque
+from datetime import date
+from google.cloud import bigquery
+
+
+def log(msg: str):
+    """Progress goes to stderr so stdout stays a clean JSON document."""
+    print(msg, file=sys.stderr)
+
+
+def load_queries(path: str):
+    """Read queries split by semicolons, trimmed, ignoring empties."""
+    with open(path, "r", encoding="utf-8") as f:
+        return [q.strip() for q in f.read().split(";") if q.strip()]
+
+
+def submit_all(client, queries, runs, parallelism):
+    """Submit every (query, run) job keeping at most `parallelism` in flight.
+
+    Returns {(q_idx, run_idx): job_id}; failed jobs map to None.
+    """
+    config = bigquery.QueryJobConfig(use_query_cache=False)
+    todo = deque((q_idx, run_idx) for q_idx in range(len(queries)) for run_idx in range(runs))
+    in_flight = {}
+    finished = queue.Queue()  # keys of jobs whose done callback fired
+    job_ids = {}
+
+    while todo or in_flight:
+        while todo and len(in_flight) < parallelism:
+            key = todo.popleft()
+            job_id = f"job_{uuid.uuid4().hex}"
+            log(f">>> Submitting Q{key[0] + 1} run {key[1] + 1}/{runs} (job: {job_id})")
+            try:
+                job = client.query(queries[key[0]], job_config=config, job_id=job_id)
+                # The callback fires from a polling thread once the job is done, so a
+                # short job frees its slot without waiting for older ones
+                job.add_done_callback(lambda _job, key=key: finished.put(key))
+            except Exception as e:
+                # No callback will ever fire for it, so it must not hold a slot
+                log(f"Query Q{key[0] + 1} run {key[1] + 1} failed to submit: {e}. Recording null metrics.")
+                job_ids[key] = None
+                continue
+            in_flight[key] = job
+
+        if not in_flight:
+            continue
+
+        # Block until any job finishes
+        key = finished.get()
+        job = in_flight.pop(key)
+        try:
+            job.result()
+            job_ids[key] = job.job_id
+        except Exception as e:
+            log(f"Query Q{key[0] + 1} run {key[1] + 1} failed: {e}. Recording null metrics.")
+            job_ids[key] = None
+
+    return job_ids
+
+
+def fetch_job_stats(client, region, job_ids, max_wait, interval):
+    """Resolve statistics for all job ids with one INFORMATION_SCHEMA query per poll."""
+    stats_sql = f"""
+        SELECT
+            job_id,
+            TIMESTAMP_DIFF(end_time, start_time, MILLISECOND) AS runtime_ms,
+            total_slot_ms,
+            total_bytes_billed,
+            (SELECT SUM(s.shuffle_output_bytes) FROM UNNEST(job_stages) s) AS shuffle_bytes,
+            ARRAY(
+                SELECT AS STRUCT t.elapsed_ms, t.total_slot_ms, t.active_units
+                FROM UNNEST(timeline) t ORDER BY t.elapsed_ms
+            ) AS timeline
+        FROM `region-{region}`.INFORMATION_SCHEMA.JOBS_BY_PROJECT
+        WHERE job_id IN UNNEST(@job_ids)
+          AND state = 'DONE'
+    """
+    pending = set(job_ids)
+    found = {}
+    start_ts = time.time()
+
+    while pending and (time.time() - start_ts) < max_wait:
+        config = bigquery.QueryJobConfig(
+            use_query_cache=False,
+            query_parameters=[bigquery.ArrayQueryParameter("job_ids", "STRING", sorted(pending))],
+        )
+        for row in client.query(stats_sql, job_config=config).result():
+            found[row.job_id] = {
+                "runtime_sec": row.runtime_ms / 1000 if row.runtime_ms is not None else None,
+                "billed_slot_sec": row.total_slot_ms / 1000 if row.total_slot_ms is not None else None,
+                "billed_bytes": row.total_bytes_billed,
+                "shuffle_bytes": row.shuffle_bytes,
+                "slot_timeline": [
+                    [t["elapsed_ms"], t["total_slot_ms"], t["active_units"]] for t in row.timeline
+                ],
+            }
+        pending -= set(found)
+        if pending:
+            log(f"  Waiting on statistics for {len(pending)} jobs (sleeping {interval}s)...")
+            time.sleep(interval)
+
+    if pending:
+        log(f"⚠️  No statistics for {len(pending)} jobs after {max_wait}s.")
+    return found
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Run ClickBench on BigQuery and resolve job statistics in one batched pass"
+    )
+    parser.add_argument("--queries", default="queries.sql", help="SQL file (default: queries.sql)")
+    parser.add_argument("--output", help="Output JSON (default: stdout)")
+    parser.add_argument("--runs", type=int, default=3, help="Runs per query (default: 3)")
+    parser.add_argument(
+        "--mode",
+        choices=["latency", "throughput"],
+        default="latency",
+        help="latency: one job at a time; throughput: up to --parallelism jobs in flight",
+    )
+    parser.add_argument("--parallelism", type=int, default=8, help="Jobs in flight in throughput mode (default: 8)")
+    parser.add_argument("--project", help="GCP project (default: from environment)")
+    parser.add_argument("--region", default="us", help="INFORMATION_SCHEMA region qualifier (default: us)")
+    parser.add_argument("--max-wait-sec", type=int, default=300, help="Max wait for job statistics (default: 300)")
+    parser.add_argument("--poll-interval-sec", type=int, default=5, help="Statistics polling interval (default: 5)")
+    parser.add_argument("--data-size", type=int, default=0, help="Dataset bytes for the result file")
+    parser.add_argument("--load-stats", help="load_stats_*.json from load_until_from_file.sh")
+
+    args = parser.parse_args()
+    parallelism = 1 if args.mode == "latency" else max(1, args.parallelism)
+
+    queries = load_queries(args.queries)
+    if not queries:
+        raise SystemExit(f"ERROR: No queries found in {args.queries}")
+    log(f"Loaded {len(queries)} queries, {args.runs} runs each, mode={args.mode} (parallelism {parallelism})")
+
+    load = None
+    if args.load_stats:
+        with open(args.load_stats, "r", encoding="utf-8") as f:
+            load = json.load(f)
+
+    client = bigquery.Client(project=args.project)
+
+    started = time.time()
+    job_ids = submit_all(client, queries, args.runs, parallelism)
+    log(f"\nAll jobs finished in {time.time() - started:.1f}s; resolving statistics...")
+
+    stats = fetch_job_stats(
+        client, args.region, [j for j in job_ids.values() if j], args.max_wait_sec, args.poll_interval_sec
+    )
+
+    def per_run(field):
+        return [
+            [(stats.get(job_ids[(q_idx, r)]) or {}).get(field) for r in range(args.runs)]
+            for q_idx in range(len(queries))
+        ]
+
+    output = {
+        "system": "BigQuery",
+        "date": str(date.today()),
+        "machine": "serverless",
+        "cluster_size": "serverless",
+        "proprietary": "yes",
+        "tuned": "no",
+        "comment": f"{args.mode} mode" + (f", parallelism {parallelism}" if args.mode == "throughput" else ""),
+        "tags": ["serverless", "column-oriented", "gcp", "managed"],
+        "load_time": load["seconds"] if load else 0,
+        "load": load,
+        "data_size": args.data_size,
+        "result": per_run("runtime_sec"),
+        "billed_slot_sec": per_run("billed_slot_sec"),
+        "billed_bytes": per_run("billed_bytes"),
+        "shuffle_bytes": per_run("shuffle_bytes"),
+        "slot_timeline": per_run("slot_timeline"),
+        "job_ids": [[job_ids[(q_idx, r)] for r in range(args.runs)] for q_idx in range(len(queries))],
+    }
+
+    doc = json.dumps(output, indent=2)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(doc)
+        log(f"\n✅ Wrote {args.output}")
+    else:
+        print(doc)
+
+
+if __name__ == "__main__":
+    main()
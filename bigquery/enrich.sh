@@ -100,10 +100,13 @@ jq -n \
     comment: $r.comment,
     tags: $r.tags,
     load_time: $r.load_time,
+    load: $r.load,
     data_size: $r.data_size,
     result: $r.result,
     billed_slot_sec: $r.billed_slot_sec,
     billed_bytes: $r.billed_bytes,
+    metrics: $r.metrics,
+    timing: $r.timing,
     costs:
       (
         # Capacity: one entry per (variant x period x tier)
@@ -122,6 +125,7 @@ jq -n \
                       pricing_variant: $cp.variant,
                       billing_period: $cp.period,
                       compute_costs: map2d($r.billed_slot_sec; ($t.price_usd / $t.price_unit_seconds)),
+                      load_cost: (($r.load.billed.billed_slot_sec // 0) * ($t.price_usd / $t.price_unit_seconds)),
                       pricing_base: {
                         price_usd: $t.price_usd,
                         price_unit: $t.price_unit,
@@ -151,6 +155,7 @@ jq -n \
                 compute_model: "on_demand",
                 billing_period: "monthly",
                 compute_costs: map2d($r.billed_bytes; ($on_demand.price_usd / $on_demand.price_unit_bytes)),
+                load_cost: (($r.load.billed.billed_bytes // 0) * ($on_demand.price_usd / $on_demand.price_unit_bytes)),
                 pricing_base: {
                   price_usd: $on_demand.price_usd,
                   price_unit: $on_demand.price_unit,
@@ -169,4 +174,7 @@ jq -n \
           else [] end )
       )
   }
+  # Keep the verdicts of analyze_pricing.py --write; they depend on the prices,
+  # so rerun it after a price change
+  + (if $r.pricing_models then {pricing_models: $r.pricing_models} else {} end)
 '
\ No newline at end of file
@@ -21,4 +21,8 @@ clickhouse-client --host "$FQDN" --password "$PASSWORD" --secure --time --query
 
 ./run.sh
 
+# Per-run read rows/bytes, memory, ProfileEvents and per-replica breakdown from system.query_log
+# (run.sh tags every run with a query_id):
+# python3 collect_metrics.py results_1B/aws.3.236.parallel_replicas.json
+
 clickhouse-client --host "$FQDN" --password "$PASSWORD" --secure --query "SELECT total_bytes FROM system.tables WHERE name = 'hits' AND database = 'default'"
\ No newline at end of file
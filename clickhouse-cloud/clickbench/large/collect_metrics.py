@@ -0,0 +1,240 @@
+#!/usr/bin/env python3
+# -----------------------------------------------------------------------------
+# collect_metrics.py — Merge ClickHouse system.query_log profiles into results
+#
+# run.sh (and run_benchmark.py clickhouse-cloud) give every run a query_id,
+# listed in the result file's "query_ids". This script looks all of them up in
+# one pass over clusterAllReplicas(<cluster>, system.query_log), so the
+# secondary queries that parallel replicas start on other nodes
+# (initial_query_id = our id) are included, and merges per-run arrays
+# ([query][run], like "result"):
+#   scanned_rows, scanned_bytes  – read_rows / read_bytes of the initial query
+#   memory_usage                 – peak memory of the initial query
+#   cpu_time_sec                 – OSCPUVirtualTimeMicroseconds over all replicas
+#   execution_sec                – query_duration_ms of the initial query (server time,
+#                                  also written to timing.server_sec)
+#   spilled_bytes                – external sort/aggregation/join bytes
+#   scan_cache_ratio             – filesystem cache hits / (hits + S3 reads)
+#   replicas_used                – replicas that took part in the run
+#   profile_events               – selected ProfileEvents summed over replicas
+#   replicas                     – per-replica breakdown:
+#                                  {replica, read_rows, read_bytes, memory_usage, cpu_time_sec}
+#
+# The per-replica breakdown shows whether enable_parallel_replicas=1 spreads
+# the work (similar cpu_time_sec per replica) or just adds idle nodes to the
+# bill; a summary is printed at the end.
+#
+# Usage:
+#   python collect_metrics.py results_1B/aws.3.236.parallel_replicas.json
+# -----------------------------------------------------------------------------
+
+import os
+import json
+import time
+import argparse
+from collections import defaultdict
+import clickhouse_connect
+
+
+PROFILE_EVENTS = [
+    "SelectedParts",
+    "SelectedMarks",
+    "SelectedRows",
+    "OSCPUVirtualTimeMicroseconds",
+    "RealTimeMicroseconds",
+    "ReadBufferFromS3Bytes",
+    "CachedReadBufferReadFromCacheBytes",
+    "CachedReadBufferReadFromSourceBytes",
+    "NetworkSendBytes",
+    "NetworkReceiveBytes",
+    "ExternalSortCompressedBytes",
+    "ExternalAggregationCompressedBytes",
+    "ExternalJoinCompressedBytes",
+]
+
+SPILL_EVENTS = [
+    "ExternalSortCompressedBytes",
+    "ExternalAggregationCompressedBytes",
+    "ExternalJoinCompressedBytes",
+]
+
+
+def escape_literal(s: str) -> str:
+    """Escape single quotes for safe inclusion in an IN (...) list."""
+    return s.replace("\\", "\\\\").replace("'", "\\'")
+
+
+def fetch_query_log(client, cluster, query_ids, since, events, chunk_size, max_wait, interval):
+    """All query_log rows (initial and secondary) per run, polling until every run has an initial row."""
+    event_list = ", ".join(f"ProfileEvents['{e}']" for e in events)
+    pending = set(query_ids)
+    rows_by_id = defaultdict(list)
+    start_ts = time.time()
+
+    while True:
+        batch = sorted(query_ids)
+        rows_by_id.clear()
+        for i in range(0, len(batch), chunk_size):
+            in_list = ",".join(f"'{escape_literal(q)}'" for q in batch[i : i + chunk_size])
+            result = client.query(f"""
+                SELECT initial_query_id, hostName(), is_initial_query,
+                       read_rows, read_bytes, memory_usage, query_duration_ms, [{event_list}]
+                FROM clusterAllReplicas('{cluster}', system.query_log)
+                WHERE event_date >= toDate('{since}')
+                  AND type = 'QueryFinish'
+                  AND initial_query_id IN ({in_list})
+            """)
+            for initial_id, replica, is_initial, read_rows, read_bytes, memory, duration_ms, values in result.result_rows:
+                rows_by_id[initial_id].append({
+                    "replica": replica,
+                    "is_initial": bool(is_initial),
+                    "read_rows": read_rows,
+                    "read_bytes": read_bytes,
+                    "memory_usage": memory,
+                    "duration_ms": duration_ms,
+                    "events": dict(zip(events, values)),
+                })
+        pending = {q for q in query_ids if not any(r["is_initial"] for r in rows_by_id.get(q, []))}
+        if not pending or (time.time() - start_ts) >= max_wait:
+            break
+        print(f"  Waiting on {len(pending)} runs in system.query_log (sleeping {interval}s)...")
+        time.sleep(interval)
+
+    if pending:
+        print(f"⚠️  {len(pending)} runs not found after {max_wait}s; they get null metrics.")
+    return rows_by_id
+
+
+def summarize_run(rows, events):
+    """Per-run totals plus the per-replica breakdown."""
+    initial = next((r for r in rows if r["is_initial"]), None)
+    if initial is None:
+        return {}
+
+    replicas = defaultdict(lambda: {"read_rows": 0, "read_bytes": 0, "memory_usage": 0, "cpu_time_sec": 0.0})
+    totals = {e: 0 for e in events}
+    for r in rows:
+        rep = replicas[r["replica"]]
+        cpu = r["events"].get("OSCPUVirtualTimeMicroseconds", 0) / 1e6
+        # The initiator's read_rows already include rows reported by the replicas,
+        # so only secondary queries count as that replica's own reads
+        if not r["is_initial"] or len(rows) == 1:
+            rep["read_rows"] += r["read_rows"]
+            rep["read_bytes"] += r["read_bytes"]
+        rep["memory_usage"] = max(rep["memory_usage"], r["memory_usage"])
+        rep["cpu_time_sec"] += cpu
+        for e in events:
+            totals[e] += r["events"].get(e, 0)
+
+    from_cache = totals.get("CachedReadBufferReadFromCacheBytes", 0)
+    from_source = totals.get("CachedReadBufferReadFromSourceBytes", 0)
+    return {
+        "scanned_rows": initial["read_rows"],
+        "scanned_bytes": initial["read_bytes"],
+        "memory_usage": initial["memory_usage"],
+        "cpu_time_sec": round(totals.get("OSCPUVirtualTimeMicroseconds", 0) / 1e6, 3),
+        "execution_sec": round(initial["duration_ms"] / 1000.0, 3),
+        "spilled_bytes": sum(totals.get(e, 0) for e in SPILL_EVENTS),
+        "scan_cache_ratio": round(from_cache / (from_cache + from_source), 4) if (from_cache + from_source) else None,
+        "replicas_used": len(replicas),
+        "profile_events": totals,
+        "replicas": [
+            {"replica": name, **{k: (round(v, 3) if isinstance(v, float) else v) for k, v in rep.items()}}
+            for name, rep in sorted(replicas.items())
+        ],
+    }
+
+
+METRICS = [
+    "scanned_rows", "scanned_bytes", "memory_usage", "cpu_time_sec", "execution_sec", "spilled_bytes",
+    "scan_cache_ratio", "replicas_used", "profile_events", "replicas",
+]
+
+# Phases query_duration_ms covers (timing.server_includes, see metrics.py)
+SERVER_INCLUDES = ["compile", "execution"]
+
+
+def print_scaling_summary(bench):
+    """Best-run replica usage and CPU skew: does parallel replicas spread the work?"""
+    cluster_size = bench.get("cluster_size")
+    print(f"\nParallel replicas (cluster_size={cluster_size}):")
+    print(f"{'Query':<6} {'Best':>8} {'Replicas':>9} {'CPU s':>9} {'Max/mean CPU':>13}")
+    for q_idx, runs in enumerate(bench["result"]):
+        valid = [(t, i) for i, t in enumerate(runs) if t is not None]
+        if not valid:
+            continue
+        best_time, best = min(valid)
+        replicas = bench["replicas"][q_idx][best]
+        if not replicas:
+            continue
+        cpus = [r["cpu_time_sec"] for r in replicas]
+        mean = sum(cpus) / len(cpus)
+        skew = f"{max(cpus) / mean:.2f}" if mean else "n/a"
+        print(f"Q{q_idx:<5} {best_time:>8.3f} {len(replicas):>9} {sum(cpus):>9.2f} {skew:>13}")
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Merge ClickHouse system.query_log metrics (all replicas) into a result JSON"
+    )
+    parser.add_argument("input", help="Result JSON with query_ids (from run.sh or run_benchmark.py)")
+    parser.add_argument("--output", help="Where to write the merged result JSON (default: overwrite input)")
+    parser.add_argument("--cluster", default="default", help="Cluster for clusterAllReplicas (default: default)")
+    parser.add_argument(
+        "--profile-events",
+        default=",".join(PROFILE_EVENTS),
+        help="Comma-separated ProfileEvents to capture (default: scan, CPU, cache, network, spill)",
+    )
+    parser.add_argument("--chunk-size", type=int, default=500, help="Query ids per lookup (default: 500)")
+    parser.add_argument("--max-wait-sec", type=int, default=120, help="Max wait for query_log flush (default: 120)")
+    parser.add_argument("--poll-interval-sec", type=int, default=5, help="Polling interval (default: 5)")
+
+    args = parser.parse_args()
+    output_path = args.output or args.input
+    events = [e.strip() for e in args.profile_events.split(",") if e.strip()]
+    for required in ["OSCPUVirtualTimeMicroseconds", "CachedReadBufferReadFromCacheBytes",
+                     "CachedReadBufferReadFromSourceBytes"] + SPILL_EVENTS:
+        if required not in events:
+            events.append(required)
+
+    with open(args.input, "r", encoding="utf-8") as f:
+        bench = json.load(f)
+    query_ids = [q for runs in bench.get("query_ids") or [] for q in runs if q]
+    if not query_ids:
+        raise SystemExit(f"❌ {args.input} has no query_ids; rerun with the current run.sh or run_benchmark.py")
+
+    password = os.environ.get("PASSWORD", "")
+    client = clickhouse_connect.get_client(
+        host=os.environ.get("FQDN", "localhost"),
+        password=password,
+        secure=bool(password),
+    )
+    try:
+        try:
+            client.command(f"SYSTEM FLUSH LOGS ON CLUSTER '{args.cluster}'")
+        except Exception as e:
+            print(f"⚠️  Could not flush logs ({e}); waiting for the periodic flush instead")
+        print(f"Resolving {len(query_ids)} runs across replicas of '{args.cluster}'...")
+        rows_by_id = fetch_query_log(
+            client, args.cluster, query_ids, bench.get("date", "1970-01-01"), events,
+            args.chunk_size, args.max_wait_sec, args.poll_interval_sec,
+        )
+    finally:
+        client.close()
+
+    runs = {q: summarize_run(rows_by_id.get(q, []), events) for q in query_ids}
+    for name in METRICS:
+        bench[name] = [[(runs.get(q) or {}).get(name) for q in ids] for ids in bench["query_ids"]]
+    bench["timing"] = dict(bench.get("timing") or {}, server_sec=bench["execution_sec"],
+                           server_includes=SERVER_INCLUDES)
+
+    with open(output_path, "w", encoding="utf-8") as f:
+        json.dump(bench, f, indent=2)
+        f.write("\n")
+
+    print_scaling_summary(bench)
+    print(f"\n✅ Wrote merged metrics to {output_path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -17,16 +17,23 @@ set -euo pipefail
 # Default target_rows: 1,000,000,000
 #
 # Table is always: default.hits
+#
+# Load statistics (wall time, rows/s, bytes/s, billed service seconds) are
+# written to $LOAD_STATS (default: load_stats_hits.json); pass the same
+# LOAD_STATS to run.sh so the enrichment can price the load.
 # ---------------------------------------------
 
 TARGET="${1:-1000000000}"
 TABLE="default.hits"
+LOAD_STATS="${LOAD_STATS:-load_stats_hits.json}"
 
 : "${FQDN:?ERROR: please export FQDN}"
 : "${PASSWORD:?ERROR: please export PASSWORD}"
 
 need() { command -v "$1" >/dev/null 2>&1 || { echo "ERROR: need '$1' in PATH" >&2; exit 1; }; }
-need clickhouse-client
+need clickhouse-client; need python3
+# Shared load-stats writer (repository root), so every loader writes one schema
+LOAD_STATS_PY="$(cd "$(dirname "$0")/../../.." && pwd)/load_stats.py"
 
 cli() {
   clickhouse-client \
@@ -44,6 +51,11 @@ row_count() {
   cli --query "SELECT toUInt64(count()) FROM $TABLE" --format=TSV | tr -d '[:space:]'
 }
 
+table_bytes() {
+  cli --query "SELECT total_bytes_uncompressed FROM system.tables WHERE database = 'default' AND name = 'hits'" \
+    --format=TSV | tr -d '[:space:]'
+}
+
 # --- Create table if needed ---
 if [[ "$(table_exists)" != "1" ]]; then
   echo "Table $TABLE does not exist — creating from create.sql ..."
@@ -52,7 +64,9 @@ fi
 
 echo "Target rows: $TARGET"
 before="$(row_count)"
+bytes_before="$(table_bytes)"
 echo "Current rows in $TABLE: $before"
+load_start=$(date +%s)
 
 iter=0
 while :; do
@@ -80,4 +94,14 @@ while :; do
 done
 
 final="$(row_count)"
-echo "Final rows in $TABLE: $final"
\ No newline at end of file
+echo "Final rows in $TABLE: $final"
+
+# --- Load statistics: the service is billed for the whole wall time ---
+load_seconds=$(( $(date +%s) - load_start ))
+loaded_rows=$(( final - before ))
+loaded_bytes=$(( $(table_bytes) - bytes_before ))
+python3 "$LOAD_STATS_PY" --output "$LOAD_STATS" --table "$TABLE" \
+  --rows "$loaded_rows" --bytes "$loaded_bytes" --seconds "$load_seconds" \
+  --billed "{\"service_seconds\": $load_seconds}" >/dev/null
+printf 'Loaded %d rows in %ds (%d rows/s). Stats: %s\n' \
+  "$loaded_rows" "$load_seconds" "$(( load_seconds > 0 ? loaded_rows / load_seconds : 0 ))" "$LOAD_STATS"
\ No newline at end of file
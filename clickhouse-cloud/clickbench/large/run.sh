@@ -10,8 +10,21 @@ set -euo pipefail
 #   ./run.sh <system> <machine_desc> <cluster_size> <base_comment> <parallel_replicas_flag>
 # Example:
 #   ./run.sh "ClickHouse Cloud (AWS)" "236GiB" 3 "1B rows" 0
+#
+# Optional env:
+#   LOAD_STATS=load_stats_hits.json  (from load_until_from_url.sh; sets load_time
+#                                     and embeds the load block for enrichment)
+#   RUN_ID=...                       (prefix of every query_id; default: UTC timestamp)
+#
+# Every run gets query_id "<RUN_ID>_qNN_<attempt>" and log_comment "bench2cost:<RUN_ID>",
+# listed in "query_ids"; collect_metrics.py looks them up in system.query_log.
 # ---------------------------------------------------------------------------
 
+if ! command -v jq >/dev/null 2>&1; then
+  echo "ERROR: jq not found in PATH; run.sh builds query_ids and the load block with it. Please install jq." >&2
+  exit 1
+fi
+
 if [[ $# -lt 5 ]]; then
   echo "Usage: $0 <system> <machine_desc> <cluster_size> <base_comment> <parallel_replicas_flag>" >&2
   exit 1
@@ -28,14 +41,21 @@ PROPRIETARY="yes"
 TUNED="no"
 TAGS='["C++","column-oriented","ClickHouse derivative","managed","aws"]'
 LOAD_TIME=0
+LOAD_JSON="null"
 DATA_SIZE=0
 
+if [[ -n "${LOAD_STATS:-}" ]]; then
+  LOAD_JSON="$(jq -c . "$LOAD_STATS")"
+  LOAD_TIME="$(jq -r '.seconds // 0' <<<"$LOAD_JSON")"
+fi
+
 # Client env
 FQDN="${FQDN:=localhost}"
 PASSWORD="${PASSWORD:=}"
 EXTRA_SETTINGS="--enable_parallel_replicas=${PARALLEL_FLAG}"
 
 TRIES=3
+RUN_ID="${RUN_ID:-bench2cost_$(date -u +%Y%m%dT%H%M%S)}"
 
 # --- Parse queries.sql by semicolons (trimmed, non-empty) ---
 mapfile -t QUERIES < <(
@@ -64,9 +84,11 @@ for query in "${QUERIES[@]}"; do
     echo -n "["
     ARRAY_VALUES=()
     for i in $(seq 1 $TRIES); do
+        query_id="$(printf '%s_q%02d_%d' "$RUN_ID" $((QUERY_NUM - 1)) "$i")"
         val=$(
           (clickhouse-client --host "${FQDN:=localhost}" --password "${PASSWORD:=}" ${PASSWORD:+--secure} \
-            --time --format=Null --query="$query" --progress 0 ${EXTRA_SETTINGS} 2>&1 |
+            --time --format=Null --query="$query" --progress 0 ${EXTRA_SETTINGS} \
+            --query_id="$query_id" --log_comment="bench2cost:${RUN_ID}" 2>&1 |
             grep -o -P '^\d+\.\d+$' || echo -n "null") | tr -d '\n'
         )
         ARRAY_VALUES+=("$val")
@@ -82,6 +104,10 @@ done
 # Make valid JSON arrays (drop trailing comma)
 RESULT_CLEAN="$(printf "%s\n" "$RESULT_RAW" | sed '$ s/,\s*$//')"
 
+# query_ids mirror the result layout: [query][attempt]
+QUERY_IDS="$(jq -nc --arg run "$RUN_ID" --argjson n "$TOTAL" --argjson tries "$TRIES" '
+  [range(0; $n) as $q | [range(1; $tries + 1) as $i | "\($run)_q\($q | tostring | if length < 2 then "0" + . else . end)_\($i)"]]')"
+
 DATE_ISO="$(date -u +%F)"
 
 cat <<JSON
@@ -97,10 +123,13 @@ cat <<JSON
     "tags": $TAGS,
 
     "load_time": $LOAD_TIME,
+    "load": $LOAD_JSON,
     "data_size": $DATA_SIZE,
 
     "result": [
 $RESULT_CLEAN
-    ]
+    ],
+
+    "query_ids": $QUERY_IDS
 }
 JSON
\ No newline at end of file
@@ -25,6 +25,7 @@ for pricing_file in "$PRICING_DIR"/*.json; do
 
     echo "Processing pricing file: $pricing_file"
     filename=$(basename "$pricing_file")
+    [ "$filename" = "billing_rules.json" ] && continue
 
     # Construct result file URL
     result_path="${FOLDER_NAME}/results/$filename"
@@ -89,6 +90,11 @@ for pricing_file in "$PRICING_DIR"/*.json; do
             ]
         ] as $compute_costs |
 
+        # Ingestion is billed like queries: service time at the same rate
+        ((.load_time // 0) * (($compute_cost | tonumber) / 3600) *
+            (($memory_size | tonumber) / ($compute_price_unit | tonumber)) *
+            ($cluster_size | tonumber)) as $load_cost |
+
         # Calculate storage cost using bound $bytes
         ((($storage_cost | tonumber) * ($bytes / ($storage_price_unit | tonumber)))) as $storage_cost_value |
 
@@ -104,6 +110,7 @@ for pricing_file in "$PRICING_DIR"/*.json; do
             provider: $provider,
             region: $region,
             compute_costs: $compute_costs,
+            load_cost: $load_cost,
             storage_cost: $storage_cost_value,
             storage_costs: [
               {
@@ -149,6 +156,7 @@ for pricing_file in "$PRICING_DIR"/*.json; do
         fi
     done
 
+    python3 "$(dirname "$0")/../cost_engine.py" --write "$output_file" > /dev/null
     echo "  Saved enriched results to: $output_file"
 done
 
@@ -44,6 +44,7 @@ for in in "${files[@]}"; do
         else ((.machine|tostring) | gsub("[^0-9\\.]";"") | if length>0 then tonumber else 0 end)
       end ) as $mem_gib
     | (.result // []) as $res
+    | (.load_time // 0 | tosec) as $load_sec
     | . + {
         costs: (
           $tiers | map(
@@ -55,17 +56,20 @@ for in in "${files[@]}"; do
                 ]
               ) as $compute_costs
             | ($bytes * $price_per_byte) as $storage_cost_value
+            | ($load_sec * ($tier.compute / 3600.0) * ($mem_gib / $tier.compute_price_unit) * $cluster) as $load_cost
             | {
                 tier: $tier.name,
                 provider: $provider,
                 region: $region,
                 compute_costs: $compute_costs,
+                load_cost: $load_cost,
                 storage_cost: $storage_cost_value
               }
           )
         )
       }
   ' "$in" > "$out"
+  python3 "$(dirname "$0")/../cost_engine.py" --write "$out" > /dev/null
 
   echo "    saved → $out"
 done
@@ -4,6 +4,21 @@
 CSV_FILE="$(dirname "$0")/pricing_metadata.csv"
 OUTPUT_DIR="$(dirname "$0")/pricings"
 
+# Prices in effect on this date (default: today); rows carry an effective_date
+# in their last column and a later row for the same tier supersedes an earlier one
+AS_OF="${AS_OF:-$(date +%Y-%m-%d)}"
+
+# jq: rows in effect on $as_of, one per tier, tiers in order of first appearance;
+# a tier whose first row is dated after $as_of gets that earliest row
+IN_EFFECT='
+def in_effect($as_of):
+    . as $rows
+    | reduce .[] as $r ([]; if index([$r[2]]) then . else . + [$r[2]] end)
+    | map(. as $tier
+        | [$rows[] | select(.[2] == $tier)] | sort_by(.[7] // "")
+        | (map(select((.[7] // "") <= $as_of)) | last) // first);
+'
+
 # Create output directory if it doesn't exist
 mkdir -p "$OUTPUT_DIR"
 
@@ -13,12 +28,14 @@ get_pricing_data() {
     local region=$2
     
     # Use jq to format the JSON array properly
-    jq -n --arg provider "$provider" --arg region "$region" --rawfile csv "$CSV_FILE" '
+    jq -n --arg provider "$provider" --arg region "$region" --arg as_of "$AS_OF" --rawfile csv "$CSV_FILE" "$IN_EFFECT"'
     reduce (
-        $csv | split("\n")[] |
-        select(. != "" and startswith("provider") | not) |
-        split(",") |
-        select(.[0] == $provider and .[1] == $region)
+        [
+            $csv | split("\n")[] |
+            select(. != "" and startswith("provider") | not) |
+            split(",") |
+            select(.[0] == $provider and .[1] == $region)
+        ] | in_effect($as_of)[]
     ) as $row (
         [];
         . + [{
@@ -45,12 +62,14 @@ generate_pricing_json() {
     output_file="${OUTPUT_DIR}/${provider}.${replicas}.${memory}.json"
     
     # Get pricing data as a JSON array
-    tiers_json=$(jq -n --arg provider "$provider" --arg region "$region" --rawfile csv "$CSV_FILE" '
+    tiers_json=$(jq -n --arg provider "$provider" --arg region "$region" --arg as_of "$AS_OF" --rawfile csv "$CSV_FILE" "$IN_EFFECT"'
     [
-        $csv | split("\n")[] |
-        select(. != "" and startswith("provider") | not) |
-        split(",") |
-        select(.[0] == $provider and .[1] == $region) |
+        [
+            $csv | split("\n")[] |
+            select(. != "" and startswith("provider") | not) |
+            split(",") |
+            select(.[0] == $provider and .[1] == $region)
+        ] | in_effect($as_of)[] |
         {
             name: .[2],
             compute: (.[3] | tonumber),
@@ -61,7 +80,7 @@ generate_pricing_json() {
     ]' 2>/dev/null)
     
     # Generate JSON with proper formatting
-    jq -n --arg date "$(date +%Y-%m-%d)" --arg region "$region" \
+    jq -n --arg date "$AS_OF" --arg region "$region" \
        --arg provider "$provider" --argjson memory $memory \
        --argjson replicas $replicas --argjson tiers "$tiers_json" '
     {
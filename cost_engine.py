@@ -0,0 +1,256 @@
+#!/usr/bin/env python3
+"""
+Billing-granularity and minimum-charge cost engine.
+
+The enrich scripts price every run as runtime x rate. Invoices do not: most
+vendors bill a minimum per resume, round to a billing increment and keep
+charging through an idle window before suspending. On sub-second queries the
+difference is 10-100x. The rules live next to the pricing files, one per
+vendor (<vendor>/pricings/billing_rules.json):
+
+    {
+      "billing": "cluster" | "per_query",   how simulate_workload.py bills the vendor
+      "concurrency": 8,                     default queries per cluster
+      "rules": {                            looked up by tier, compute_model, then "default"
+        "default": {
+          "unit": "seconds",
+          "min_seconds": 60,                minimum billed per resume
+          "increment_seconds": 1,           billing increment
+          "idle_seconds": 600,              billed idle time before auto-suspend
+          "capacity_metric": "...",         optional: per-run capacity-seconds (e.g. billed_slot_sec),
+          "capacity_increment": 50          rounded up to multiples of capacity_increment
+        },
+        "on_demand": {
+          "unit": "bytes",
+          "metric": "billed_bytes",         per-run bytes field
+          "min_bytes": 10485760,            minimum per query (0 bytes stays free)
+          "increment_bytes": 1048576
+        }
+      }
+    }
+
+Every tier of a result gets two extra tiers:
+
+  - "<tier> (isolated)": each query runs alone, i.e. resume, run, bill the
+    idle window, suspend. Every run pays the minimum charge and idle tail.
+  - "<tier> (session)": the queries of each run index run back to back in one
+    session. The session pays one minimum and one idle tail, split across
+    its queries in proportion to their own cost.
+
+Per-second rates come from the measured costs (rate = compute cost / runtime),
+so the variants work for every vendor and pricing file. Byte-billed tiers are
+charged per query, so both variants are the same.
+
+Usage:
+    python cost_engine.py snowflake/results/xs_enriched.json                # print totals per tier
+    python cost_engine.py --write clickhouse-cloud/results_1B/*.json        # add the variant tiers
+"""
+
+import argparse
+import json
+import math
+from pathlib import Path
+from typing import Dict, List, Any, Optional
+
+ROOT = Path(__file__).resolve().parent
+
+# System-name prefix -> vendor directory holding pricings/billing_rules.json
+VENDOR_DIRS = {
+    'Snowflake': 'snowflake',
+    'BigQuery': 'bigquery',
+    'ClickHouse': 'clickhouse-cloud',
+    'Firebolt': 'firebolt',
+    'Redshift': 'redshift-serverless',
+    'Databricks': 'databricks',
+}
+
+VARIANTS = ['isolated', 'session']
+
+
+def vendor_dir(system: str) -> str:
+    """Vendor directory for a result's system name (e.g. 'ClickHouse Cloud (AWS)')."""
+    for prefix, directory in VENDOR_DIRS.items():
+        if system.lower().startswith(prefix.lower()):
+            return directory
+    raise ValueError(f'No billing rules for system {system!r}')
+
+
+def load_rules(system: str) -> Dict[str, Any]:
+    """Parsed billing_rules.json of the vendor that produced `system`."""
+    path = ROOT / vendor_dir(system) / 'pricings' / 'billing_rules.json'
+    return json.loads(path.read_text())
+
+
+def rule_for(rules: Dict[str, Any], tier: Dict[str, Any]) -> Dict[str, Any]:
+    """Rule of a cost tier: by tier name, then compute_model, then "default"."""
+    by_name = rules['rules']
+    for key in (tier.get('tier'), tier.get('compute_model'), 'default'):
+        if key in by_name:
+            return by_name[key]
+    raise ValueError(f'No billing rule for tier {tier.get("tier")!r}')
+
+
+def round_up(value: float, increment: float) -> float:
+    # Round before ceil so 60.000000001 s does not bill a second increment
+    return math.ceil(round(value / increment, 9)) * increment if increment else value
+
+
+def billed_seconds(active: float, rule: Dict[str, Any]) -> float:
+    """Billed seconds for one resume..suspend period of `active` seconds."""
+    return max(rule.get('min_seconds', 0), round_up(active, rule.get('increment_seconds', 1)))
+
+
+def billed_bytes(scanned: float, rule: Dict[str, Any]) -> float:
+    """Billed bytes for one query; queries that bill nothing stay free."""
+    if not scanned:
+        return 0
+    return max(rule.get('min_bytes', 0), round_up(scanned, rule.get('increment_bytes', 1)))
+
+
+def run_rate(result_data: Dict[str, Any], rule: Dict[str, Any], cost, runtime, q_idx, r_idx) -> Optional[float]:
+    """Billed cost per second of one run, with capacity rounded up to the billing increment."""
+    if cost is None or not runtime:
+        return None
+    metric = rule.get('capacity_metric')
+    if metric:
+        used = (result_data.get(metric) or [[]])[q_idx]
+        used = used[r_idx] if used and r_idx < len(used) else None
+        if used:
+            units = round_up(used / runtime, rule.get('capacity_increment', 1))
+            return units * cost / used
+    return cost / runtime
+
+
+def isolated_costs(result_data: Dict[str, Any], tier: Dict[str, Any], rule: Dict[str, Any]) -> List[List[Any]]:
+    """Every run billed on its own: minimum charge, rounding and idle tail included."""
+    runtimes = result_data['result']
+    costs = []
+    for q_idx, runs in enumerate(tier['compute_costs']):
+        row = []
+        for r_idx, cost in enumerate(runs or []):
+            runtime = runtimes[q_idx][r_idx] if r_idx < len(runtimes[q_idx]) else None
+            if cost is None or runtime is None:
+                row.append(cost)
+            elif rule.get('unit') == 'bytes':
+                scanned = result_data[rule['metric']][q_idx][r_idx]
+                row.append(cost * billed_bytes(scanned, rule) / scanned if scanned else cost)
+            else:
+                rate = run_rate(result_data, rule, cost, runtime, q_idx, r_idx)
+                row.append(cost if rate is None else
+                           rate * billed_seconds(runtime + rule.get('idle_seconds', 0), rule))
+        costs.append(row)
+    return costs
+
+
+def session_costs(result_data: Dict[str, Any], tier: Dict[str, Any], rule: Dict[str, Any]) -> List[List[Any]]:
+    """Queries of each run index billed as one back-to-back session."""
+    if rule.get('unit') == 'bytes':
+        return isolated_costs(result_data, tier, rule)
+
+    runtimes = result_data['result']
+    compute_costs = tier['compute_costs']
+    # Runs without a runtime keep their measured cost
+    costs = [list(runs or []) for runs in compute_costs]
+    run_count = max((len(runs or []) for runs in compute_costs), default=0)
+
+    for r_idx in range(run_count):
+        # (q_idx, runtime, cost at the billed rate, rate) of every query in this session
+        members = []
+        for q_idx, runs in enumerate(compute_costs):
+            if not runs or r_idx >= len(runs) or runs[r_idx] is None:
+                continue
+            runtime = runtimes[q_idx][r_idx] if r_idx < len(runtimes[q_idx]) else None
+            if runtime is None:
+                continue
+            rate = run_rate(result_data, rule, runs[r_idx], runtime, q_idx, r_idx)
+            members.append((q_idx, runtime, runs[r_idx] if rate is None else rate * runtime, rate))
+        if not members:
+            continue
+
+        active = sum(m[1] for m in members)
+        tail = billed_seconds(active + rule.get('idle_seconds', 0), rule) - active
+        # The minimum / idle tail runs at the capacity of the last query
+        last_rate = next((m[3] for m in reversed(members) if m[3] is not None), 0)
+        tail_cost = tail * last_rate
+        total = sum(m[2] for m in members)
+        for q_idx, _, cost, _ in members:
+            share = cost / total if total else 1 / len(members)
+            costs[q_idx][r_idx] = cost + tail_cost * share
+    return costs
+
+
+def apply_rules(result_data: Dict[str, Any], rules: Dict[str, Any], variants: List[str] = VARIANTS) -> List[str]:
+    """Replace the variant tiers of a result with freshly computed ones; returns their names."""
+    base_tiers = [t for t in result_data.get('costs', []) if 'billing_variant' not in t]
+    added = []
+    new_tiers = list(base_tiers)
+    for tier in base_tiers:
+        rule = rule_for(rules, tier)
+        for variant in variants:
+            compute = isolated_costs if variant == 'isolated' else session_costs
+            name = f"{tier['tier']} ({variant})"
+            new_tiers.append(dict(
+                tier,
+                tier=name,
+                compute_costs=compute(result_data, tier, rule),
+                base_tier=tier['tier'],
+                billing_variant=variant,
+                billing_rule=rule,
+            ))
+            added.append(name)
+    result_data['costs'] = new_tiers
+    return added
+
+
+def best_run_total(compute_costs: List[List[Any]], runtimes: List[List[Any]]) -> float:
+    """Cost of the fastest run of every query, summed."""
+    total = 0.0
+    for costs, times in zip(compute_costs, runtimes):
+        valid = [(t, i) for i, t in enumerate(times or []) if t is not None and i < len(costs)]
+        if valid and costs[min(valid)[1]] is not None:
+            total += costs[min(valid)[1]]
+    return total
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='Apply per-vendor billing rules (minimum charge, increments, idle tail) to enriched results'
+    )
+    parser.add_argument('files', nargs='+', help='Enriched result JSON files')
+    parser.add_argument('--variants', default=','.join(VARIANTS),
+                        help='Comma-separated variants to emit (default: isolated,session)')
+    parser.add_argument('--write', action='store_true', help='Store the variant tiers in each file')
+
+    args = parser.parse_args()
+    variants = [v.strip() for v in args.variants.split(',') if v.strip()]
+    unknown = set(variants) - set(VARIANTS)
+    if unknown:
+        parser.error(f'unknown variants: {", ".join(sorted(unknown))}')
+
+    for path in args.files:
+        result_data = json.loads(Path(path).read_text())
+        if not result_data.get('costs'):
+            print(f'{path}: no costs, skipping')
+            continue
+        apply_rules(result_data, load_rules(result_data.get('system', '')), variants)
+        if args.write:
+            Path(path).write_text(json.dumps(result_data, indent=2) + '\n')
+
+        print(f'{path}:')
+        totals = {t['tier']: best_run_total(t['compute_costs'], result_data['result'])
+                  for t in result_data['costs']}
+        for tier in result_data['costs']:
+            if 'billing_variant' in tier:
+                continue
+            name = tier['tier']
+            measured = totals[name]
+            parts = []
+            for v in variants:
+                billed = totals[f'{name} ({v})']
+                ratio = f' ({billed / measured:.1f}x)' if measured else ''
+                parts.append(f'{v} ${billed:.4f}{ratio}')
+            print(f'  {name}: measured ${measured:.4f}, {", ".join(parts)}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,80 @@
+#!/usr/bin/env python3
+# -----------------------------------------------------------------------------
+# collect_load_stats.py — Record ingestion statistics for load_data.sql
+#
+# load_data.sql builds the table with one CREATE OR REPLACE TABLE ... AS
+# SELECT. Delta records that write in the table history, so instead of timing
+# it client-side this reads the latest write from DESCRIBE HISTORY:
+#   executionTimeMs -> seconds
+#   numOutputRows   -> rows
+#   numOutputBytes  -> bytes
+#
+# Output (load_stats_<table>.json) has the same shape as the other vendors'
+# load scripts; pass it to summarize_results.py --load-stats so enrich.sh can
+# price the load on the warehouse that ran it.
+# -----------------------------------------------------------------------------
+
+import os
+import sys
+import argparse
+from pathlib import Path
+from databricks import sql
+
+# load_stats.py lives at the repository root
+sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
+from load_stats import load_stats, write_load_stats
+
+HOST = os.environ["DATABRICKS_SERVER_HOSTNAME"]
+HTTP_PATH = os.environ["DATABRICKS_HTTP_PATH"]
+TOKEN = os.environ["DATABRICKS_TOKEN"]
+
+WRITE_OPERATIONS = ("CREATE TABLE AS SELECT", "REPLACE TABLE AS SELECT", "CREATE OR REPLACE TABLE AS SELECT", "WRITE")
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Collect Delta load statistics for a benchmark table"
+    )
+    parser.add_argument(
+        "--table",
+        default="bench2cost.hits.100m_clustered",
+        help="Fully qualified table (default: bench2cost.hits.100m_clustered)",
+    )
+    parser.add_argument(
+        "--machine",
+        required=True,
+        help='Warehouse size that ran the load (e.g. "2X-Small")',
+    )
+    parser.add_argument(
+        "--output",
+        help="Output file (default: load_stats_<table>.json)",
+    )
+
+    args = parser.parse_args()
+    output_path = args.output or f"load_stats_{args.table.split('.')[-1]}.json"
+
+    with sql.connect(server_hostname=HOST, http_path=HTTP_PATH, access_token=TOKEN) as conn:
+        with conn.cursor() as cur:
+            cur.execute(f"DESCRIBE HISTORY {args.table}")
+            history = [row.asDict() for row in cur.fetchall()]
+
+    writes = [h for h in history if h.get("operation") in WRITE_OPERATIONS]
+    if not writes:
+        raise SystemExit(f"❌ No write operation found in the history of {args.table}")
+
+    latest = max(writes, key=lambda h: h["version"])
+    metrics = latest.get("operationMetrics") or {}
+    seconds = int(metrics.get("executionTimeMs", 0)) / 1000.0
+    rows = int(metrics.get("numOutputRows", 0))
+    num_bytes = int(metrics.get("numOutputBytes", 0))
+
+    # Serverless SQL warehouses bill DBUs for wall time at their size
+    billed = {"warehouse": args.machine, "warehouse_seconds": round(seconds, 3)}
+    write_load_stats(output_path, load_stats(args.table, rows, num_bytes, round(seconds, 3), billed))
+
+    print(f"Version {latest['version']} ({latest['operation']}): {rows} rows in {seconds:.1f}s")
+    print(f"\n✅ Wrote load statistics to {output_path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,10 +1,16 @@
 #!/usr/bin/env python3
 import os
+import sys
 import time
 import json
 import argparse
+from pathlib import Path
 from databricks import sql
 
+# tracing.py lives at the repository root
+sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
+from tracing import add_profile_argument, span, start_profile
+
 HOST = os.environ["DATABRICKS_SERVER_HOSTNAME"]
 HTTP_PATH = os.environ["DATABRICKS_HTTP_PATH"]
 TOKEN = os.environ["DATABRICKS_TOKEN"]
@@ -44,8 +50,10 @@ def main():
         default=10,
         help="Polling interval in seconds (default: 10)",
     )
+    add_profile_argument(parser)
 
     args = parser.parse_args()
+    start_profile(args)
     machine = args.machine
 
     input_path = args.input or f"runs_{machine}.json"
@@ -59,8 +67,9 @@ def main():
     print(f"Max wait (sec)    : {max_wait}")
     print(f"Poll interval (s) : {interval}")
 
-    with open(input_path, "r", encoding="utf-8") as f:
-        items = json.load(f)
+    with span("load", file=input_path):
+        with open(input_path, "r", encoding="utf-8") as f:
+            items = json.load(f)
 
     print(f"Loaded {len(items)} run records from {input_path}")
 
@@ -76,11 +85,13 @@ def main():
     start_ts = time.time()
     attempts = 0
 
-    with sql.connect(
-        server_hostname=HOST,
-        http_path=HTTP_PATH,
-        access_token=TOKEN,
-    ) as conn:
+    with span("connect"):
+        conn = sql.connect(
+            server_hostname=HOST,
+            http_path=HTTP_PATH,
+            access_token=TOKEN,
+        )
+    with conn:
         while pending_ids and (time.time() - start_ts) < max_wait:
             attempts += 1
             print(
@@ -104,6 +115,12 @@ def main():
                     statement_id,
                     total_duration_ms,
                     waiting_for_compute_duration_ms,
+                    waiting_at_capacity_duration_ms,
+                    compilation_duration_ms,
+                    total_task_duration_ms,
+                    read_bytes,
+                    read_rows,
+                    read_io_cache_percent,
                     from_result_cache,
                     read_partitions,
                     pruned_files,
@@ -115,15 +132,25 @@ def main():
                 WHERE statement_id IN ({in_list})
                 """
 
-                with conn.cursor() as cur:
-                    cur.execute(metrics_sql)
-                    rows = cur.fetchall()
+                with span("poll", attempt=attempts, statements=len(chunk)) as poll:
+                    with conn.cursor() as cur:
+                        with span("query.execute"):
+                            cur.execute(metrics_sql)
+                        with span("fetch"):
+                            rows = cur.fetchall()
+                    poll.set(rows=len(rows))
 
                 for row in rows:
                     (
                         stmt_id,
                         total_ms,
                         wait_ms,
+                        capacity_wait_ms,
+                        compile_ms,
+                        task_ms,
+                        read_bytes,
+                        read_rows,
+                        io_cache_pct,
                         from_cache,
                         read_partitions,
                         pruned_files,
@@ -138,6 +165,12 @@ def main():
                         {
                             "total_duration_ms": total_ms,
                             "waiting_for_compute_duration_ms": wait_ms,
+                            "waiting_at_capacity_duration_ms": capacity_wait_ms,
+                            "compilation_duration_ms": compile_ms,
+                            "total_task_duration_ms": task_ms,
+                            "read_bytes": read_bytes,
+                            "read_rows": read_rows,
+                            "read_io_cache_percent": io_cache_pct,
                             "from_result_cache": from_cache,
                             "read_partitions": read_partitions,
                             "pruned_files": pruned_files,
@@ -163,7 +196,8 @@ def main():
                     f"  Still waiting on {len(pending_ids)} ids "
                     f"(elapsed {elapsed}s, sleeping {interval}s)..."
                 )
-                time.sleep(interval)
+                with span("sleep"):
+                    time.sleep(interval)
 
         # after polling loop
         if pending_ids:
@@ -202,6 +236,12 @@ def main():
                 "machine": item["machine"],
                 "total_duration_ms": None,
                 "waiting_for_compute_duration_ms": None,
+                "waiting_at_capacity_duration_ms": None,
+                "compilation_duration_ms": None,
+                "total_task_duration_ms": None,
+                "read_bytes": None,
+                "read_rows": None,
+                "read_io_cache_percent": None,
                 "from_result_cache": None,
                 "read_partitions": None,
                 "pruned_files": None,
@@ -229,6 +269,14 @@ def main():
             "waiting_for_compute_duration_ms": m[
                 "waiting_for_compute_duration_ms"
             ],
+            "waiting_at_capacity_duration_ms": m[
+                "waiting_at_capacity_duration_ms"
+            ],
+            "compilation_duration_ms": m["compilation_duration_ms"],
+            "total_task_duration_ms": m["total_task_duration_ms"],
+            "read_bytes": m["read_bytes"],
+            "read_rows": m["read_rows"],
+            "read_io_cache_percent": m["read_io_cache_percent"],
             "from_result_cache": m["from_result_cache"],
             "read_partitions": m["read_partitions"],
             "pruned_files": m["pruned_files"],
@@ -239,8 +287,9 @@ def main():
         }
         records.append(record)
 
-    with open(output_path, "w", encoding="utf-8") as f:
-        json.dump(records, f, indent=2)
+    with span("write", records=len(records)):
+        with open(output_path, "w", encoding="utf-8") as f:
+            json.dump(records, f, indent=2)
 
     print(f"\nWrote {len(records)} records to {output_path}")
 
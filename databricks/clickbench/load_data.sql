@@ -102,3 +102,7 @@ FROM read_files(
   's3://hits-parquet-100m-sorted-zstd/*.parquet',
   format => 'parquet'
 );
+
+-- Ingestion statistics (wall time, rows/s, bytes/s) for cost accounting:
+--   python collect_load_stats.py --machine <warehouse size>
+-- then pass load_stats_100m_clustered.json to summarize_results.py --load-stats.
@@ -23,10 +23,16 @@
 # -----------------------------------------------------------------------------
 
 import os
+import sys
 import json
 import argparse
+from pathlib import Path
 from databricks import sql
 
+# tracing.py lives at the repository root
+sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
+from tracing import add_profile_argument, span, start_profile
+
 
 def load_queries(path: str):
     queries = []
@@ -76,8 +82,10 @@ def main():
         default=3,
         help="Number of runs per query (default: 3)",
     )
+    add_profile_argument(parser)
 
     args = parser.parse_args()
+    start_profile(args)
     MACHINE = args.machine
     INPUT_FILE = args.input
     DB_NAME = args.db_name
@@ -98,11 +106,13 @@ def main():
 
     runs = []  # one record per (query_index, run_index)
 
-    with sql.connect(
-        server_hostname=HOST,
-        http_path=HTTP_PATH,
-        access_token=TOKEN,
-    ) as conn:
+    with span("connect"):
+        conn = sql.connect(
+            server_hostname=HOST,
+            http_path=HTTP_PATH,
+            access_token=TOKEN,
+        )
+    with conn:
         with conn.cursor() as cur:
             # disable cached results for this session
             cur.execute("SET use_cached_result=false")
@@ -124,8 +134,10 @@ def main():
                     print(f"\n[Q{q_idx} run {run_idx}/{NUM_RUNS}]")
                     print(f"  {rewritten}")
 
-                    cur.execute(rewritten)
-                    cur.fetchall()
+                    with span("query.execute", query=q_idx, run=run_idx):
+                        cur.execute(rewritten)
+                    with span("fetch", query=q_idx, run=run_idx) as s:
+                        s.set(rows=len(cur.fetchall()))
 
                     statement_id = cur.query_id
                     print(f"  statement_id: {statement_id}")
@@ -11,14 +11,83 @@
 #   "tuned": "no",
 #   "tags": ["Databricks", "Photon", "Serverless"],
 #   "load_time": 0,
+#   "load": null,          (load_stats_<table>.json when --load-stats is given)
 #   "data_size": 0,
 #   "result": [[run1, run2, run3], ...]
 # }
+# plus per-run side metrics from query history, same [query][run] shape:
+#   read_files, pruned_files, read_bytes, read_rows, task_sec,
+#   queue_sec, compile_sec, io_cache_ratio, from_result_cache
 # -----------------------------------------------------------------------------
 
+import sys
 import json
 import argparse
 from datetime import date
+from pathlib import Path
+
+# tracing.py lives at the repository root
+sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
+from tracing import add_profile_argument, span, start_profile
+
+
+def ms_to_sec(value):
+    return None if value is None else round(value / 1000.0, 3)
+
+
+# Side metric name -> how to read it from a metrics record
+SIDE_METRICS = {
+    "read_files": lambda r: r.get("read_files"),
+    "pruned_files": lambda r: r.get("pruned_files"),
+    "read_bytes": lambda r: r.get("read_bytes"),
+    "read_rows": lambda r: r.get("read_rows"),
+    "task_sec": lambda r: ms_to_sec(r.get("total_task_duration_ms")),
+    "queue_sec": lambda r: (
+        None
+        if r.get("waiting_for_compute_duration_ms") is None
+        and r.get("waiting_at_capacity_duration_ms") is None
+        else ms_to_sec(
+            (r.get("waiting_for_compute_duration_ms") or 0)
+            + (r.get("waiting_at_capacity_duration_ms") or 0)
+        )
+    ),
+    "compile_sec": lambda r: ms_to_sec(r.get("compilation_duration_ms")),
+    "io_cache_ratio": lambda r: (
+        None if r.get("read_io_cache_percent") is None else r["read_io_cache_percent"] / 100.0
+    ),
+    # A run served from the result cache measured nothing (see variance.py)
+    "from_result_cache": lambda r: r.get("from_result_cache"),
+}
+
+
+def build_result(runs):
+    """[query][run] seconds and side metrics from per-run metrics records."""
+    # group by query_index → list of runs (sorted by run_index)
+    by_query = {}
+    for r in runs:
+        q_idx = r["query_index"]
+        by_query.setdefault(q_idx, []).append(r)
+
+    # build result: list[query] -> [run1_sec, run2_sec, run3_sec]
+    result = []
+    side = {name: [] for name in SIDE_METRICS}
+    max_q = max(by_query.keys())
+
+    for q_idx in range(1, max_q + 1):
+        q_runs = sorted(by_query.get(q_idx, []), key=lambda x: x["run_index"])
+        run_times = []
+        for r in q_runs:
+            if (
+                r["total_duration_ms"] is None
+                or r.get("execution_status") != "FINISHED"
+            ):
+                run_times.append(None)
+            else:
+                run_times.append(round(r["total_duration_ms"] / 1000.0, 3))
+        result.append(run_times)
+        for name, read in SIDE_METRICS.items():
+            side[name].append([read(r) for r in q_runs])
+    return result, side
 
 
 def main():
@@ -38,8 +107,14 @@ def main():
         "--output",
         help="Output file name (default: clickbench_<machine>.json)",
     )
+    parser.add_argument(
+        "--load-stats",
+        help="load_stats_<table>.json from collect_load_stats.py (sets load_time)",
+    )
+    add_profile_argument(parser)
 
     args = parser.parse_args()
+    start_profile(args)
     MACHINE = args.machine
     input_path = args.input or f"metrics_{MACHINE}.json"
     output_path = args.output or f"clickbench_{MACHINE}.json"
@@ -48,31 +123,19 @@ def main():
     print(f"Generating ClickBench result for machine: {MACHINE}")
     print(f"Output file will be: {output_path}")
 
-    with open(input_path, "r", encoding="utf-8") as f:
-        runs = json.load(f)
+    with span("load", file=input_path):
+        with open(input_path, "r", encoding="utf-8") as f:
+            text = f.read()
+    with span("parse"):
+        runs = json.loads(text)
 
-    # group by query_index → list of runs (sorted by run_index)
-    by_query = {}
-    for r in runs:
-        q_idx = r["query_index"]
-        by_query.setdefault(q_idx, []).append(r)
-
-    # build result: list[query] -> [run1_sec, run2_sec, run3_sec]
-    result = []
-    max_q = max(by_query.keys())
+    with span("extract", runs=len(runs)):
+        result, side = build_result(runs)
 
-    for q_idx in range(1, max_q + 1):
-        q_runs = sorted(by_query.get(q_idx, []), key=lambda x: x["run_index"])
-        run_times = []
-        for r in q_runs:
-            if (
-                r["total_duration_ms"] is None
-                or r.get("execution_status") != "FINISHED"
-            ):
-                run_times.append(None)
-            else:
-                run_times.append(round(r["total_duration_ms"] / 1000.0, 3))
-        result.append(run_times)
+    load = None
+    if args.load_stats:
+        with open(args.load_stats, "r", encoding="utf-8") as f:
+            load = json.load(f)
 
     output = {
         "system": "Databricks Serverless SQL warehouse",
@@ -82,13 +145,16 @@ def main():
         "proprietary": "yes",
         "tuned": "no",
         "tags": ["Databricks", "Photon", "Serverless"],
-        "load_time": 0,
+        "load_time": load["seconds"] if load else 0,
+        "load": load,
         "data_size": 0,
         "result": result,
     }
+    output.update(side)
 
-    with open(output_path, "w", encoding="utf-8") as f:
-        json.dump(output, f, indent=2)
+    with span("write"):
+        with open(output_path, "w", encoding="utf-8") as f:
+            json.dump(output, f, indent=2)
 
     print(f"\n✅ Wrote ClickBench-compatible result to {output_path}")
 
@@ -101,6 +101,12 @@ jq -s \
   ($block.dbu_price_per_hour) as $price_per_dbu_hour |
   ($inst.dbu_per_hour)        as $dbu_per_hour     |
 
+  # load runs on the warehouse recorded in load_stats (default: this one)
+  (($block.instances[] | select(.name == ($bench.load.billed.warehouse // $machine)) | .dbu_per_hour)
+    // $dbu_per_hour) as $load_dbu_per_hour |
+  (($bench.load.billed.warehouse_seconds // $bench.load_time // 0)
+    / 3600.0 * $load_dbu_per_hour * $price_per_dbu_hour) as $load_cost |
+
   # storage pricing is nested under .storage
   ($block.storage.storage // null) as $storage_price |
   ($block.storage.storage_price_unit // null) as $storage_unit |
@@ -155,6 +161,7 @@ jq -s \
                  end
                )
              )),
+        load_cost: $load_cost,
         pricing_base: {
           dbu_per_hour:       $dbu_per_hour,
           dbu_price_per_hour: $price_per_dbu_hour
@@ -164,6 +171,9 @@ jq -s \
   }
 ' "$BENCH_FILE" "$PRICING_FILE" > "$OUT_FILE"
 
+# Billing variants: "<tier> (isolated)" / "<tier> (session)" with minimum charges
+python3 "$(dirname "$0")/../cost_engine.py" --write "$OUT_FILE" > /dev/null
+
 # --- Total compute cost summary ---
 TOTAL_COST=$(jq '[.costs[0].compute_costs[][]] | add' "$OUT_FILE")
 
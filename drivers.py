@@ -0,0 +1,485 @@
+#!/usr/bin/env python3
+"""
+Vendor drivers for the unified benchmark runner (run_benchmark.py).
+
+Each driver keeps one persistent connection for the whole session and times
+queries in-process, so results no longer include CLI start-up and login per
+query. Vendor SDKs are imported lazily in connect(), so only the driver you
+actually run needs its client library installed:
+
+    snowflake           snowflake-connector-python
+    bigquery            google-cloud-bigquery
+    firebolt            requests
+    clickhouse-cloud    clickhouse-connect
+    redshift-serverless redshift-connector
+    databricks          databricks-sql-connector
+
+Credentials come from the same environment variables the bash runners use.
+
+Every run is timed three ways (see the "timing" block in run_benchmark.py):
+client time from submit to the last result byte, the execution time the
+engine reports where the response carries it (BigQuery job start/end,
+Firebolt statistics.elapsed), and the round trip of a trivial SELECT 1.
+"""
+
+import json
+import os
+import time
+import uuid
+from typing import Dict, List, Any, Optional
+
+
+def load_queries(path: str) -> List[str]:
+    """Load queries split by semicolons (trimmed, non-empty, no comment lines)."""
+    with open(path, 'r', encoding='utf-8') as f:
+        text = '\n'.join(
+            line for line in f.read().splitlines()
+            if not line.strip().startswith('--')
+        )
+    return [q.strip() for q in text.split(';') if q.strip()]
+
+
+def rewrite_table(query: str, table: Optional[str]) -> str:
+    """Point 'FROM hits' / 'JOIN hits' at the scaled table (e.g. hits_10b)."""
+    if not table:
+        return query
+    return query.replace('FROM hits', f'FROM {table}').replace('JOIN hits', f'JOIN {table}')
+
+
+def require_env(name: str) -> str:
+    value = os.environ.get(name)
+    if not value:
+        raise SystemExit(f'ERROR: Set {name}')
+    return value
+
+
+class Driver:
+    """Base driver: one session, one connection, in-process timing.
+
+    Subclasses implement connect(), run() and close(). run() executes a query,
+    fetches the full result, and returns what the response carries: 'query_id',
+    plus 'server_sec' when it reports the engine's total server time, whose
+    phases are listed in `server_includes` (see metrics.py). Anything that
+    needs another round trip (e.g. Redshift's query id) belongs in after_run(),
+    which runs outside the timed section. Any extra keys listed in `extra_fields` are collected by the runner into
+    per-run arrays next to 'result' (e.g. BigQuery billed_bytes).
+    """
+
+    vendor = ''
+    system = ''
+    tags: List[str] = []
+    extra_fields: List[str] = []
+    server_includes: List[str] = []
+
+    def __init__(self, args):
+        self.args = args
+
+    @classmethod
+    def add_arguments(cls, parser):
+        pass
+
+    def connect(self):
+        raise NotImplementedError
+
+    def run(self, query: str, label: Dict[str, Any]) -> Dict[str, Any]:
+        raise NotImplementedError
+
+    def close(self):
+        pass
+
+    def statement(self, sql: str):
+        """Run a statement without fetching results (INSERT, DDL)."""
+        raise NotImplementedError
+
+    def fetch_value(self, sql: str) -> Any:
+        """Run a query and return the first column of the first row."""
+        raise NotImplementedError
+
+    def tag(self, label: Dict[str, Any]) -> Dict[str, Any]:
+        """Attach a per-run tag before the timed section; returns extra fields."""
+        return {}
+
+    def after_run(self, info: Dict[str, Any]) -> Dict[str, Any]:
+        """Per-run fields that need another round trip; called after the timed section."""
+        return {}
+
+    def describe(self) -> Dict[str, Any]:
+        """Result-file metadata (machine, cluster_size, data_size, ...)."""
+        return {
+            'machine': self.args.machine,
+            'cluster_size': self.args.cluster_size,
+        }
+
+    def execute(self, query: str, label: Dict[str, Any]) -> Dict[str, Any]:
+        """Run one query and return its in-process elapsed time in seconds."""
+        tags = self.tag(label)
+        start = time.perf_counter()
+        info = self.run(query, label)
+        info['elapsed'] = round(time.perf_counter() - start, 3)
+        info.update(self.after_run(info))
+        info.update(tags)
+        return info
+
+    def rtt(self, label: Dict[str, Any]) -> float:
+        """Round trip of a trivial SELECT 1: the network and client overhead in every run.
+
+        The probe is tagged as attempt 'rtt' so that collectors matching runs by
+        tag never mistake it for the run that follows.
+        """
+        self.tag(dict(label, attempt='rtt'))
+        start = time.perf_counter()
+        self.fetch_value('SELECT 1')
+        return round(time.perf_counter() - start, 3)
+
+
+class SnowflakeDriver(Driver):
+    vendor = 'snowflake'
+    system = 'Snowflake'
+    tags = ['managed', 'column-oriented']
+    extra_fields = ['query_tag']
+
+    @classmethod
+    def add_arguments(cls, parser):
+        parser.add_argument('--database', required=True, help='Database (e.g. HITS)')
+        parser.add_argument('--schema', default='PUBLIC', help='Schema (default: PUBLIC)')
+        parser.add_argument('--warehouse', required=True, help='Warehouse name')
+
+    def connect(self):
+        import snowflake.connector
+
+        self.conn = snowflake.connector.connect(
+            account=require_env('SNOWSQL_ACCOUNT'),
+            user=require_env('SNOWSQL_USER'),
+            password=require_env('SNOWSQL_PWD'),
+            database=self.args.database,
+            schema=self.args.schema,
+            warehouse=self.args.warehouse,
+        )
+        self.cur = self.conn.cursor()
+        self.cur.execute('ALTER SESSION SET USE_CACHED_RESULT = FALSE')
+        self.session_tag = f'bench2cost:{uuid.uuid4().hex[:12]}'
+
+    def tag(self, label):
+        # QUERY_TAG lets snowflake/clickbench/collect_metrics.py find each run
+        # in QUERY_HISTORY afterwards
+        query_tag = f"{self.session_tag}:q{label['query']:02d}:{label['attempt']}"
+        self.cur.execute(f"ALTER SESSION SET QUERY_TAG = '{query_tag}'")
+        return {'query_tag': query_tag}
+
+    def run(self, query, label):
+        self.cur.execute(query)
+        self.cur.fetchall()
+        return {'query_id': self.cur.sfqid}
+
+    def statement(self, sql):
+        self.cur.execute(sql)
+
+    def fetch_value(self, sql):
+        self.cur.execute(sql)
+        return self.cur.fetchone()[0]
+
+    def close(self):
+        self.conn.close()
+
+
+class BigQueryDriver(Driver):
+    vendor = 'bigquery'
+    system = 'BigQuery'
+    tags = ['serverless', 'column-oriented', 'gcp', 'managed']
+    extra_fields = ['billed_slot_sec', 'billed_bytes']
+    # Job start to end: planning and slot waits, not the PENDING state before it
+    server_includes = ['compile', 'execution']
+
+    @classmethod
+    def add_arguments(cls, parser):
+        parser.add_argument('--project', help='GCP project (default: from environment)')
+        parser.add_argument('--location', help='Job location (e.g. US)')
+
+    def connect(self):
+        from google.cloud import bigquery
+
+        self.bigquery = bigquery
+        self.client = bigquery.Client(project=self.args.project, location=self.args.location)
+
+    def run(self, query, label):
+        job_id = f'job_{uuid.uuid4().hex}'
+        config = self.bigquery.QueryJobConfig(use_query_cache=False)
+        job = self.client.query(query, job_config=config, job_id=job_id)
+        job.result()
+        return {
+            'query_id': job.job_id,
+            'server_sec': (job.ended - job.started).total_seconds() if job.started and job.ended else None,
+            'billed_slot_sec': job.slot_millis / 1000 if job.slot_millis is not None else None,
+            'billed_bytes': job.total_bytes_billed,
+        }
+
+    def statement(self, sql):
+        self.client.query(sql).result()
+
+    def fetch_value(self, sql):
+        return list(self.client.query(sql).result())[0][0]
+
+    def describe(self):
+        return {'machine': 'serverless', 'cluster_size': 'serverless'}
+
+
+class FireboltDriver(Driver):
+    vendor = 'firebolt'
+    system = 'Firebolt Cloud'
+    tags = ['C++', 'column-oriented', 'PostgreSQL compatible', 'managed', 'aws']
+    extra_fields = ['query_label']
+    server_includes = ['compile', 'execution']  # statistics.elapsed
+
+    @classmethod
+    def add_arguments(cls, parser):
+        parser.add_argument('--engine', default=os.environ.get('FIREBOLT_ENGINE'),
+                            help='Engine name (default: $FIREBOLT_ENGINE)')
+        parser.add_argument('--volume', help='Data volume label for query_label (e.g. 10B)')
+
+    def connect(self):
+        import requests
+
+        if not self.args.engine:
+            raise SystemExit('ERROR: Engine name required. Use --engine or set FIREBOLT_ENGINE')
+        self.session = requests.Session()
+        token = self.session.post(
+            'https://id.app.firebolt.io/oauth/token',
+            data={
+                'client_id': require_env('FIREBOLT_CLIENT_ID'),
+                'client_secret': require_env('FIREBOLT_CLIENT_SECRET'),
+                'grant_type': 'client_credentials',
+                'audience': 'https://api.firebolt.io',
+            },
+        ).json()['access_token']
+        self.session.headers['Authorization'] = f'Bearer {token}'
+        self.database = require_env('FIREBOLT_DATABASE')
+        account = require_env('FIREBOLT_ACCOUNT')
+        system_url = self.session.get(
+            f'https://api.app.firebolt.io/web/v3/account/{account}/engineUrl',
+            headers={'Accept': 'application/json'},
+        ).json()['engineUrl']
+        self.system_url = f'https://{system_url}'
+        engine = self.system_sql(
+            'SELECT url, nodes, type, family FROM information_schema.engines '
+            f"WHERE engine_name='{self.args.engine}'"
+        )
+        if not engine:
+            raise SystemExit('ERROR: Failed to get user engine URL. Is the engine running?')
+        self.engine = engine[0]
+        self.engine_url = f"https://{self.engine['url']}"
+
+    def system_sql(self, sql: str) -> List[Dict[str, Any]]:
+        return self.session.post(self.system_url, data=sql).json().get('data', [])
+
+    def engine_sql(self, sql: str, params: Optional[Dict[str, str]] = None) -> Dict[str, Any]:
+        query_params = {'database': self.database}
+        query_params.update(params or {})
+        response = self.session.post(self.engine_url, params=query_params, data=sql).json()
+        errors = response.get('errors')
+        if errors:
+            raise RuntimeError(errors[0].get('description', 'query failed'))
+        return response
+
+    def run(self, query, label):
+        query_label = json.dumps({
+            'benchmark': 'clickbench',
+            'volume': self.args.volume or 'unknown',
+            'query': f"q{label['query']:02d}",
+            'attempt': label['attempt'],
+        }, separators=(',', ':'))
+        response = self.engine_sql(query, {
+            'enable_result_cache': 'false',
+            'enable_subresult_cache': 'false',
+            'output_format': 'JSON_Compact',
+            'query_label': query_label,
+        })
+        return {
+            'query_id': response.get('query', {}).get('query_id'),
+            'server_sec': response.get('statistics', {}).get('elapsed'),
+            'query_label': query_label,
+        }
+
+    def statement(self, sql):
+        self.engine_sql(sql)
+
+    def fetch_value(self, sql):
+        row = self.engine_sql(sql, {'output_format': 'JSON_Compact'})['data'][0]
+        return row[0]
+
+    def describe(self):
+        table = self.engine_sql(
+            'SELECT number_of_rows, uncompressed_bytes, compressed_bytes '
+            f"FROM information_schema.tables WHERE table_name = '{self.args.table or 'hits'}'"
+        ).get('data', [{}])
+        table = table[0] if table else {}
+        nodes = self.engine.get('nodes') or 1
+        return {
+            'machine': f"{self.engine.get('type')}_{self.engine.get('family')}",
+            'scan_cache': False,
+            'cluster_size': nodes,
+            'data_size': table.get('compressed_bytes', 0),
+            'data_size_uncompressed': table.get('uncompressed_bytes', 0),
+            'row_count': table.get('number_of_rows', 0),
+            'engine': {
+                'name': self.args.engine,
+                'nodes': nodes,
+                'type': self.engine.get('type'),
+                'family': self.engine.get('family'),
+            },
+        }
+
+    def close(self):
+        self.session.close()
+
+
+class ClickHouseDriver(Driver):
+    vendor = 'clickhouse-cloud'
+    system = 'ClickHouse Cloud (AWS)'
+    tags = ['C++', 'column-oriented', 'ClickHouse derivative', 'managed', 'aws']
+
+    @classmethod
+    def add_arguments(cls, parser):
+        parser.add_argument('--parallel-replicas', type=int, choices=[0, 1], default=0,
+                            help='enable_parallel_replicas setting (default: 0)')
+
+    def connect(self):
+        import clickhouse_connect
+
+        password = os.environ.get('PASSWORD', '')
+        self.client = clickhouse_connect.get_client(
+            host=os.environ.get('FQDN', 'localhost'),
+            password=password,
+            secure=bool(password),
+        )
+
+    def run(self, query, label):
+        query_id = str(uuid.uuid4())
+        self.client.raw_query(query, fmt='Null', settings={
+            'query_id': query_id,
+            'log_comment': f"bench2cost:q{label['query']:02d}:{label['attempt']}",
+            'enable_parallel_replicas': self.args.parallel_replicas,
+        })
+        return {'query_id': query_id}
+
+    def statement(self, sql):
+        self.client.command(sql)
+
+    def fetch_value(self, sql):
+        return self.client.command(sql)
+
+    def close(self):
+        self.client.close()
+
+
+class RedshiftDriver(Driver):
+    vendor = 'redshift-serverless'
+    system = 'Redshift Serverless'
+    tags = ['serverless', 'column-oriented', 'aws', 'managed']
+    extra_fields = ['query_group']
+
+    @classmethod
+    def add_arguments(cls, parser):
+        parser.add_argument('--database', default='dev', help='Database (default: dev)')
+        parser.add_argument('--user', default='dev', help='User (default: dev)')
+
+    def connect(self):
+        import redshift_connector
+
+        self.conn = redshift_connector.connect(
+            host=require_env('FQDN'),
+            port=5439,
+            database=self.args.database,
+            user=self.args.user,
+            password=require_env('PASSWORD'),
+        )
+        self.conn.autocommit = True
+        self.cur = self.conn.cursor()
+        self.cur.execute('SET enable_result_cache_for_session TO off')
+        self.session_tag = f'bench2cost:{uuid.uuid4().hex[:8]}'
+
+    def tag(self, label):
+        # query_group shows up as SYS_QUERY_HISTORY.query_label, which
+        # redshift-serverless_extended/collect_metrics.py uses to find each run
+        query_group = f"{self.session_tag}:q{label['query']:02d}:{label['attempt']}"
+        self.cur.execute(f"SET query_group TO '{query_group}'")
+        return {'query_group': query_group}
+
+    def run(self, query, label):
+        self.cur.execute(query)
+        self.cur.fetchall()
+        return {}
+
+    def after_run(self, info):
+        # pg_last_query_id() is a leader-node round trip; keep it out of elapsed
+        self.cur.execute('SELECT pg_last_query_id()')
+        return {'query_id': self.cur.fetchone()[0]}
+
+    def statement(self, sql):
+        self.cur.execute(sql)
+
+    def fetch_value(self, sql):
+        self.cur.execute(sql)
+        return self.cur.fetchone()[0]
+
+    def describe(self):
+        return {'machine': 'serverless', 'cluster_size': 'serverless'}
+
+    def close(self):
+        self.conn.close()
+
+
+class DatabricksDriver(Driver):
+    vendor = 'databricks'
+    system = 'Databricks Serverless SQL warehouse'
+    tags = ['Databricks', 'Photon', 'Serverless']
+
+    @classmethod
+    def add_arguments(cls, parser):
+        parser.add_argument('--catalog', help='Optional catalog name (e.g. "main")')
+        parser.add_argument('--db-name', default='clickbench', help='Database to USE (default: clickbench)')
+
+    def connect(self):
+        from databricks import sql
+
+        self.conn = sql.connect(
+            server_hostname=require_env('DATABRICKS_SERVER_HOSTNAME'),
+            http_path=require_env('DATABRICKS_HTTP_PATH'),
+            access_token=require_env('DATABRICKS_TOKEN'),
+        )
+        self.cur = self.conn.cursor()
+        self.cur.execute('SET use_cached_result=false')
+        if self.args.catalog:
+            self.cur.execute(f'USE CATALOG {self.args.catalog}')
+        self.cur.execute(f'USE {self.args.db_name}')
+
+    def run(self, query, label):
+        self.cur.execute(query)
+        self.cur.fetchall()
+        return {'query_id': self.cur.query_id}
+
+    def statement(self, sql):
+        self.cur.execute(sql)
+
+    def fetch_value(self, sql):
+        self.cur.execute(sql)
+        return self.cur.fetchone()[0]
+
+    def describe(self):
+        return {'machine': 'serverless', 'cluster_size': self.args.machine}
+
+    def close(self):
+        self.cur.close()
+        self.conn.close()
+
+
+DRIVERS = {
+    driver.vendor: driver
+    for driver in (
+        SnowflakeDriver,
+        BigQueryDriver,
+        FireboltDriver,
+        ClickHouseDriver,
+        RedshiftDriver,
+        DatabricksDriver,
+    )
+}
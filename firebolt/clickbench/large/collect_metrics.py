@@ -0,0 +1,208 @@
+#!/usr/bin/env python3
+# -----------------------------------------------------------------------------
+# collect_metrics.py — Merge Firebolt engine query history into benchmark results
+#
+# run.sh (and run_benchmark.py firebolt) keep only the elapsed time of each run
+# plus its query_label. This script resolves every labelled run in one batched
+# pass over information_schema.engine_query_history on the engine that ran the
+# benchmark, and merges per-run arrays ([query][run], like "result"):
+#   query_ids         – Firebolt query id
+#   scanned_bytes     – bytes scanned
+#   scanned_rows      – rows scanned
+#   scan_cache_bytes  – bytes served from the local scan cache
+#   scan_cache_ratio  – scan_cache_bytes / scanned_bytes (1.0 = fully cached)
+#   cpu_time_sec      – CPU time across all nodes
+#   spilled_bytes     – bytes spilled to disk
+#   queue_sec         – time spent waiting in the engine queue
+#
+# compare_results.py shows these next to the winning run of every query.
+#
+# Labels repeat across benchmark runs of the same volume, so the latest
+# successful run per label submitted on or after the result's date is used;
+# collect right after the benchmark.
+#
+# Usage:
+#   python collect_metrics.py ../../results_10B/bench2cost_xl_co_9n.json
+#   python collect_metrics.py results_1B/*.json            # before enrich_large.sh
+# -----------------------------------------------------------------------------
+
+import os
+import json
+import time
+import argparse
+from collections import defaultdict
+import requests
+
+
+def escape_literal(s: str) -> str:
+    """Escape single quotes for safe inclusion in an IN (...) list."""
+    return s.replace("'", "''")
+
+
+def require_env(name: str) -> str:
+    value = os.environ.get(name)
+    if not value:
+        raise SystemExit(f"❌ Set {name}")
+    return value
+
+
+class FireboltClient:
+    """Minimal REST client: service-account auth, system and user engine URLs."""
+
+    def __init__(self):
+        self.session = requests.Session()
+        token = self.session.post(
+            "https://id.app.firebolt.io/oauth/token",
+            data={
+                "client_id": require_env("FIREBOLT_CLIENT_ID"),
+                "client_secret": require_env("FIREBOLT_CLIENT_SECRET"),
+                "grant_type": "client_credentials",
+                "audience": "https://api.firebolt.io",
+            },
+        ).json()["access_token"]
+        self.session.headers["Authorization"] = f"Bearer {token}"
+        self.database = require_env("FIREBOLT_DATABASE")
+        account = require_env("FIREBOLT_ACCOUNT")
+        system_url = self.session.get(
+            f"https://api.app.firebolt.io/web/v3/account/{account}/engineUrl",
+            headers={"Accept": "application/json"},
+        ).json()["engineUrl"]
+        self.system_url = f"https://{system_url}"
+
+    def engine_url(self, engine: str) -> str:
+        rows = self.session.post(
+            self.system_url,
+            data=f"SELECT url FROM information_schema.engines WHERE engine_name='{escape_literal(engine)}'",
+        ).json().get("data", [])
+        if not rows:
+            raise SystemExit(f"❌ Engine {engine} not found. Is it running?")
+        return f"https://{rows[0]['url']}"
+
+    def query(self, engine_url: str, sql: str):
+        response = self.session.post(
+            engine_url,
+            params={"database": self.database, "enable_result_cache": "false"},
+            data=sql,
+        ).json()
+        errors = response.get("errors")
+        if errors:
+            raise RuntimeError(errors[0].get("description", "query failed"))
+        return response.get("data", [])
+
+    def close(self):
+        self.session.close()
+
+
+def fetch_history(client, engine_url, labels, since, chunk_size, max_wait, interval):
+    """Latest successful engine_query_history row per label, polling until all show up."""
+    pending = set(labels)
+    found = {}
+    start_ts = time.time()
+
+    while pending:
+        batch = sorted(pending)
+        for i in range(0, len(batch), chunk_size):
+            in_list = ",".join(f"'{escape_literal(l)}'" for l in batch[i : i + chunk_size])
+            rows = client.query(engine_url, f"""
+                SELECT query_label, query_id, scanned_bytes, scanned_rows,
+                       scanned_cache_bytes, cpu_usage_us, spilled_bytes, time_in_queue_us
+                FROM (
+                    SELECT *, ROW_NUMBER() OVER (PARTITION BY query_label ORDER BY submitted_time DESC) AS rn
+                    FROM information_schema.engine_query_history
+                    WHERE query_label IN ({in_list})
+                      AND status = 'ENDED_SUCCESSFULLY'
+                      AND submitted_time >= '{escape_literal(since)}'::TIMESTAMPTZ
+                ) h
+                WHERE rn = 1
+            """)
+            for row in rows:
+                found[row["query_label"]] = row
+        pending -= set(found)
+        if not pending or (time.time() - start_ts) >= max_wait:
+            break
+        print(f"  Waiting on {len(pending)} runs in engine_query_history (sleeping {interval}s)...")
+        time.sleep(interval)
+
+    if pending:
+        print(f"⚠️  {len(pending)} runs not found after {max_wait}s; they get null metrics.")
+    return found
+
+
+def to_metrics(row):
+    scanned = row.get("scanned_bytes") or 0
+    cached = row.get("scanned_cache_bytes") or 0
+    return {
+        "query_ids": row.get("query_id"),
+        "scanned_bytes": scanned,
+        "scanned_rows": row.get("scanned_rows"),
+        "scan_cache_bytes": cached,
+        "scan_cache_ratio": round(cached / scanned, 4) if scanned else None,
+        "cpu_time_sec": (row.get("cpu_usage_us") or 0) / 1e6,
+        "spilled_bytes": row.get("spilled_bytes"),
+        "queue_sec": (row.get("time_in_queue_us") or 0) / 1e6,
+    }
+
+
+METRICS = [
+    "query_ids", "scanned_bytes", "scanned_rows", "scan_cache_bytes",
+    "scan_cache_ratio", "cpu_time_sec", "spilled_bytes", "queue_sec",
+]
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Merge Firebolt engine_query_history metrics into result JSON files"
+    )
+    parser.add_argument("inputs", nargs="+", help="Result JSON files with query_labels")
+    parser.add_argument("--output", help="Output path (single input only; default: overwrite input)")
+    parser.add_argument("--engine", help="Engine that ran the benchmark (default: engine.name from each file)")
+    parser.add_argument("--chunk-size", type=int, default=200, help="Labels per lookup (default: 200)")
+    parser.add_argument("--max-wait-sec", type=int, default=120, help="Max wait for runs to appear (default: 120)")
+    parser.add_argument("--poll-interval-sec", type=int, default=5, help="Polling interval (default: 5)")
+
+    args = parser.parse_args()
+    if args.output and len(args.inputs) > 1:
+        raise SystemExit("❌ --output only works with a single input file")
+
+    # One history lookup per engine
+    by_engine = defaultdict(list)
+    for path in args.inputs:
+        with open(path, "r", encoding="utf-8") as f:
+            bench = json.load(f)
+        if not bench.get("query_labels"):
+            print(f"⚠️  {path} has no query_labels, skipping")
+            continue
+        engine = args.engine or (bench.get("engine") or {}).get("name")
+        if not engine:
+            raise SystemExit(f"❌ {path} has no engine.name; pass --engine")
+        by_engine[engine].append((path, bench))
+
+    client = FireboltClient()
+    try:
+        for engine, files in by_engine.items():
+            labels = {l for _, bench in files for runs in bench["query_labels"] for l in runs if l and l != "null"}
+            since = min(bench.get("date", "1970-01-01") for _, bench in files)
+            print(f"Resolving {len(labels)} runs on engine {engine} (since {since})...")
+            history = fetch_history(
+                client, client.engine_url(engine), sorted(labels), since,
+                args.chunk_size, args.max_wait_sec, args.poll_interval_sec,
+            )
+            metrics = {label: to_metrics(row) for label, row in history.items()}
+
+            for path, bench in files:
+                for name in METRICS:
+                    bench[name] = [
+                        [(metrics.get(l) or {}).get(name) for l in runs]
+                        for runs in bench["query_labels"]
+                    ]
+                output_path = args.output or path
+                with open(output_path, "w", encoding="utf-8") as f:
+                    json.dump(bench, f, indent=2)
+                    f.write("\n")
+                print(f"✅ Wrote {output_path}")
+    finally:
+        client.close()
+
+
+if __name__ == "__main__":
+    main()
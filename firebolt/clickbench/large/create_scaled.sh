@@ -29,10 +29,15 @@ set -euo pipefail
 #   ./create_scaled.sh 10 --engine ENGINE_NAME     # Create hits_10b from hits_1b
 #   ./create_scaled.sh 100 --engine ENGINE_NAME    # Create hits_100b from hits_10b
 #   ./create_scaled.sh all --engine ENGINE_NAME    # Create all scaled tables
+#
+# Each created table gets load_stats_<table>.json (wall time, rows/s, bytes/s,
+# engine seconds); pass it to run.sh --load-stats so enrich_large.sh can price
+# the load. Writes go to --stats-dir DIR (default: current directory).
 
 # Parse arguments
 SCALE=""
 ENGINE_ARG=""
+STATS_DIR="."
 
 while [[ $# -gt 0 ]]; do
     case "$1" in
@@ -40,6 +45,10 @@ while [[ $# -gt 0 ]]; do
             ENGINE_ARG="$2"
             shift 2
             ;;
+        --stats-dir)
+            STATS_DIR="$2"
+            shift 2
+            ;;
         1|10|100|all)
             SCALE="$1"
             shift
@@ -61,6 +70,7 @@ if [ -z "$SCALE" ]; then
     echo ""
     echo "Options:"
     echo "  --engine ENGINE_NAME  Engine to use for the operation"
+    echo "  --stats-dir DIR       Where to write load_stats_<table>.json (default: .)"
     echo ""
     echo "NOTE: Each level builds on the previous. Missing source tables are created automatically."
     exit 1
@@ -115,11 +125,12 @@ if [ -z "$SYSTEM_ENGINE_URL" ] || [ "$SYSTEM_ENGINE_URL" == "null" ]; then
     exit 1
 fi
 
-# Get user engine URL
+# Get user engine URL (plus size, for billing the load)
 echo "Getting user engine URL for '${FIREBOLT_ENGINE}'..."
-USER_ENGINE_URL=$(curl -s "https://${SYSTEM_ENGINE_URL}" \
+ENGINE_INFO=$(curl -s "https://${SYSTEM_ENGINE_URL}" \
     -H "Authorization: Bearer ${ACCESS_TOKEN}" \
-    --data "SELECT url FROM information_schema.engines WHERE engine_name='${FIREBOLT_ENGINE}'" | jq -r '.data[0].url')
+    --data "SELECT url, nodes, type, family FROM information_schema.engines WHERE engine_name='${FIREBOLT_ENGINE}'")
+USER_ENGINE_URL=$(echo "$ENGINE_INFO" | jq -r '.data[0].url')
 
 if [ -z "$USER_ENGINE_URL" ] || [ "$USER_ENGINE_URL" == "null" ]; then
     echo "ERROR: Failed to get user engine URL. Is the engine running?"
@@ -150,6 +161,27 @@ table_exists() {
     [ "$count" -gt 0 ]
 }
 
+# Shared load-stats writer (repository root), so every loader writes one schema
+LOAD_STATS_PY="$(cd "$(dirname "$0")/../../.." && pwd)/load_stats.py"
+
+# Function to record load statistics for a created table
+# Args: table, rows, seconds
+write_load_stats() {
+    local table="$1"
+    local rows="$2"
+    local seconds="$3"
+    local stats_file="${STATS_DIR}/load_stats_${table}.json"
+    local bytes=$(run_sql "SELECT uncompressed_bytes FROM information_schema.tables WHERE table_name = '$table'" \
+        | jq -r '.data[0].uncompressed_bytes // 0')
+
+    mkdir -p "$STATS_DIR"
+    # The engine is billed for the whole wall time
+    local billed=$(echo "$ENGINE_INFO" | jq -c --arg engine "$FIREBOLT_ENGINE" --argjson seconds "$seconds" '
+        .data[0] as $e | {engine: $engine, nodes: $e.nodes, type: $e.type, family: $e.family, engine_seconds: $seconds}')
+    python3 "$LOAD_STATS_PY" --output "$stats_file" --table "$table" \
+        --rows "$rows" --bytes "$bytes" --seconds "$seconds" --billed "$billed"
+}
+
 # Function to create a scaled table from a source table
 # Args: source_table, target_table, scale_factor
 create_table_from() {
@@ -198,6 +230,8 @@ AS SELECT ${source_table}.* FROM ${source_table}, generate_series(1, $scale_fact
     # Get final count
     FINAL_COUNT=$(get_row_count "$target_table")
     echo "Final rows: $FINAL_COUNT"
+
+    write_load_stats "$target_table" "$FINAL_COUNT" "$LOAD_TIME"
     
     echo "$target_table created successfully!"
 }
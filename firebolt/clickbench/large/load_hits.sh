@@ -21,11 +21,19 @@ set -euo pipefail
 #   FIREBOLT_ENGINE        - Engine name to use
 #   FIREBOLT_DATABASE      - Database name (should be 'clickbench')
 #
+# Load statistics (wall time, rows/s, bytes/s, engine seconds) are written to
+# load_stats_hits_1b.json (override with --stats FILE); pass that file to
+# run.sh --load-stats so enrich_large.sh can price the load.
+#
 # Usage:
-#   ./load_hits.sh --engine ENGINE_NAME
+#   ./load_hits.sh --engine ENGINE_NAME [--stats FILE]
+
+# Shared load-stats writer (repository root), so every loader writes one schema
+LOAD_STATS_PY="$(cd "$(dirname "$0")/../../.." && pwd)/load_stats.py"
 
 # Parse arguments
 ENGINE_ARG=""
+STATS_FILE=""
 
 while [[ $# -gt 0 ]]; do
     case "$1" in
@@ -33,9 +41,13 @@ while [[ $# -gt 0 ]]; do
             ENGINE_ARG="$2"
             shift 2
             ;;
+        --stats)
+            STATS_FILE="$2"
+            shift 2
+            ;;
         *)
             echo "Unknown argument: $1"
-            echo "Usage: ./load_hits.sh --engine ENGINE_NAME"
+            echo "Usage: ./load_hits.sh --engine ENGINE_NAME [--stats FILE]"
             exit 1
             ;;
     esac
@@ -97,11 +109,12 @@ if [ -z "$SYSTEM_ENGINE_URL" ] || [ "$SYSTEM_ENGINE_URL" == "null" ]; then
     exit 1
 fi
 
-# Get user engine URL
+# Get user engine URL (plus size, for billing the load)
 echo "Getting user engine URL for '${FIREBOLT_ENGINE}'..."
-USER_ENGINE_URL=$(curl -s "https://${SYSTEM_ENGINE_URL}" \
+ENGINE_INFO=$(curl -s "https://${SYSTEM_ENGINE_URL}" \
     -H "Authorization: Bearer ${ACCESS_TOKEN}" \
-    --data "SELECT url FROM information_schema.engines WHERE engine_name='${FIREBOLT_ENGINE}'" | jq -r '.data[0].url')
+    --data "SELECT url, nodes, type, family FROM information_schema.engines WHERE engine_name='${FIREBOLT_ENGINE}'")
+USER_ENGINE_URL=$(echo "$ENGINE_INFO" | jq -r '.data[0].url')
 
 if [ -z "$USER_ENGINE_URL" ] || [ "$USER_ENGINE_URL" == "null" ]; then
     echo "ERROR: Failed to get user engine URL. Is the engine running?"
@@ -174,6 +187,13 @@ UNCOMPRESSED_SIZE=$(echo "$STATS_RESULT" | jq -r '.data[0].uncompressed_bytes //
 
 echo "Compressed size: $COMPRESSED_SIZE bytes"
 echo "Uncompressed size: $UNCOMPRESSED_SIZE bytes"
+
+# Record load statistics; the engine is billed for the whole wall time
+STATS_FILE="${STATS_FILE:-load_stats_${TARGET_TABLE}.json}"
+billed="$(echo "$ENGINE_INFO" | jq -c --arg engine "$FIREBOLT_ENGINE" --argjson seconds "$LOAD_TIME" '
+    .data[0] as $e | {engine: $engine, nodes: $e.nodes, type: $e.type, family: $e.family, engine_seconds: $seconds}')"
+python3 "$LOAD_STATS_PY" --output "$STATS_FILE" --table "$TARGET_TABLE" \
+    --rows "$ROW_COUNT" --bytes "$UNCOMPRESSED_SIZE" --seconds "$LOAD_TIME" --billed "$billed"
 echo ""
 echo "Table ${TARGET_TABLE} (~1B rows) ready for benchmarking."
 echo "Use './create_scaled.sh 10' to create hits_10b (~10B rows)."
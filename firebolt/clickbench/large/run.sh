@@ -26,6 +26,7 @@ TRIES=3
 TABLE="hits_1b"
 ENGINE_NAME=""
 LOAD_TIME=0
+LOAD_STATS="null"
 
 # Parse arguments
 while [[ $# -gt 0 ]]; do
@@ -42,21 +43,27 @@ while [[ $# -gt 0 ]]; do
             LOAD_TIME="$2"
             shift 2
             ;;
+        --load-stats)
+            LOAD_STATS="$(jq -c . "$2")"
+            LOAD_TIME="$(jq -r '.seconds // 0' <<<"$LOAD_STATS")"
+            shift 2
+            ;;
         --help|-h)
-            echo "Usage: ./run.sh --engine ENGINE_NAME [--table TABLE_NAME] [--load-time SECONDS]"
+            echo "Usage: ./run.sh --engine ENGINE_NAME [--table TABLE_NAME] [--load-time SECONDS | --load-stats FILE]"
             echo ""
             echo "Options:"
             echo "  --engine, -e      Engine name (required)"
             echo "  --table, -t       Table to query (default: hits_1b)"
             echo "                    Options: hits_1b, hits_10b, hits_100b"
             echo "  --load-time       Time taken to create/expand the table (seconds)"
+            echo "  --load-stats      load_stats_<table>.json from load_hits.sh / create_scaled.sh"
             echo ""
             echo "Output is saved to results_{1B,10B,100B}/{engine_name}.json"
             exit 0
             ;;
         *)
             echo "Unknown option: $1" >&2
-            echo "Usage: ./run.sh --engine ENGINE_NAME [--table TABLE_NAME] [--load-time SECONDS]" >&2
+            echo "Usage: ./run.sh --engine ENGINE_NAME [--table TABLE_NAME] [--load-time SECONDS | --load-stats FILE]" >&2
             exit 1
             ;;
     esac
@@ -310,6 +317,7 @@ cat > "$OUTPUT_FILE" <<EOF
     "data_size_uncompressed": $TABLE_UNCOMPRESSED,
     "row_count": $TABLE_ROWS,
     "load_time": $LOAD_TIME,
+    "load": $LOAD_STATS,
     "engine": {
         "name": "$ENGINE_NAME",
         "nodes": $ENGINE_NODES,
@@ -3,8 +3,14 @@
 Compare benchmark results between two systems (e.g., ClickHouse Cloud vs Firebolt).
 Generates a markdown report with performance and cost analysis.
 
+By default each file's "result" is compared as is, although runners measure
+differently (client time for snowsql and clickhouse-client, server time for
+Firebolt and Databricks). --timing client|server|net compares both files on
+one basis instead (see metrics.py; net is client time minus the SELECT 1
+round trip recorded by run_benchmark.py). Costs are always those of the file.
+
 Usage:
-    python compare_results.py <file1.json> <file2.json> [--output report.md]
+    python compare_results.py <file1.json> <file2.json> [--output report.md] [--timing server] [--profile]
     
 Example:
     python compare_results.py \
@@ -18,11 +24,19 @@ import argparse
 import sys
 from pathlib import Path
 
+# tracing.py and metrics.py live at the repository root
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from metrics import TIMING_BASES, result_basis, run_times, server_includes
+from tracing import add_profile_argument, span, start_profile
+
 
 def load_results(filepath):
     """Load benchmark results from JSON file."""
-    with open(filepath) as f:
-        return json.load(f)
+    with span("load", file=str(filepath)):
+        with open(filepath) as f:
+            text = f.read()
+    with span("parse"):
+        return json.loads(text)
 
 
 def get_min_times(results):
@@ -33,43 +47,75 @@ def get_min_times(results):
     ]
 
 
-def get_winning_query_labels(results, query_labels):
-    """Get the query_label of the winning (fastest) attempt for each query.
+def get_winning_values(results, per_run):
+    """Get the per-run value of the winning (fastest) attempt for each query.
     
     Args:
         results: List of [run1, run2, run3] times for each query
-        query_labels: List of [label1, label2, label3] for each query (optional, may be None)
+        per_run: List of [value1, value2, value3] for each query (optional, may be None)
     
     Returns:
-        List of winning query_labels (or None if not available)
+        List of winning values (or None if not available)
     """
-    if not query_labels:
+    if not per_run:
         return [None] * len(results)
     
-    winning_labels = []
+    winning = []
     for i, q_times in enumerate(results):
-        if i >= len(query_labels):
-            winning_labels.append(None)
+        if i >= len(per_run):
+            winning.append(None)
             continue
             
-        q_labels = query_labels[i]
-        if not q_labels or not any(t is not None for t in q_times):
-            winning_labels.append(None)
+        q_values = per_run[i]
+        if not q_values or not any(t is not None for t in q_times):
+            winning.append(None)
             continue
         
         # Find index of minimum time
         valid_times = [(j, t) for j, t in enumerate(q_times) if t is not None]
-        if not valid_times:
-            winning_labels.append(None)
-            continue
-            
         best_idx = min(valid_times, key=lambda x: x[1])[0]
-        if best_idx < len(q_labels):
-            winning_labels.append(q_labels[best_idx])
-        else:
-            winning_labels.append(None)
+        winning.append(q_values[best_idx] if best_idx < len(q_values) else None)
     
-    return winning_labels
+    return winning
+
+
+def get_winning_query_labels(results, query_labels):
+    """Get the query_label of the winning (fastest) attempt for each query."""
+    return get_winning_values(results, query_labels)
+
+
+# Per-run engine metrics merged by the collectors (e.g. firebolt/clickbench/large/collect_metrics.py)
+QUERY_METRICS = [
+    ('scanned_bytes', 'Scanned'),
+    ('scan_cache_ratio', 'Cache'),
+    ('cpu_time_sec', 'CPU'),
+    ('spilled_bytes', 'Spilled'),
+]
+
+
+def get_winning_metrics(data):
+    """Winning-run engine metrics per query, or None if the file has none."""
+    if not any(data.get(key) for key, _ in QUERY_METRICS):
+        return None
+    return {key: get_winning_values(data['result'], data.get(key)) for key, _ in QUERY_METRICS}
+
+
+def format_bytes(value):
+    """Human-readable byte count."""
+    for unit in ('B', 'KB', 'MB', 'GB', 'TB'):
+        if abs(value) < 1000 or unit == 'TB':
+            return f"{value:.0f}{unit}" if unit == 'B' else f"{value:.1f}{unit}"
+        value /= 1000
+
+
+def format_metric(key, value):
+    if value is None:
+        return "N/A"
+    if key == 'scan_cache_ratio':
+        return f"{value * 100:.0f}%"
+    if key == 'cpu_time_sec':
+        return f"{value:.2f}s"
+    return format_bytes(value)
 
 
 def get_failed_queries(results):
@@ -103,6 +149,22 @@ def get_compute_cost(costs, tier_name, exclude_queries=None):
     return tier, total
 
 
+def apply_timing(data, basis):
+    """Copy of data whose "result" is on the given timing basis, or None if the file lacks it."""
+    times = run_times(data, basis)
+    if times is None:
+        return None
+    timing = dict(data.get("timing") or {}, result_basis=basis)
+    return dict(data, result=times, timing=timing)
+
+
+def basis_label(data):
+    """Timing basis of "result", with the phases server time covers."""
+    basis = result_basis(data)
+    phases = server_includes(data) if basis == "server" else None
+    return f"{basis} ({' + '.join(phases)})" if phases else basis or "N/A"
+
+
 def generate_report(data1, data2, name1=None, name2=None):
     """Generate markdown comparison report."""
     
@@ -155,6 +217,7 @@ def generate_report(data1, data2, name1=None, name2=None):
     size1 = data1.get('data_size', 0) / 1e9
     size2 = data2.get('data_size', 0) / 1e9
     lines.append(f"| Data Size (GB) | {size1:.2f} | {size2:.2f} |")
+    lines.append(f"| Timing Basis | {basis_label(data1)} | {basis_label(data2)} |")
     lines.append("")
     
     # Performance (based on best of 3 runs)
@@ -301,37 +364,37 @@ def generate_report(data1, data2, name1=None, name2=None):
     short_name1 = name1.split()[0] if ' ' in name1 else name1[:15]
     short_name2 = name2.split()[0] if ' ' in name2 else name2[:15]
     
+    # Engine metrics of the winning run explain *why* a query won
+    metric_columns = [
+        (short_name, metrics)
+        for short_name, metrics in ((short_name1, get_winning_metrics(data1)),
+                                    (short_name2, get_winning_metrics(data2)))
+        if metrics
+    ]
+    
+    headers = [f"{short_name1} Node", f"{short_name2} Node", "Cluster Size", "Scan Cache", "Query",
+               f"{short_name1} Best", f"{short_name2} Best"]
     if has_query_labels:
-        lines.append(f"| {short_name1} Node | {short_name2} Node | Cluster Size | Scan Cache | Query | {short_name1} Best | {short_name2} Best | {short_name2} Query Label |")
-        lines.append("|---|---|---|---|---|---|---|---|")
-    else:
-        lines.append(f"| {short_name1} Node | {short_name2} Node | Cluster Size | Scan Cache | Query | {short_name1} Best | {short_name2} Best |")
-        lines.append("|---|---|---|---|---|---|---|")
+        headers.append(f"{short_name2} Query Label")
+    for short_name, _ in metric_columns:
+        headers += [f"{short_name} {title}" for _, title in QUERY_METRICS]
+    lines.append("| " + " | ".join(headers) + " |")
+    lines.append("|---" * len(headers) + "|")
     
     for i, (t1, t2) in enumerate(zip(min_times1, min_times2)):
         query_num = f"Q{i}"
         winning_label = winning_labels[i] if i < len(winning_labels) else None
         # Format query label for display (or N/A if missing)
-        label_str = winning_label if (winning_label and winning_label != "null") else "N/A"
+        label_str = winning_label if (winning_label and winning_label != "null" and t2 is not None) else "N/A"
         
+        cells = [machine1, machine2, cluster1, scan_cache2, query_num,
+                 "FAIL" if t1 is None else f"{t1:.3f}",
+                 "FAIL" if t2 is None else f"{t2:.3f}"]
         if has_query_labels:
-            if t1 is None and t2 is None:
-                lines.append(f"| {machine1} | {machine2} | {cluster1} | {scan_cache2} | {query_num} | FAIL | FAIL | N/A |")
-            elif t1 is None:
-                lines.append(f"| {machine1} | {machine2} | {cluster1} | {scan_cache2} | {query_num} | FAIL | {t2:.3f} | {label_str} |")
-            elif t2 is None:
-                lines.append(f"| {machine1} | {machine2} | {cluster1} | {scan_cache2} | {query_num} | {t1:.3f} | FAIL | N/A |")
-            else:
-                lines.append(f"| {machine1} | {machine2} | {cluster1} | {scan_cache2} | {query_num} | {t1:.3f} | {t2:.3f} | {label_str} |")
-        else:
-            if t1 is None and t2 is None:
-                lines.append(f"| {machine1} | {machine2} | {cluster1} | {scan_cache2} | {query_num} | FAIL | FAIL |")
-            elif t1 is None:
-                lines.append(f"| {machine1} | {machine2} | {cluster1} | {scan_cache2} | {query_num} | FAIL | {t2:.3f} |")
-            elif t2 is None:
-                lines.append(f"| {machine1} | {machine2} | {cluster1} | {scan_cache2} | {query_num} | {t1:.3f} | FAIL |")
-            else:
-                lines.append(f"| {machine1} | {machine2} | {cluster1} | {scan_cache2} | {query_num} | {t1:.3f} | {t2:.3f} |")
+            cells.append(label_str)
+        for _, metrics in metric_columns:
+            cells += [format_metric(key, metrics[key][i]) for key, _ in QUERY_METRICS]
+        lines.append("| " + " | ".join(str(c) for c in cells) + " |")
     
     lines.append("")
     
@@ -347,8 +410,17 @@ def main():
     parser.add_argument("--name1", help="Name for first system (default: from JSON)")
     parser.add_argument("--name2", help="Name for second system (default: from JSON)")
     parser.add_argument("--output", "-o", help="Output markdown file (default: stdout)")
+    parser.add_argument(
+        "--timing",
+        choices=["result"] + TIMING_BASES,
+        default="result",
+        help="Compare run times on this basis: client, server, or net (client minus RTT) "
+             "(default: result, as each runner recorded it)",
+    )
+    add_profile_argument(parser)
     
     args = parser.parse_args()
+    start_profile(args)
     
     # Load data
     try:
@@ -358,8 +430,27 @@ def main():
         print(f"Error loading files: {e}", file=sys.stderr)
         sys.exit(1)
     
+    if args.timing != "result":
+        converted = []
+        for path, data in ((args.file1, data1), (args.file2, data2)):
+            timed = apply_timing(data, args.timing)
+            if timed is None:
+                available = [b for b in TIMING_BASES if run_times(data, b) is not None]
+                print(f"❌ {path} has no {args.timing} timing (available: {', '.join(available) or 'none'})",
+                      file=sys.stderr)
+                sys.exit(1)
+            converted.append(timed)
+        data1, data2 = converted
+        if args.timing == "server" and server_includes(data1) != server_includes(data2):
+            print(f"⚠️  Server times cover different phases: {basis_label(data1)} vs {basis_label(data2)}",
+                  file=sys.stderr)
+    elif result_basis(data1) != result_basis(data2):
+        print(f"⚠️  Comparing {result_basis(data1) or 'unknown'} time with {result_basis(data2) or 'unknown'} time; "
+              "use --timing for an apples-to-apples comparison", file=sys.stderr)
+    
     # Generate report
-    report = generate_report(data1, data2, args.name1, args.name2)
+    with span("render"):
+        report = generate_report(data1, data2, args.name1, args.name2)
     
     # Output
     if args.output:
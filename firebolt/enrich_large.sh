@@ -8,6 +8,11 @@ set -euo pipefail
 # based on FBU (Firebolt Unit) pricing model.
 #
 # Pricing source: https://docs.firebolt.io/overview/billing
+#
+# Prices come from pricing_metadata.csv, whose rows carry an effective_date:
+# each result is priced with the rows in effect on its "date" (AS_OF=YYYY-MM-DD
+# prices every result at one date instead); a date before every row of a tier
+# uses its earliest row, as in price_matrix.py.
 # -----------------------------
 
 if [[ $# -lt 2 ]]; then
@@ -33,22 +38,10 @@ FBU_MAP='{
   "COMPUTE_OPTIMIZED": {"S": 4, "M": 8, "L": 16, "XL": 32}
 }'
 
-# Pricing tiers (US region - us-east-1)
-# Storage-optimized pricing per FBU/hour
+# Pricing tiers per FBU/hour and storage per TiB/month (us-east-1)
 # Compute-optimized is ~2x cheaper (same FBU rate but half the FBUs)
-# Storage: $27.07/TiB/month = $27.07 / (1024^4) per byte/month
-TIERS_JSON='[
-  {
-    "name": "Standard",
-    "fbu_rate_per_hour": 0.23,
-    "storage_per_tib_month": 27.07
-  },
-  {
-    "name": "Enterprise",
-    "fbu_rate_per_hour": 0.30,
-    "storage_per_tib_month": 27.07
-  }
-]'
+CSV_FILE="$(dirname "$0")/pricing_metadata.csv"
+AS_OF="${AS_OF:-}"
 
 for infile in "${files[@]}"; do
   base="$(basename "$infile")"
@@ -56,11 +49,25 @@ for infile in "${files[@]}"; do
   echo " -> $base"
 
   jq --arg provider aws --arg region us-east-1 \
-     --argjson tiers "$TIERS_JSON" \
+     --arg as_of "$AS_OF" \
+     --rawfile csv "$CSV_FILE" \
      --argjson fbu_map "$FBU_MAP" '
     def tosec:
       if type=="number" then . else (try tonumber catch 0) // 0 end;
 
+    # Tier rows in effect on $date: per tier, the latest effective_date <= $date,
+    # else its earliest row; tiers in order of first appearance
+    (if $as_of != "" then $as_of else (.date // "9999-12-31") end) as $date |
+    ([ $csv | split("\n")[] | select(. != "" and (startswith("provider") | not)) | split(",")
+       | select(.[0] == $provider and .[1] == $region) ] as $rows
+     | reduce $rows[] as $r ([]; if index([$r[2]]) then . else . + [$r[2]] end)
+     | map(. as $name
+         | [$rows[] | select(.[2] == $name)] | sort_by(.[5] // "")
+         | (map(select((.[5] // "") <= $date)) | last) // first
+         | {name: .[2], fbu_rate_per_hour: (.[3] | tonumber),
+            storage_per_tib_month: (.[4] | tonumber), effective_date: .[5]})
+    ) as $tiers |
+
     # Constants
     (1024 * 1024 * 1024 * 1024) as $tib_bytes |
     
@@ -78,6 +85,14 @@ for infile in "${files[@]}"; do
     
     # Results array
     (.result // []) as $res |
+
+    # Load: engine seconds on the engine that ran it (load_stats billed block),
+    # falling back to load_time on the benchmarked engine
+    (.load.billed // {}) as $lb |
+    (if $lb.type != null and $lb.family != null
+     then ($fbu_map[$lb.family][$lb.type] // $fbu_per_node) * ($lb.nodes // 1)
+     else $total_fbu end) as $load_fbu |
+    (($lb.engine_seconds // .load_time // 0) | tosec) as $load_sec |
     
     # Add metadata and costs
     .provider = $provider |
@@ -99,6 +114,8 @@ for infile in "${files[@]}"; do
               [ .[] | (tosec * $fbu_per_sec * $total_fbu) ]
             ]
           ) as $compute_costs |
+          # Load cost = engine seconds × fbu_per_sec × load engine FBU
+          ($load_sec * $fbu_per_sec * $load_fbu) as $load_cost |
           # Storage cost (monthly)
           ($bytes * $storage_per_byte) as $storage_cost_value |
           {
@@ -107,13 +124,16 @@ for infile in "${files[@]}"; do
             region: $region,
             fbu_per_node: $fbu_per_node,
             total_fbu: $total_fbu,
+            price_effective_date: $tier.effective_date,
             compute_costs: $compute_costs,
+            load_cost: $load_cost,
             storage_cost: $storage_cost_value
           }
         )
       )
     }
   ' "$infile" > "$out"
+  python3 "$(dirname "$0")/../cost_engine.py" --write "$out" > /dev/null
 
   echo "    saved → $out"
 done
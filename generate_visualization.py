@@ -2,17 +2,45 @@
 """
 Generate an interactive HTML visualization for benchmark cost-performance comparison.
 Similar to ClickHouse's interactive benchmark explorer.
+
+With --watch it keeps running during a benchmark campaign: every vendor's
+results_{scale} directory is polled, only new or changed files are
+re-extracted, and the page is rewritten atomically once no file has changed
+for --debounce seconds, so a bulk drop triggers a single rebuild.
+
+Usage:
+    python generate_visualization.py
+    python generate_visualization.py --watch --interval 0.5 --debounce 1
+    python generate_visualization.py --profile      # timing spans, see tracing.py
 """
 
+import argparse
+import base64
+import gzip
 import json
+import math
 import os
+import re
+import struct
+import sys
+import tempfile
+import time
 from pathlib import Path
-from typing import Dict, List, Any
+from typing import Dict, Iterator, List, Any, Optional, Tuple
+
+from cost_engine import apply_rules, load_rules
+from metrics import best_run_totals
+from scaling_model import fit_all, node_count
+from tracing import add_profile_argument, span, start_profile
 
 def load_result_file(filepath: Path) -> Dict[str, Any]:
     """Load a single result JSON file."""
-    with open(filepath, 'r') as f:
-        return json.load(f)
+    with span('load', file=str(filepath)) as s:
+        with open(filepath, 'r') as f:
+            text = f.read()
+        s.set(bytes=len(text))
+    with span('parse'):
+        return json.loads(text)
 
 def get_best_runtime(result: List[List[float]]) -> float:
     """Get total runtime using best of 3 runs for each query."""
@@ -35,6 +63,94 @@ def get_total_cost(costs: List[Dict], tier: str) -> float:
             return total
     return 0
 
+def pack_floats(values: List[Optional[float]]) -> str:
+    """Base64 of a little-endian float32 array, NaN for missing values (unpackFloats() in the page)."""
+    return base64.b64encode(struct.pack(
+        f'<{len(values)}f', *(math.nan if v is None else v for v in values)
+    )).decode('ascii')
+
+def best_of(values: Optional[List[Optional[float]]]) -> Optional[float]:
+    return min((v for v in values or [] if v is not None), default=None)
+
+def extract_query_arrays(result_data: Dict) -> Dict:
+    """Per-query best and cold (first run) runtimes and per-tier best-run costs, packed."""
+    result = result_data.get('result', [])
+    return {
+        'best': pack_floats([best_of(runs) for runs in result]),
+        'cold': pack_floats([runs[0] if runs else None for runs in result]),
+        'costs': {
+            cost_tier.get('tier', 'unknown'): pack_floats([best_of(qc) for qc in cost_tier.get('compute_costs', [])])
+            for cost_tier in result_data.get('costs', [])
+        },
+    }
+
+# Warehouse-size substrings, largest first so 'large' does not match before '4xl'
+SIZE_ORDER = [
+    ('4xl', 8), ('4x-large', 8), ('4xlarge', 8),
+    ('3xl', 7), ('3x-large', 7), ('3xlarge', 7),
+    ('2xl', 6), ('2x-large', 6), ('2xlarge', 6),
+    ('xl', 5), ('xlarge', 5), ('x-large', 5),
+    ('large', 4),
+    ('medium', 3),
+    ('small', 2),
+    ('xs', 1), ('extra-small', 1),
+]
+
+def config_size_rank(config: str) -> int:
+    """Sort key of a config (larger = bigger): node counts x 100, else the warehouse size."""
+    config_lower = config.lower()
+    # Node counts with suffix (e.g. "bench2cost_l_co_3n"), ClickHouse replicas
+    # ("aws.20.236.parallel_replicas") or a leading count ("3.236 (PR)")
+    for pattern in (r'(\d+)n$', r'aws\.(\d+)\.', r'^(\d+)'):
+        match = re.search(pattern, config_lower)
+        if match:
+            return int(match.group(1)) * 100
+    for key, rank in SIZE_ORDER:
+        if key in config_lower:
+            return rank
+    return 0
+
+def config_label(config: str) -> str:
+    """Display name of a config, e.g. bench2cost_xl_co_3n -> XL CO 3 nodes."""
+    match = re.search(r'bench2cost_(xl|l)_co_(\d+)n', config)
+    if match:
+        return f'{match.group(1).upper()} CO {match.group(2)} nodes'
+    match = re.search(r'aws\.(\d+)\..*parallel_replicas', config)
+    if match:
+        return f'{match.group(1)} nodes'
+    for old, new in (('bench2cost_l_co_', ''), ('_enriched', ''), ('aws.', ''),
+                     ('.parallel_replicas', ' (PR)'), ('clickbench_', ''), ('result_', '')):
+        config = config.replace(old, new, 1)
+    return config
+
+def describe_config(result_data: Dict, config: str) -> Dict:
+    """Structured config descriptor from the file name and result fields; None where not applicable."""
+    engine = result_data.get('engine') or {}
+    machine = str(result_data.get('machine') or '')
+    cluster_size = result_data.get('cluster_size')
+    memory = result_data.get('memory_size')
+    if memory is None:
+        match = re.fullmatch(r'(\d+(?:\.\d+)?)\s*GiB', machine)
+        memory = float(match.group(1)) if match else None
+    nodes = engine.get('nodes') or node_count(cluster_size)
+    if engine.get('type'):
+        node_size = engine['type']
+    elif isinstance(cluster_size, str) and cluster_size != 'serverless':
+        node_size = cluster_size
+    elif machine and machine != 'serverless' and memory is None:
+        node_size = machine
+    else:
+        node_size = None
+    return {
+        'nodes': int(nodes) if nodes is not None and float(nodes).is_integer() else nodes,
+        'node_size': node_size,
+        'memory_gib': memory,
+        'family': engine.get('family'),
+        'parallel_replicas': 'parallel_replicas' in config,
+        'label': config_label(config),
+        'size_rank': config_size_rank(config),
+    }
+
 def extract_data_point(result_data: Dict, scale: str, vendor: str, config: str) -> Dict:
     """Extract a data point for the visualization."""
     runtime = get_best_runtime(result_data.get('result', []))
@@ -58,6 +174,7 @@ def extract_data_point(result_data: Dict, scale: str, vendor: str, config: str)
         tiers.append({
             'name': tier_name,
             'compute_cost': total_cost,
+            'load_cost': cost_tier.get('load_cost', 0),
             'storage_cost': storage_cost
         })
     
@@ -71,50 +188,158 @@ def extract_data_point(result_data: Dict, scale: str, vendor: str, config: str)
         'machine': result_data.get('machine', ''),
         'cluster_size': result_data.get('cluster_size', 1),
         'data_size': result_data.get('data_size', 0),
+        'load_time': result_data.get('load_time', 0),
+        'cheapest_models': result_data.get('pricing_models', {}).get('cheapest', []),
+        # Best-run totals of the normalized metrics block (see metrics.py)
+        'metrics': best_run_totals(result_data),
+        'queries': extract_query_arrays(result_data),
+        'descriptor': describe_config(result_data, config),
     }
 
-def collect_all_results(base_dir: Path) -> List[Dict]:
-    """Collect all enriched results from all vendors and scales."""
-    results = []
-    
-    vendors = {
-        'firebolt': 'Firebolt',
-        'clickhouse-cloud': 'ClickHouse Cloud',
-        'snowflake': 'Snowflake',
-        'databricks': 'Databricks',
-        'bigquery': 'BigQuery',
-        'redshift-serverless': 'Redshift Serverless'
-    }
-    
-    scales = ['1B', '10B', '100B']
-    
-    for vendor_dir, vendor_name in vendors.items():
+VENDORS = {
+    'firebolt': 'Firebolt',
+    'clickhouse-cloud': 'ClickHouse Cloud',
+    'snowflake': 'Snowflake',
+    'databricks': 'Databricks',
+    'bigquery': 'BigQuery',
+    'redshift-serverless': 'Redshift Serverless'
+}
+
+SCALES = ['1B', '10B', '100B']
+
+def result_files(base_dir: Path) -> Iterator[Tuple[str, str, Path]]:
+    """Yield (vendor, scale, path) of every results_{scale} JSON file."""
+    for vendor_dir, vendor_name in VENDORS.items():
         vendor_path = base_dir / vendor_dir
         if not vendor_path.exists():
             continue
             
-        for scale in scales:
+        for scale in SCALES:
             results_dir = vendor_path / f'results_{scale}'
             if not results_dir.exists():
                 continue
                 
             for result_file in results_dir.glob('*.json'):
-                try:
-                    result_data = load_result_file(result_file)
-                    config = result_file.stem
-                    data_point = extract_data_point(result_data, scale, vendor_name, config)
-                    results.append(data_point)
-                except Exception as e:
-                    print(f"Error loading {result_file}: {e}")
-    
+                yield vendor_name, scale, result_file
+
+def load_result(vendor_name: str, result_file: Path) -> Dict[str, Any]:
+    """Load a result file with the billing variants of its vendor applied."""
+    result_data = load_result_file(result_file)
+    if result_data.get('costs'):
+        # "<tier> (isolated)" / "<tier> (session)" billing variants
+        with span('enrich', vendor=vendor_name):
+            apply_rules(result_data, load_rules(vendor_name))
+    return result_data
+
+def iter_results(base_dir: Path) -> Iterator[Tuple[str, str, str, Dict]]:
+    """Yield (vendor, scale, config, result data) of every enriched result, billing variants applied."""
+    for vendor_name, scale, result_file in result_files(base_dir):
+        try:
+            result_data = load_result(vendor_name, result_file)
+        except Exception as e:
+            print(f"Error loading {result_file}: {e}")
+            continue
+        yield vendor_name, scale, result_file.stem, result_data
+
+def collect_all_results(base_dir: Path) -> List[Dict]:
+    """Collect all enriched results from all vendors and scales."""
+    results = []
+    for vendor_name, scale, config, result_data in iter_results(base_dir):
+        try:
+            with span('extract', vendor=vendor_name, scale=scale, config=config):
+                results.append(extract_data_point(result_data, scale, vendor_name, config))
+        except Exception as e:
+            print(f"Error loading {vendor_name} {scale} {config}: {e}")
     return results
 
-def generate_html(results: List[Dict], output_path: Path):
-    """Generate the interactive HTML visualization."""
+PLOTLY_CDN = 'https://cdn.plot.ly/plotly-2.27.0.min.js'
+
+# Keep HubSpot (injected by the site embedding the explorer) out of iframes; not needed offline
+HUBSPOT_HEAD = '''    <script>
+      // Block HubSpot from loading if in iframe (run ASAP in head)
+      if (window.self !== window.top) {
+        // Intercept HubSpot's global object before it loads
+        window.hsConversationsSettings = { loadImmediately: false };
+        window.hsConversationsOnReady = [];
+        // Block the loader
+        Object.defineProperty(window, 'HubSpotConversations', {
+          get: function() { return { widget: { load: function(){}, remove: function(){} } }; },
+          set: function() {}
+        });
+      }
+    </script>
+'''
+
+HUBSPOT_TAIL = '''    <script>
+      if (window.self !== window.top) {
+        // Aggressive continuous hiding
+        function nukeHubSpot() {
+          // Remove all HubSpot elements
+          document.querySelectorAll('[id*="hubspot"], [class*="hubspot"], iframe[src*="hubspot"]').forEach(el => {
+            el.parentNode && el.parentNode.removeChild(el);
+          });
+          
+          // Remove HubSpot scripts
+          document.querySelectorAll('script[src*="hs-scripts"], script[src*="hubspot"]').forEach(script => {
+            script.parentNode && script.parentNode.removeChild(script);
+          });
+        }
+        
+        // Run immediately and continuously
+        nukeHubSpot();
+        setInterval(nukeHubSpot, 100); // Check every 100ms
+        
+        // Also use MutationObserver
+        new MutationObserver(nukeHubSpot).observe(document.documentElement, {
+          childList: true,
+          subtree: true
+        });
+      }
+    </script>
+
+    <style>
+      /* Nuclear CSS option */
+      [id*="hubspot"],
+      [class*="hubspot"],
+      iframe[src*="hubspot"] {
+        display: none !important;
+        visibility: hidden !important;
+        pointer-events: none !important;
+        position: absolute !important;
+        left: -9999px !important;
+      }
+    </style>
+'''
+
+def pack_payload(payload: Any) -> str:
+    """Base64 of gzipped compact JSON; unpackPayload() in the page reverses it."""
+    raw = json.dumps(payload, separators=(',', ':')).encode()
+    return base64.b64encode(gzip.compress(raw, 9)).decode('ascii')
+
+def render_html(results: List[Dict], scaling_models: Dict[str, Any] = None,
+                api_base: Optional[str] = None, vendors: Optional[List[str]] = None,
+                plotly_bundle: Optional[str] = None) -> str:
+    """Render the explorer page.
+
+    With api_base set (query_server.py serves the page with ''), results are
+    fetched per scale from the query service instead of the embedded data.
+    With plotly_bundle (the source of a Plotly build) the page is self-contained:
+    the bundle is inlined, the data is embedded gzipped and the HubSpot guards
+    are left out.
+    """
     
     # Group results by vendor and scale
-    vendors = sorted(set(r['vendor'] for r in results))
-    scales = ['1B', '10B', '100B']
+    vendors = vendors or sorted(set(r['vendor'] for r in results))
+    
+    if plotly_bundle is None:
+        plotly_script = f'<script src="{PLOTLY_CDN}"></script>'
+        hubspot_head, hubspot_tail = HUBSPOT_HEAD, HUBSPOT_TAIL
+        packed = None
+    else:
+        plotly_script = '<script>' + plotly_bundle.replace('</script', '<\\/script') + '</script>'
+        hubspot_head = hubspot_tail = ''
+        packed = pack_payload({'results': results, 'scaling_models': scaling_models or {}})
+        results, scaling_models = [], {}
     
     # Vendor colors
     vendor_colors = {
@@ -129,23 +354,10 @@ def generate_html(results: List[Dict], output_path: Path):
     html = f'''<!DOCTYPE html>
 <html lang="en">
 <head>
-    <script>
-      // Block HubSpot from loading if in iframe (run ASAP in head)
-      if (window.self !== window.top) {{
-        // Intercept HubSpot's global object before it loads
-        window.hsConversationsSettings = {{ loadImmediately: false }};
-        window.hsConversationsOnReady = [];
-        // Block the loader
-        Object.defineProperty(window, 'HubSpotConversations', {{
-          get: function() {{ return {{ widget: {{ load: function(){{}}, remove: function(){{}} }} }}; }},
-          set: function() {{}}
-        }});
-      }}
-    </script>
-    <meta charset="UTF-8">
+{hubspot_head}    <meta charset="UTF-8">
     <meta name="viewport" content="width=device-width, initial-scale=1.0">
     <title>Bench2Cost Interactive Benchmark Explorer</title>
-    <script src="https://cdn.plot.ly/plotly-2.27.0.min.js"></script>
+    {plotly_script}
     <style>
         :root {{
             --bg-primary: #0D1117;
@@ -356,6 +568,96 @@ def generate_html(results: List[Dict], output_path: Path):
             margin-top: 0.75rem;
         }}
         
+        .predict-panel {{
+            margin-top: 0.75rem;
+            background: var(--bg-card);
+            border-radius: 6px;
+            padding: 0.75rem;
+            border: 1px solid var(--border-color);
+        }}
+        
+        .predict-panel h3 {{
+            font-size: 0.65rem;
+            color: var(--text-secondary);
+            text-transform: uppercase;
+            letter-spacing: 0.5px;
+            margin-bottom: 0.5rem;
+        }}
+        
+        .predict-panel input {{
+            width: 80px;
+            padding: 0.25rem 0.5rem;
+            border-radius: 4px;
+            border: 1px solid var(--border-color);
+            background: var(--bg-card);
+            color: var(--text-primary);
+            font-size: 0.7rem;
+        }}
+        
+        .predict-panel table {{
+            width: 100%;
+            margin-top: 0.5rem;
+            border-collapse: collapse;
+            font-size: 0.7rem;
+        }}
+        
+        .predict-panel th, .predict-panel td {{
+            text-align: left;
+            padding: 0.25rem 0.5rem;
+            border-bottom: 1px solid var(--border-color);
+        }}
+        
+        .drilldown-panel {{
+            margin-top: 0.75rem;
+            background: var(--bg-card);
+            border-radius: 6px;
+            padding: 0.75rem;
+            border: 1px solid var(--border-color);
+        }}
+        
+        .drilldown-panel h3 {{
+            font-size: 0.65rem;
+            color: var(--text-secondary);
+            text-transform: uppercase;
+            letter-spacing: 0.5px;
+            margin-bottom: 0.5rem;
+        }}
+        
+        .top-queries {{
+            font-size: 0.7rem;
+            margin-bottom: 0.5rem;
+            line-height: 1.5;
+        }}
+        
+        .query-table-scroll {{
+            height: 360px;
+            overflow-y: auto;
+            border: 1px solid var(--border-color);
+            border-radius: 4px;
+        }}
+        
+        .query-table-scroll table {{
+            width: 100%;
+            border-collapse: collapse;
+            font-size: 0.7rem;
+        }}
+        
+        .query-table-scroll th {{
+            position: sticky;
+            top: 0;
+            background: var(--bg-secondary);
+            cursor: pointer;
+            user-select: none;
+        }}
+        
+        .query-table-scroll th, .query-table-scroll td {{
+            text-align: left;
+            padding: 0 0.5rem;
+            height: 22px;
+            white-space: nowrap;
+            border-bottom: 1px solid var(--border-color);
+        }}
+        
         .stat-card {{
             background: var(--bg-card);
             border-radius: 6px;
@@ -436,15 +738,47 @@ def generate_html(results: List[Dict], output_path: Path):
                 </div>
             </div>
             
+            <div class="control-group">
+                <label>Nodes:</label>
+                <select id="nodeFilter"><option value="">Any</option></select>
+                <label>Memory:</label>
+                <select id="memoryFilter"><option value="">Any</option></select>
+            </div>
+            
             <div class="control-group chart-mode-group">
                 <label>View:</label>
                 <div class="toggle-group" id="viewToggle">
                     <button class="toggle-btn active" data-value="scatter">Scatter</button>
                     <button class="toggle-btn" data-value="bar">Bar</button>
                     <button class="toggle-btn" data-value="cost-perf">$/Perf</button>
+                    <button class="toggle-btn" data-value="efficiency">Efficiency</button>
+                    <button class="toggle-btn" data-value="drilldown">Per Query</button>
                 </div>
             </div>
             
+            <div class="control-group" id="drilldownGroup" style="display: none">
+                <label>Heatmap:</label>
+                <select id="drilldownMetric">
+                    <option value="share">Share of cost</option>
+                    <option value="cost">Cost ($)</option>
+                    <option value="best">Best runtime (s)</option>
+                    <option value="cold">Cold runtime (s)</option>
+                </select>
+            </div>
+            
+            <div class="control-group" id="efficiencyGroup" style="display: none">
+                <label>Efficiency:</label>
+                <select id="efficiencyMetric">
+                    <option value="bytes_per_sec">Bytes scanned / s</option>
+                    <option value="rows_per_sec">Rows scanned / s</option>
+                    <option value="rows_per_dollar">Rows scanned / $</option>
+                    <option value="bytes_per_dollar">Bytes scanned / $</option>
+                    <option value="cpu_per_gb">CPU-s per GB scanned</option>
+                    <option value="cache_hit">Cache hit</option>
+                    <option value="overhead">Queue + compile share</option>
+                </select>
+            </div>
+            
             <div class="control-group">
                 <label>Axis:</label>
                 <div class="toggle-group" id="logScaleToggle">
@@ -462,9 +796,35 @@ def generate_html(results: List[Dict], output_path: Path):
             <div id="chart"></div>
         </div>
         
+        <div class="drilldown-panel" id="drilldownPanel" style="display: none">
+            <h3>Most expensive queries</h3>
+            <div class="top-queries" id="topQueries"></div>
+            <div class="query-table-scroll" id="queryTableScroll">
+                <table>
+                    <thead><tr id="queryTableHead"></tr></thead>
+                    <tbody id="queryTableBody"></tbody>
+                </table>
+            </div>
+        </div>
+        
         <div class="stats-grid" id="statsGrid">
             <!-- Stats will be dynamically added here -->
         </div>
+        
+        <div class="predict-panel">
+            <h3>Predict at another size (log-log fit over all results, 95% prediction interval)</h3>
+            <div class="controls">
+                <div class="control-group">
+                    <label>Rows:</label>
+                    <input id="predictRows" type="text" value="35e9">
+                </div>
+                <div class="control-group">
+                    <label>Nodes:</label>
+                    <input id="predictNodes" type="text" value="12">
+                </div>
+            </div>
+            <div id="predictTable"></div>
+        </div>
     </div>
     
     <script>
@@ -474,11 +834,133 @@ def generate_html(results: List[Dict], output_path: Path):
         // Vendor colors
         const vendorColors = {json.dumps(vendor_colors)};
         
+        // Per-query log-log scaling fits by vendor (scaling_model.py)
+        const scalingModels = {json.dumps(scaling_models or {})};
+        
+        // Query service (query_server.py): '' when the page is served by it, ?api=<url> on a
+        // static page. Results of a scale are fetched on first use and replace the embedded
+        // ones; if the service is unreachable the embedded data is used.
+        const apiBase = {json.dumps(api_base)} ?? new URLSearchParams(window.location.search).get('api');
+        const loadedScales = new Set(apiBase === null ? benchmarkData.map(d => d.scale) : []);
+        
+        // Offline build (--offline): results and scaling models as gzip + base64, null otherwise
+        const packedPayload = {json.dumps(packed)};
+        
+        async function unpackPayload() {{
+            if (packedPayload === null) return;
+            const bytes = Uint8Array.from(atob(packedPayload), c => c.charCodeAt(0));
+            const stream = new Blob([bytes]).stream().pipeThrough(new DecompressionStream('gzip'));
+            const payload = JSON.parse(await new Response(stream).text());
+            benchmarkData.push(...payload.results);
+            Object.assign(scalingModels, payload.scaling_models);
+            if (apiBase === null) payload.results.forEach(d => loadedScales.add(d.scale));
+        }}
+        
+        async function apiGet(path) {{
+            const response = await fetch(apiBase.replace(/\/$/, '') + path);
+            if (!response.ok) throw new Error(`${{response.status}} ${{path}}`);
+            return response.json();
+        }}
+        
+        async function ensureScale(scale) {{
+            if (loadedScales.has(scale)) return;
+            try {{
+                const rows = await apiGet(`/api/results?scale=${{encodeURIComponent(scale)}}`);
+                for (let i = benchmarkData.length - 1; i >= 0; i--) {{
+                    if (benchmarkData[i].scale === scale) benchmarkData.splice(i, 1);
+                }}
+                benchmarkData.push(...rows);
+                indexConfigs(rows);
+            }} catch (e) {{
+                console.warn('Query service unavailable, using embedded data:', e);
+            }}
+            loadedScales.add(scale);
+        }}
+        
+        async function ensureModels() {{
+            if (apiBase === null || Object.keys(scalingModels).length > 0) return;
+            try {{
+                Object.assign(scalingModels, await apiGet('/api/models'));
+            }} catch (e) {{
+                console.warn('Scaling models unavailable:', e);
+            }}
+        }}
+        
         // State
         let selectedScale = '100B';
         let selectedView = 'scatter';
         let useLogScale = true;
         let activeVendors = [];
+        let selectedEfficiency = 'bytes_per_sec';
+        let selectedDrilldown = 'share';
+        let cardCounter = 0;
+        let nodeFilter = '';
+        let memoryFilter = '';
+        
+        // Config name -> display label from the config descriptors
+        const configLabels = new Map();
+        function indexConfigs(rows) {{
+            rows.forEach(d => configLabels.set(d.config, d.descriptor.label));
+        }}
+        indexConfigs(benchmarkData);
+        let queryRows = [];
+        let querySort = {{ key: 'share', desc: true }};
+        const QUERY_ROW_HEIGHT = 22;
+        
+        // Efficiency axes over the normalized metrics (metrics.py); value() is null when not collected
+        const efficiencyAxes = {{
+            bytes_per_sec: {{
+                label: 'Bytes scanned per second', higherIsBetter: true,
+                value: d => d.metrics.bytes_scanned != null ? d.metrics.bytes_scanned / d.runtime : null,
+                format: v => formatBytes(v) + '/s'
+            }},
+            rows_per_sec: {{
+                label: 'Rows scanned per second', higherIsBetter: true,
+                value: d => d.metrics.rows_scanned != null ? d.metrics.rows_scanned / d.runtime : null,
+                format: v => formatCount(v) + '/s'
+            }},
+            rows_per_dollar: {{
+                label: 'Rows scanned per dollar', higherIsBetter: true,
+                value: d => d.metrics.rows_scanned != null && d.cost > 0 ? d.metrics.rows_scanned / d.cost : null,
+                format: v => formatCount(v) + '/$'
+            }},
+            bytes_per_dollar: {{
+                label: 'Bytes scanned per dollar', higherIsBetter: true,
+                value: d => d.metrics.bytes_scanned != null && d.cost > 0 ? d.metrics.bytes_scanned / d.cost : null,
+                format: v => formatBytes(v) + '/$'
+            }},
+            cpu_per_gb: {{
+                label: 'CPU-seconds per GB scanned (BigQuery: slot-seconds)', higherIsBetter: false,
+                value: d => d.metrics.cpu_sec != null && d.metrics.bytes_scanned > 0
+                    ? d.metrics.cpu_sec / (d.metrics.bytes_scanned / 1e9) : null,
+                format: v => v.toFixed(2) + ' s/GB'
+            }},
+            cache_hit: {{
+                label: 'Share of scanned data served from cache', higherIsBetter: true,
+                value: d => d.metrics.cache_hit,
+                format: v => (v * 100).toFixed(0) + '%'
+            }},
+            overhead: {{
+                label: 'Queue + compile time share of runtime', higherIsBetter: false,
+                value: d => (d.metrics.queue_sec != null || d.metrics.compile_sec != null)
+                    ? ((d.metrics.queue_sec || 0) + (d.metrics.compile_sec || 0)) / d.runtime : null,
+                format: v => (v * 100).toFixed(1) + '%'
+            }}
+        }};
+        
+        function formatBytes(v) {{
+            const units = ['B', 'KB', 'MB', 'GB', 'TB', 'PB'];
+            let i = 0;
+            while (Math.abs(v) >= 1000 && i < units.length - 1) {{ v /= 1000; i++; }}
+            return `${{v.toFixed(i ? 1 : 0)}} ${{units[i]}}`;
+        }}
+        
+        function formatCount(v) {{
+            const units = ['', 'K', 'M', 'B', 'T'];
+            let i = 0;
+            while (Math.abs(v) >= 1000 && i < units.length - 1) {{ v /= 1000; i++; }}
+            return `${{v.toFixed(i ? 1 : 0)}}${{units[i]}}`;
+        }}
         
         // Default configurations per scale
         const scaleDefaults = {{
@@ -510,69 +992,68 @@ def generate_html(results: List[Dict], output_path: Path):
         
         // Initialize with all vendors using scale-specific defaults
         function initializeDefaults() {{
-            const defaultVendors = ['Firebolt', 'ClickHouse Cloud', 'Snowflake', 'Databricks', 'BigQuery', 'Redshift Serverless'];
-            defaultVendors.forEach(vendor => {{
+            addDefaultCards(['Firebolt', 'ClickHouse Cloud', 'Snowflake', 'Databricks', 'BigQuery', 'Redshift Serverless']);
+        }}
+        
+        // Vendors whose cards were dropped because nothing matched the scale or filters;
+        // they come back on the next reset that has configs for them
+        let hiddenVendors = [];
+        
+        // A card per vendor with the scale default, or the largest config passing the filters
+        function addDefaultCards(vendors) {{
+            hiddenVendors = [];
+            vendors.forEach(vendor => {{
                 const configs = getConfigsForVendor(vendor, selectedScale);
                 if (configs.length > 0) {{
                     const defaults = scaleDefaults[selectedScale]?.[vendor] || {{}};
-                    const config = defaults.config || configs[configs.length - 1];
+                    const config = configs.includes(defaults.config) ? defaults.config : configs[configs.length - 1];
                     const tier = defaults.tier || null;
                     addVendorCard(vendor, config, tier);
+                }} else {{
+                    hiddenVendors.push(vendor);
                 }}
             }});
         }}
         
-        // Get config size for sorting (larger = bigger number)
-        function getConfigSize(config) {{
-            const configLower = config.toLowerCase();
-            
-            // Handle node counts with suffix (e.g., "bench2cost_l_co_3n", "bench2cost_l_co_20n")
-            const nodeSuffixMatch = configLower.match(/(\\d+)n$/);
-            if (nodeSuffixMatch) {{
-                return parseInt(nodeSuffixMatch[1]) * 100;
-            }}
-            
-            // Handle ClickHouse configs (e.g., "aws.3.236.parallel_replicas", "aws.20.236.parallel_replicas")
-            const clickhouseMatch = configLower.match(/aws\\.(\\d+)\\./);
-            if (clickhouseMatch) {{
-                return parseInt(clickhouseMatch[1]) * 100;
-            }}
-            
-            // Handle node counts at start (e.g., "3n", "9n", "20n", "3.236 (PR)")
-            const nodeStartMatch = configLower.match(/^(\\d+)/);
-            if (nodeStartMatch) {{
-                return parseInt(nodeStartMatch[1]) * 100;
-            }}
-            
-            // Handle warehouse sizes - check from largest to smallest to avoid 'large' matching before '4xl'
-            const sizeOrder = [
-                ['4xl', 8], ['4x-large', 8], ['4xlarge', 8],
-                ['3xl', 7], ['3x-large', 7], ['3xlarge', 7],
-                ['2xl', 6], ['2x-large', 6], ['2xlarge', 6],
-                ['xl', 5], ['xlarge', 5], ['x-large', 5],
-                ['large', 4],
-                ['medium', 3],
-                ['small', 2],
-                ['xs', 1], ['extra-small', 1]
-            ];
-            
-            for (const [key, value] of sizeOrder) {{
-                if (configLower.includes(key)) {{
-                    return value;
-                }}
-            }}
-            
-            return 0;
+        // Rebuild the cards after a scale or filter change, keeping the selected vendors
+        function resetCards() {{
+            const vendors = [...new Set([...activeVendors.map(v => v.vendor), ...hiddenVendors])];
+            document.getElementById('vendorCards').innerHTML = '';
+            activeVendors = [];
+            addDefaultCards(vendors);
+            updateChart();
+        }}
+        
+        // Configs without a node count or memory size (serverless) match every filter
+        function passesFilters(d) {{
+            const nodes = d.descriptor.nodes, memory = d.descriptor.memory_gib;
+            return (nodeFilter === '' || nodes == null || nodes === Number(nodeFilter)) &&
+                (memoryFilter === '' || memory == null || memory === Number(memoryFilter));
+        }}
+        
+        // Filter options from the configs of the selected scale; a vanished selection resets to Any
+        function populateFilters() {{
+            const rows = benchmarkData.filter(d => d.scale === selectedScale);
+            const fill = (id, key, current, unit) => {{
+                const options = [...new Set(rows.map(d => d.descriptor[key]).filter(v => v != null))].sort((a, b) => a - b);
+                setHTML(id, '<option value="">Any</option>' + options.map(v => `<option value="${{v}}">${{v}}${{unit}}</option>`).join(''));
+                const value = options.map(String).includes(current) ? current : '';
+                document.getElementById(id).value = value;
+                return value;
+            }};
+            nodeFilter = fill('nodeFilter', 'nodes', nodeFilter, '');
+            memoryFilter = fill('memoryFilter', 'memory_gib', memoryFilter, ' GiB');
         }}
         
         // Get available configurations for a vendor at a given scale (sorted by size)
         function getConfigsForVendor(vendor, scale) {{
             return benchmarkData
-                .filter(d => d.vendor === vendor && d.scale === scale)
-                .map(d => d.config)
+                .filter(d => d.vendor === vendor && d.scale === scale && passesFilters(d))
                 // Filter out Firebolt 1-node config
-                .filter(c => !c.match(/bench2cost_l_co_1n/))
-                .sort((a, b) => getConfigSize(a) - getConfigSize(b));
+                .filter(d => !d.config.match(/bench2cost_l_co_1n/))
+                // size_rank comes from generate_visualization.config_size_rank
+                .sort((a, b) => a.descriptor.size_rank - b.descriptor.size_rank)
+                .map(d => d.config);
         }}
         
         // Get tiers for a vendor/config/scale combination
@@ -592,7 +1073,8 @@ def generate_html(results: List[Dict], output_path: Path):
             const tiers = getTiersForConfig(vendor, config, selectedScale);
             tier = tier || (tiers.length > 0 ? tiers[0] : null);
             
-            const vendorId = `vendor-${{Date.now()}}`;
+            // Also the uid of the card's scatter trace, so it must be unique (cards are added in bursts)
+            const vendorId = `vendor-${{++cardCounter}}`;
             const color = vendorColors[vendor] || '#888';
             
             activeVendors.push({{
@@ -628,33 +1110,9 @@ def generate_html(results: List[Dict], output_path: Path):
             updateChart();
         }}
         
-        // Format config name for display
+        // Display name of a config (generate_visualization.config_label)
         function formatConfigName(config) {{
-            // Handle Firebolt configs: bench2cost_xl_co_3n -> XL CO 3 nodes
-            const fireboltXLMatch = config.match(/bench2cost_xl_co_(\\d+)n/);
-            if (fireboltXLMatch) {{
-                return `XL CO ${{fireboltXLMatch[1]}} nodes`;
-            }}
-            
-            // Handle Firebolt configs: bench2cost_l_co_3n -> L CO 3 nodes
-            const fireboltLMatch = config.match(/bench2cost_l_co_(\\d+)n/);
-            if (fireboltLMatch) {{
-                return `L CO ${{fireboltLMatch[1]}} nodes`;
-            }}
-            
-            // Handle ClickHouse configs: aws.3.236.parallel_replicas -> 3 nodes
-            const clickhouseMatch = config.match(/aws\\.(\\d+)\\..*parallel_replicas/);
-            if (clickhouseMatch) {{
-                return `${{clickhouseMatch[1]}} nodes`;
-            }}
-            
-            return config
-                .replace('bench2cost_l_co_', '')
-                .replace('_enriched', '')
-                .replace('aws.', '')
-                .replace('.parallel_replicas', ' (PR)')
-                .replace('clickbench_', '')
-                .replace('result_', '');
+            return configLabels.get(config) ?? config;
         }}
         
         // Remove a vendor card
@@ -707,37 +1165,93 @@ def generate_html(results: List[Dict], output_path: Path):
                 tier: tier,
                 runtime: data.runtime,
                 cost: tierData.compute_cost,
+                load_cost: tierData.load_cost || 0,
+                load_time: data.load_time || 0,
                 system: data.system,
                 machine: data.machine,
-                cluster_size: data.cluster_size
+                cluster_size: data.cluster_size,
+                cheapest_models: data.cheapest_models || [],
+                metrics: data.metrics || {{}},
+                source: data
             }};
         }}
         
-        // Update the chart
+        // Card edits only schedule a render; everything changed before the next frame is drawn once
+        let chartFrame = null;
         function updateChart() {{
+            if (chartFrame === null) {{
+                chartFrame = requestAnimationFrame(() => {{
+                    chartFrame = null;
+                    renderChart();
+                }});
+            }}
+        }}
+        
+        // Figure currently on screen: a new view (or scale/axis type) gets a fresh plot,
+        // anything else is diffed by Plotly.react against the previous figure
+        let renderedFigure = null;
+        function drawChart(traces, layout) {{
+            const figure = `${{selectedView}}|${{selectedScale}}|${{useLogScale}}`;
+            if (figure !== renderedFigure) {{
+                renderedFigure = figure;
+                Plotly.newPlot('chart', traces, layout, {{ responsive: true }});
+                return;
+            }}
+            // Keep zoom/pan across updates; animate points that moved (scatter only supports it)
+            layout.uirevision = figure;
+            if (selectedView === 'scatter') {{
+                layout.transition = {{ duration: 300, easing: 'cubic-in-out' }};
+            }}
+            Plotly.react('chart', traces, layout, {{ responsive: true }});
+        }}
+        
+        // Last HTML written per element; unchanged sections are not re-parsed
+        const renderedHTML = {{}};
+        function setHTML(id, html) {{
+            if (renderedHTML[id] === html) return;
+            renderedHTML[id] = html;
+            document.getElementById(id).innerHTML = html;
+        }}
+        
+        // Render the selected view from the current cards
+        function renderChart() {{
             const dataPoints = activeVendors
-                .map(v => getDataPoint(v.vendor, v.config, v.tier, selectedScale))
+                .map(v => {{
+                    const d = getDataPoint(v.vendor, v.config, v.tier, selectedScale);
+                    return d && {{ ...d, id: v.id }};
+                }})
                 .filter(d => d !== null);
             
+            document.getElementById('chart').style.height = '';
+            document.getElementById('drilldownPanel').style.display = 'none';
             if (dataPoints.length === 0) {{
                 Plotly.purge('chart');
+                renderedFigure = null;
+                updateStats(dataPoints);
+                renderPredictions();
                 return;
             }}
             
-            if (selectedView === 'scatter') {{
+            if (selectedView === 'drilldown') {{
+                renderDrilldown(dataPoints);
+            }} else if (selectedView === 'scatter') {{
                 renderScatterPlot(dataPoints);
             }} else if (selectedView === 'bar') {{
                 renderBarChart(dataPoints);
+            }} else if (selectedView === 'efficiency') {{
+                renderEfficiencyChart(dataPoints);
             }} else {{
                 renderCostPerfChart(dataPoints);
             }}
             
             updateStats(dataPoints);
+            renderPredictions();
         }}
         
         // Render scatter plot
         function renderScatterPlot(dataPoints) {{
             const traces = dataPoints.map(d => ({{
+                uid: d.id,
                 x: [d.runtime],
                 y: [d.cost],
                 mode: 'markers+text',
@@ -761,7 +1275,9 @@ def generate_html(results: List[Dict], output_path: Path):
                     `Config: ${{(d.vendor === 'BigQuery' || d.vendor === 'Redshift Serverless') ? 'Serverless' : formatConfigName(d.config)}}<br>` +
                     `Tier: ${{d.tier}}<br>` +
                     `Runtime: %{{x:.2f}}s<br>` +
-                    `Cost: $%{{y:.4f}}<extra></extra>`
+                    `Cost: $%{{y:.4f}}<br>` +
+                    (d.load_time ? `Load: ${{d.load_time.toFixed(0)}}s, $${{d.load_cost.toFixed(2)}}` : 'Load: not measured') +
+                    `<extra></extra>`
             }}));
             
             const layout = {{
@@ -793,7 +1309,7 @@ def generate_html(results: List[Dict], output_path: Path):
                 margin: {{ t: 50, b: 80, l: 80, r: 30 }}
             }};
             
-            Plotly.newPlot('chart', traces, layout, {{ responsive: true }});
+            drawChart(traces, layout);
         }}
         
         // Render bar chart
@@ -814,6 +1330,7 @@ def generate_html(results: List[Dict], output_path: Path):
                 x: sortedByScore.map(d => d.cost),
                 type: 'bar',
                 orientation: 'h',
+                uid: 'cost',
                 name: 'Compute Cost ($)',
                 marker: {{
                     color: '#F7E655'  // Yellow color like ClickHouse chart
@@ -830,6 +1347,7 @@ def generate_html(results: List[Dict], output_path: Path):
                 x: sortedByScore.map(d => d.runtime),
                 type: 'bar',
                 orientation: 'h',
+                uid: 'runtime',
                 name: 'Performance (s)',
                 marker: {{
                     color: '#888888'  // Gray color like ClickHouse chart
@@ -887,7 +1405,7 @@ def generate_html(results: List[Dict], output_path: Path):
                 }}
             }};
             
-            Plotly.newPlot('chart', [costTrace, runtimeTrace], layout, {{ responsive: true }});
+            drawChart([costTrace, runtimeTrace], layout);
         }}
         
         // Render cost-performance chart
@@ -906,6 +1424,7 @@ def generate_html(results: List[Dict], output_path: Path):
             const sorted = scored.sort((a, b) => a.relative - b.relative);
             
             const trace = {{
+                uid: 'cost-perf',
                 x: sorted.map(d => `${{d.vendor}}<br>${{formatConfigName(d.config)}}`),
                 y: sorted.map(d => d.relative),
                 type: 'bar',
@@ -941,15 +1460,217 @@ def generate_html(results: List[Dict], output_path: Path):
                 margin: {{ t: 50, b: 120, l: 80, r: 30 }}
             }};
             
-            Plotly.newPlot('chart', [trace], layout, {{ responsive: true }});
+            drawChart([trace], layout);
+        }}
+        
+        // Render efficiency chart (normalized resource metrics per second / per dollar)
+        function renderEfficiencyChart(dataPoints) {{
+            const axis = efficiencyAxes[selectedEfficiency];
+            const withValue = dataPoints
+                .map(d => ({{ ...d, value: axis.value(d) }}))
+                .filter(d => d.value != null && isFinite(d.value));
+            const missing = dataPoints.filter(d => !withValue.includes(d) && axis.value(d) == null);
+            const sorted = withValue.sort((a, b) => axis.higherIsBetter ? b.value - a.value : a.value - b.value);
+            
+            const trace = {{
+                uid: 'efficiency',
+                x: sorted.map(d => `${{d.vendor}}<br>${{formatConfigName(d.config)}}`),
+                y: sorted.map(d => d.value),
+                type: 'bar',
+                marker: {{
+                    color: sorted.map(d => vendorColors[d.vendor] || '#888')
+                }},
+                text: sorted.map(d => axis.format(d.value)),
+                textposition: 'outside',
+                textfont: {{ color: '#E6EDF3' }},
+                hovertemplate: '<b>%{{x}}</b><br>%{{text}}<extra></extra>'
+            }};
+            
+            const layout = {{
+                title: {{
+                    text: `${{axis.label}} (${{selectedScale}} rows) — ${{axis.higherIsBetter ? 'higher' : 'lower'}} is better`,
+                    font: {{ color: '#E6EDF3', size: 16 }}
+                }},
+                xaxis: {{
+                    gridcolor: '#30363D',
+                    linecolor: '#30363D',
+                    tickfont: {{ color: '#8B949E' }}
+                }},
+                yaxis: {{
+                    title: axis.label,
+                    type: useLogScale ? 'log' : 'linear',
+                    gridcolor: '#30363D',
+                    linecolor: '#30363D',
+                    tickfont: {{ color: '#8B949E' }},
+                    titlefont: {{ color: '#8B949E' }}
+                }},
+                annotations: missing.length ? [{{
+                    text: 'Not collected: ' + missing.map(d => `${{d.vendor}} ${{formatConfigName(d.config)}}`).join(', '),
+                    xref: 'paper', yref: 'paper', x: 0, y: -0.35, showarrow: false,
+                    font: {{ color: '#8B949E', size: 10 }}, xanchor: 'left'
+                }}] : [],
+                paper_bgcolor: '#161B22',
+                plot_bgcolor: '#161B22',
+                showlegend: false,
+                margin: {{ t: 50, b: 140, l: 80, r: 30 }}
+            }};
+            
+            drawChart([trace], layout);
+        }}
+        
+        // Per-query arrays are shipped as base64 float32 (generate_visualization.pack_floats),
+        // little-endian like every browser platform; NaN marks a failed or missing query
+        function unpackFloats(packed) {{
+            const bytes = Uint8Array.from(atob(packed), c => c.charCodeAt(0));
+            return new Float32Array(bytes.buffer);
+        }}
+        
+        // Decoded once per result and kept on it
+        function queryArrays(data) {{
+            if (!data.queries) return null;
+            if (!data._queries) {{
+                const costs = {{}};
+                Object.entries(data.queries.costs).forEach(([tier, packed]) => {{ costs[tier] = unpackFloats(packed); }});
+                data._queries = {{ best: unpackFloats(data.queries.best), cold: unpackFloats(data.queries.cold), costs: costs }};
+            }}
+            return data._queries;
+        }}
+        
+        // Per-query values of one selected card: best/cold runtime, cost and share of the card's cost
+        function querySeries(d) {{
+            const arrays = queryArrays(d.source);
+            if (!arrays || !arrays.costs[d.tier]) return null;
+            const cost = arrays.costs[d.tier];
+            const total = cost.reduce((sum, c) => isNaN(c) ? sum : sum + c, 0);
+            return {{
+                label: `${{d.vendor}} ${{formatConfigName(d.config)}} · ${{d.tier}}`,
+                best: arrays.best,
+                cold: arrays.cold,
+                cost: cost,
+                share: cost.map(c => total > 0 ? c / total : NaN)
+            }};
+        }}
+        
+        const drilldownFormats = {{
+            share: v => (v * 100).toFixed(1) + '%',
+            cost: v => '$' + v.toFixed(4),
+            best: v => v.toFixed(3) + 's',
+            cold: v => v.toFixed(3) + 's'
+        }};
+        
+        // Vendor x query heatmap, top queries per card and the per-query table
+        function renderDrilldown(dataPoints) {{
+            const cards = dataPoints.map(d => ({{ ...d, series: querySeries(d) }})).filter(d => d.series);
+            const queryCount = Math.max(0, ...cards.map(d => d.series.best.length));
+            const metric = selectedDrilldown;
+            const format = drilldownFormats[metric];
+            const logColor = useLogScale && metric !== 'share';
+            const queries = Array.from({{ length: queryCount }}, (_, q) => `Q${{q}}`);
+            const value = (d, q) => q < d.series[metric].length && !isNaN(d.series[metric][q]) ? d.series[metric][q] : null;
+            
+            const trace = {{
+                uid: 'drilldown',
+                type: 'heatmap',
+                x: queries,
+                y: cards.map(d => d.series.label),
+                z: cards.map(d => queries.map((_, q) => {{
+                    const v = value(d, q);
+                    return v === null ? null : (logColor ? Math.log10(Math.max(v, 1e-9)) : v);
+                }})),
+                text: cards.map(d => queries.map((_, q) => {{
+                    const v = value(d, q);
+                    return v === null ? 'failed' : format(v);
+                }})),
+                colorscale: 'YlOrRd',
+                reversescale: true,
+                colorbar: {{
+                    title: {{ text: (logColor ? 'log10 ' : '') + document.querySelector(`#drilldownMetric option[value="${{metric}}"]`).textContent, side: 'right' }},
+                    tickfont: {{ color: '#8B949E' }},
+                    titlefont: {{ color: '#8B949E' }}
+                }},
+                hovertemplate: '<b>%{{y}}</b><br>%{{x}}: %{{text}}<extra></extra>'
+            }};
+            
+            const height = Math.max(400, 120 + cards.length * 24);
+            document.getElementById('chart').style.height = `${{height}}px`;
+            const layout = {{
+                title: {{
+                    text: `Per-query ${{trace.colorbar.title.text.toLowerCase()}} (${{selectedScale}} rows)`,
+                    font: {{ color: '#E6EDF3', size: 16 }}
+                }},
+                xaxis: {{ tickfont: {{ color: '#8B949E', size: 9 }}, gridcolor: '#30363D' }},
+                yaxis: {{ tickfont: {{ color: '#E6EDF3', size: 10 }}, automargin: true, autorange: 'reversed' }},
+                paper_bgcolor: '#161B22',
+                plot_bgcolor: '#161B22',
+                margin: {{ t: 50, b: 40, l: 80, r: 30 }},
+                height: height
+            }};
+            drawChart([trace], layout);
+            
+            document.getElementById('drilldownPanel').style.display = '';
+            setHTML('topQueries', cards.map(d => {{
+                const top = Array.from(d.series.cost.keys())
+                    .filter(q => !isNaN(d.series.cost[q]))
+                    .sort((a, b) => d.series.cost[b] - d.series.cost[a])
+                    .slice(0, 3)
+                    .map(q => `Q${{q}} ${{drilldownFormats.share(d.series.share[q])}} (${{drilldownFormats.cost(d.series.cost[q])}})`);
+                return `<div><span style="color: ${{vendorColors[d.vendor] || '#888'}}">${{d.series.label}}</span>: ${{top.join(' · ')}}</div>`;
+            }}).join(''));
+            
+            queryRows = cards.flatMap(d => queries.map((_, q) => ({{
+                card: d.series.label,
+                color: vendorColors[d.vendor] || '#888',
+                q: q,
+                best: q < d.series.best.length ? d.series.best[q] : NaN,
+                cold: q < d.series.cold.length ? d.series.cold[q] : NaN,
+                cost: q < d.series.cost.length ? d.series.cost[q] : NaN,
+                share: q < d.series.share.length ? d.series.share[q] : NaN
+            }})));
+            sortQueryRows();
+        }}
+        
+        const queryColumns = [
+            ['card', 'Card'], ['q', 'Query'], ['best', 'Best s'], ['cold', 'Cold s'], ['cost', 'Cost $'], ['share', 'Share']
+        ];
+        
+        // Missing values sort last in both directions
+        function sortQueryRows() {{
+            const {{ key, desc }} = querySort;
+            queryRows.sort((a, b) => {{
+                const x = a[key], y = b[key];
+                if (typeof x === 'number' && (isNaN(x) || isNaN(y))) return isNaN(x) - isNaN(y);
+                const order = x < y ? -1 : x > y ? 1 : 0;
+                return desc ? -order : order;
+            }});
+            document.getElementById('queryTableHead').innerHTML = queryColumns.map(([k, label]) =>
+                `<th data-key="${{k}}">${{label}}${{k === key ? (desc ? ' ▼' : ' ▲') : ''}}</th>`
+            ).join('');
+            const scroll = document.getElementById('queryTableScroll');
+            scroll.scrollTop = 0;
+            renderQueryRows();
+        }}
+        
+        // Only the rows in view (plus a margin) are in the DOM; spacer rows keep the scroll height
+        function renderQueryRows() {{
+            const scroll = document.getElementById('queryTableScroll');
+            const first = Math.max(0, Math.floor(scroll.scrollTop / QUERY_ROW_HEIGHT) - 10);
+            const last = Math.min(queryRows.length, first + Math.ceil(scroll.clientHeight / QUERY_ROW_HEIGHT) + 20);
+            const cell = (v, f) => isNaN(v) ? '<td>failed</td>' : `<td>${{f(v)}}</td>`;
+            const spacer = rows => rows > 0 ? `<tr style="height: ${{rows * QUERY_ROW_HEIGHT}}px"><td colspan="${{queryColumns.length}}" style="border: none; padding: 0"></td></tr>` : '';
+            document.getElementById('queryTableBody').innerHTML = spacer(first) + queryRows.slice(first, last).map(r => `<tr>
+                    <td style="color: ${{r.color}}">${{r.card}}</td>
+                    <td>Q${{r.q}}</td>
+                    ${{cell(r.best, v => v.toFixed(3))}}
+                    ${{cell(r.cold, v => v.toFixed(3))}}
+                    ${{cell(r.cost, v => v.toFixed(6))}}
+                    ${{cell(r.share, drilldownFormats.share)}}
+                </tr>`).join('') + spacer(queryRows.length - last);
         }}
         
         // Update stats
         function updateStats(dataPoints) {{
-            const statsGrid = document.getElementById('statsGrid');
-            
             if (dataPoints.length === 0) {{
-                statsGrid.innerHTML = '';
+                setHTML('statsGrid', '');
                 return;
             }}
             
@@ -959,7 +1680,7 @@ def generate_html(results: List[Dict], output_path: Path):
                 (a.runtime * a.cost) < (b.runtime * b.cost) ? a : b
             );
             
-            statsGrid.innerHTML = `
+            setHTML('statsGrid', `
                 <div class="stat-card">
                     <h3>Fastest Runtime</h3>
                     <div class="stat-value" style="color: ${{vendorColors[fastestByRuntime.vendor]}}">${{fastestByRuntime.runtime.toFixed(2)}}s</div>
@@ -975,9 +1696,98 @@ def generate_html(results: List[Dict], output_path: Path):
                     <div class="stat-value" style="color: ${{vendorColors[bestCostPerf.vendor]}}">1.0×</div>
                     <div class="stat-vendor">${{bestCostPerf.vendor}} (${{formatConfigName(bestCostPerf.config)}})</div>
                 </div>
+            ` + dataPoints.filter(d => d.cheapest_models.length > 0).map(renderPricingModelCard).join(''));
+        }}
+
+        // Per-query cheapest pricing model (bigquery/analyze_pricing.py --write)
+        function renderPricingModelCard(d) {{
+            const counts = {{}};
+            d.cheapest_models.forEach(m => {{ if (m) counts[m] = (counts[m] || 0) + 1; }});
+            const summary = Object.entries(counts)
+                .sort((a, b) => b[1] - a[1])
+                .map(([model, n]) => `${{model}}: ${{n}}`)
+                .join(' · ');
+            const perQuery = d.cheapest_models.map((m, i) => `Q${{i}}: ${{m || 'failed'}}`).join('\\n');
+            return `
+                <div class="stat-card" title="${{perQuery}}">
+                    <h3>Cheapest Pricing Model</h3>
+                    <div class="stat-value" style="color: ${{vendorColors[d.vendor]}}; font-size: 0.8rem">${{summary}}</div>
+                    <div class="stat-vendor">${{d.vendor}} (${{formatConfigName(d.config)}}) — per query, hover for details</div>
+                </div>
             `;
         }}
         
+        // Prediction with a 95% interval for one fit (mirrors scaling_model.predict_fit)
+        function predictFit(fit, x0) {{
+            if (!fit) return null;
+            const mid = fit.beta.reduce((sum, b, i) => sum + b * x0[i], 0);
+            if (fit.t === null) return {{ mid: Math.exp(mid), lo: null, hi: null }};  // too few points
+            let leverage = 0;
+            x0.forEach((xa, a) => x0.forEach((xb, b) => {{ leverage += xa * fit.cov[a][b] * xb; }}));
+            const half = fit.t * fit.s * Math.sqrt(1 + leverage);
+            return {{ mid: Math.exp(mid), lo: Math.exp(mid - half), hi: Math.exp(mid + half) }};
+        }}
+        
+        function sumPredictions(preds) {{
+            const known = preds.filter(p => p !== null);
+            const bounded = known.length > 0 && known.every(p => p.lo !== null);
+            return {{
+                mid: known.reduce((s, p) => s + p.mid, 0),
+                lo: bounded ? known.reduce((s, p) => s + p.lo, 0) : null,
+                hi: bounded ? known.reduce((s, p) => s + p.hi, 0) : null,
+                missing: preds.length - known.length
+            }};
+        }}
+        
+        function formatRange(p, digits) {{
+            if (p.lo === null) return p.mid.toFixed(digits);
+            return `${{p.mid.toFixed(digits)}} <span style="color: var(--text-secondary)">[${{p.lo.toFixed(digits)}}–${{p.hi.toFixed(digits)}}]</span>`;
+        }}
+        
+        // Predicted totals for the selected vendors (all modelled vendors if none)
+        function renderPredictions() {{
+            const rows = parseFloat(document.getElementById('predictRows').value);
+            const nodes = parseFloat(document.getElementById('predictNodes').value);
+            if (!(rows > 0)) {{
+                setHTML('predictTable', '');
+                return;
+            }}
+            const selected = activeVendors.length > 0 ? activeVendors : Object.keys(scalingModels).map(v => ({{ vendor: v, tier: null }}));
+            const seen = new Set();
+            const body = selected.filter(v => scalingModels[v.vendor] && !seen.has(v.vendor) && seen.add(v.vendor)).map(v => {{
+                const model = scalingModels[v.vendor];
+                const usesNodes = model.features.includes('log_nodes');
+                if (usesNodes && !(nodes > 0)) return '';
+                const x0 = [1, Math.log(rows)].concat(usesNodes ? [Math.log(nodes)] : []);
+                const runtime = sumPredictions(model.runtime.map(f => predictFit(f, x0)));
+                const tiers = Object.keys(model.costs);
+                // Billing variants ("<tier> (isolated)") are not fitted; predict their base tier
+                const baseTier = v.tier ? v.tier.replace(/ \((isolated|session)\)$/, '') : null;
+                const tier = !v.tier ? tiers[0] : (tiers.includes(baseTier) ? baseTier : null);
+                const cost = tier ? sumPredictions(model.costs[tier].map(f => predictFit(f, x0))) : null;
+                const outside = rows < model.rows_range[0] || rows > model.rows_range[1] ||
+                    (usesNodes && (nodes < model.nodes_range[0] || nodes > model.nodes_range[1]));
+                const notes = [
+                    outside ? 'extrapolated' : '',
+                    runtime.missing ? `${{runtime.missing}} queries unfitted` : '',
+                    runtime.missing < model.runtime.length && runtime.lo === null ? 'insufficient points for a 95% PI' : '',
+                    v.tier && tier && tier !== v.tier ? `${{v.tier}} predicted at ${{tier}} billing` : ''
+                ].filter(n => n).join(', ');
+                return `<tr>
+                    <td style="color: ${{vendorColors[v.vendor]}}">${{v.vendor}}</td>
+                    <td>${{usesNodes ? nodes : 'n/a'}}</td>
+                    <td>${{formatRange(runtime, 2)}} s</td>
+                    <td>${{tier || '-'}}</td>
+                    <td>${{cost ? '$' + formatRange(cost, 4) : '-'}}</td>
+                    <td>${{notes}}</td>
+                </tr>`;
+            }}).join('');
+            setHTML('predictTable', `<table>
+                <tr><th>Vendor</th><th>Nodes</th><th>Runtime</th><th>Tier</th><th>Cost</th><th></th></tr>
+                ${{body}}
+            </table>`);
+        }}
+        
         // Event Listeners
         document.getElementById('addVendor').addEventListener('change', function() {{
             if (this.value) {{
@@ -986,25 +1796,17 @@ def generate_html(results: List[Dict], output_path: Path):
             }}
         }});
         
-        document.getElementById('scaleToggle').addEventListener('click', function(e) {{
+        document.getElementById('scaleToggle').addEventListener('click', async function(e) {{
             if (e.target.classList.contains('toggle-btn')) {{
                 this.querySelectorAll('.toggle-btn').forEach(btn => btn.classList.remove('active'));
                 e.target.classList.add('active');
                 selectedScale = e.target.dataset.value;
+                await ensureScale(selectedScale);
+                if (selectedScale !== e.target.dataset.value) return;  // superseded by a later click
                 
                 // Refresh vendor cards with new scale options using scale-specific defaults
-                const currentVendors = activeVendors.map(v => v.vendor);
-                document.getElementById('vendorCards').innerHTML = '';
-                activeVendors = [];
-                currentVendors.forEach(vendor => {{
-                    const configs = getConfigsForVendor(vendor, selectedScale);
-                    if (configs.length > 0) {{
-                        const defaults = scaleDefaults[selectedScale]?.[vendor] || {{}};
-                        const config = defaults.config || configs[configs.length - 1];
-                        const tier = defaults.tier || null;
-                        addVendorCard(vendor, config, tier);
-                    }}
-                }});
+                populateFilters();
+                resetCards();
             }}
         }});
         
@@ -1013,10 +1815,52 @@ def generate_html(results: List[Dict], output_path: Path):
                 this.querySelectorAll('.toggle-btn').forEach(btn => btn.classList.remove('active'));
                 e.target.classList.add('active');
                 selectedView = e.target.dataset.value;
+                document.getElementById('efficiencyGroup').style.display = selectedView === 'efficiency' ? '' : 'none';
+                document.getElementById('drilldownGroup').style.display = selectedView === 'drilldown' ? '' : 'none';
                 updateChart();
             }}
         }});
         
+        document.getElementById('nodeFilter').addEventListener('change', function() {{
+            nodeFilter = this.value;
+            resetCards();
+        }});
+        
+        document.getElementById('memoryFilter').addEventListener('change', function() {{
+            memoryFilter = this.value;
+            resetCards();
+        }});
+        
+        document.getElementById('drilldownMetric').addEventListener('change', function() {{
+            selectedDrilldown = this.value;
+            updateChart();
+        }});
+        
+        document.getElementById('queryTableHead').addEventListener('click', function(e) {{
+            const key = e.target.dataset.key;
+            if (!key) return;
+            querySort = {{ key: key, desc: querySort.key === key ? !querySort.desc : key !== 'card' && key !== 'q' }};
+            sortQueryRows();
+        }});
+        
+        let queryScrollFrame = null;
+        document.getElementById('queryTableScroll').addEventListener('scroll', function() {{
+            if (queryScrollFrame === null) {{
+                queryScrollFrame = requestAnimationFrame(() => {{
+                    queryScrollFrame = null;
+                    renderQueryRows();
+                }});
+            }}
+        }});
+        
+        document.getElementById('predictRows').addEventListener('input', renderPredictions);
+        document.getElementById('predictNodes').addEventListener('input', renderPredictions);
+        
+        document.getElementById('efficiencyMetric').addEventListener('change', function() {{
+            selectedEfficiency = this.value;
+            updateChart();
+        }});
+        
         document.getElementById('logScaleToggle').addEventListener('click', function(e) {{
             if (e.target.classList.contains('toggle-btn')) {{
                 this.querySelectorAll('.toggle-btn').forEach(btn => btn.classList.remove('active'));
@@ -1027,67 +1871,173 @@ def generate_html(results: List[Dict], output_path: Path):
         }});
         
         // Initialize
-        initializeDefaults();
-    </script>
-    
-    <script>
-      if (window.self !== window.top) {{
-        // Aggressive continuous hiding
-        function nukeHubSpot() {{
-          // Remove all HubSpot elements
-          document.querySelectorAll('[id*="hubspot"], [class*="hubspot"], iframe[src*="hubspot"]').forEach(el => {{
-            el.parentNode && el.parentNode.removeChild(el);
-          }});
-          
-          // Remove HubSpot scripts
-          document.querySelectorAll('script[src*="hs-scripts"], script[src*="hubspot"]').forEach(script => {{
-            script.parentNode && script.parentNode.removeChild(script);
-          }});
-        }}
-        
-        // Run immediately and continuously
-        nukeHubSpot();
-        setInterval(nukeHubSpot, 100); // Check every 100ms
-        
-        // Also use MutationObserver
-        new MutationObserver(nukeHubSpot).observe(document.documentElement, {{
-          childList: true,
-          subtree: true
+        unpackPayload().then(() => Promise.all([ensureScale(selectedScale), ensureModels()])).then(() => {{
+            indexConfigs(benchmarkData);
+            populateFilters();
+            initializeDefaults();
         }});
-      }}
     </script>
-
-    <style>
-      /* Nuclear CSS option */
-      [id*="hubspot"],
-      [class*="hubspot"],
-      iframe[src*="hubspot"] {{
-        display: none !important;
-        visibility: hidden !important;
-        pointer-events: none !important;
-        position: absolute !important;
-        left: -9999px !important;
-      }}
-    </style>
-</body>
+    
+{hubspot_tail}</body>
 </html>
 '''
-    
-    with open(output_path, 'w') as f:
-        f.write(html)
-    
+    return html
+
+def write_atomic(output_path: Path, content: str):
+    """Write via a temporary file in the same directory so readers never see a partial page."""
+    fd, tmp = tempfile.mkstemp(dir=output_path.parent, prefix=f'.{output_path.name}.', suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'w') as f:
+            f.write(content)
+        os.chmod(tmp, 0o644)
+        os.replace(tmp, output_path)
+    except BaseException:
+        os.unlink(tmp)
+        raise
+
+def generate_html(results: List[Dict], output_path: Path, scaling_models: Dict[str, Any] = None,
+                  plotly_bundle: Optional[str] = None):
+    """Generate the interactive HTML visualization (self-contained when plotly_bundle is given)."""
+    with span('render', results=len(results)) as s:
+        html = render_html(results, scaling_models, plotly_bundle=plotly_bundle)
+        s.set(bytes=len(html))
+    with span('write'):
+        write_atomic(output_path, html)
     print(f"Generated visualization at: {output_path}")
 
+def fit_models(base_dir: Path, vendor_names: List[str], only: Optional[List[str]] = None) -> Dict[str, Any]:
+    """Scaling fits keyed by explorer vendor name; `only` limits fitting to those vendors."""
+    with span('fit', vendors=only):
+        fitted = fit_all(base_dir, only)
+    return {
+        name: model
+        for prefix, model in fitted.items()
+        for name in vendor_names if name.startswith(prefix)
+    }
+
+def file_signature(path: Path) -> Optional[Tuple[int, int]]:
+    try:
+        stat = path.stat()
+    except FileNotFoundError:
+        return None
+    return stat.st_mtime_ns, stat.st_size
+
+def watch(base_dir: Path, output_path: Path, interval: float, debounce: float,
+          plotly_bundle: Optional[str] = None):
+    """Rebuild the page whenever result files change, re-extracting only those files."""
+    points = {}       # path -> data point
+    signatures = {}   # path -> (mtime_ns, size) when last seen
+    sources = {}      # path -> (vendor, scale)
+    pending = set()
+    last_change = 0.0
+    models = {}
+
+    def extract(path: Path) -> bool:
+        vendor_name, scale = sources[path]
+        try:
+            result_data = load_result(vendor_name, path)
+            with span('extract', vendor=vendor_name, scale=scale, config=path.stem):
+                points[path] = extract_data_point(result_data, scale, vendor_name, path.stem)
+            return True
+        except Exception as e:
+            # Most likely still being written; its next write changes the signature again
+            print(f"⚠️  {path}: {e}", file=sys.stderr)
+            return False
+
+    def rebuild(vendors: Optional[List[str]]):
+        vendor_names = sorted({p['vendor'] for p in points.values()})
+        try:
+            models.update(fit_models(base_dir, vendor_names, vendors))
+        except Exception as e:
+            print(f"⚠️  Scaling models not refitted: {e}", file=sys.stderr)
+        results = sorted(points.values(), key=lambda p: (p['vendor'], p['scale'], p['config']))
+        generate_html(results, output_path, models, plotly_bundle)
+
+    for vendor_name, scale, path in result_files(base_dir):
+        sources[path] = (vendor_name, scale)
+        signatures[path] = file_signature(path)
+        extract(path)
+    rebuild(None)
+    print(f"Watching {len(points)} result files (Ctrl+C to stop)...")
+
+    while True:
+        with span('sleep'):
+            time.sleep(interval)
+        with span('poll'):
+            current = {path: (vendor_name, scale) for vendor_name, scale, path in result_files(base_dir)}
+            for path in set(signatures) | set(current):
+                signature = file_signature(path) if path in current else None
+                if signature != signatures.get(path):
+                    signatures[path] = signature
+                    pending.add(path)
+                    last_change = time.monotonic()
+        sources.update(current)
+
+        if not pending or time.monotonic() - last_change < debounce:
+            continue
+        changed, removed = [], []
+        for path in sorted(pending):
+            if signatures.get(path) is None:
+                signatures.pop(path, None)
+                if points.pop(path, None) is not None:
+                    removed.append(path)
+            elif extract(path):
+                changed.append(path)
+        touched = {sources[path][0] for path in pending}
+        pending.clear()
+        if changed or removed:
+            print(f"{time.strftime('%H:%M:%S')} {len(changed)} changed, {len(removed)} removed")
+            rebuild(sorted(touched))
+
 def main():
+    parser = argparse.ArgumentParser(description='Generate the interactive benchmark explorer')
+    parser.add_argument('--output', type=Path,
+                        help='Output HTML (default: benchmark_explorer.html, benchmark_explorer_offline.html with --offline)')
+    parser.add_argument('--offline', action='store_true',
+                        help='Write one self-contained file: inline Plotly bundle, gzipped data, no HubSpot guards')
+    parser.add_argument('--plotly-bundle', type=Path,
+                        help='Plotly build to inline with --offline; the cartesian partial bundle '
+                             '(plotly-cartesian-2.27.0.min.js) has every trace type the explorer uses')
+    parser.add_argument('--watch', action='store_true', help='Keep running and rebuild when result files change')
+    parser.add_argument('--interval', type=float, default=0.5, help='Watch: seconds between scans (default: 0.5)')
+    parser.add_argument('--debounce', type=float, default=1.0,
+                        help='Watch: rebuild once no file changed for this many seconds (default: 1)')
+    add_profile_argument(parser)
+    args = parser.parse_args()
+    start_profile(args)
+    
     base_dir = Path(__file__).parent
-    output_path = base_dir / 'benchmark_explorer.html'
+    plotly_bundle = None
+    if args.offline:
+        if not args.plotly_bundle:
+            parser.error('--offline needs --plotly-bundle, e.g. plotly-cartesian-2.27.0.min.js '
+                         '(https://cdn.plot.ly/plotly-cartesian-2.27.0.min.js; scatter, bar and heatmap)')
+        try:
+            plotly_bundle = args.plotly_bundle.read_text()
+        except OSError as e:
+            parser.error(f'cannot read --plotly-bundle: {e}')
+    elif args.plotly_bundle:
+        parser.error('--plotly-bundle is only used with --offline')
+    default_name = 'benchmark_explorer_offline.html' if args.offline else 'benchmark_explorer.html'
+    output_path = args.output or base_dir / default_name
+    
+    if args.watch:
+        try:
+            watch(base_dir, output_path, args.interval, args.debounce, plotly_bundle)
+        except KeyboardInterrupt:
+            pass
+        return
     
     print("Collecting benchmark results...")
     results = collect_all_results(base_dir)
     print(f"Found {len(results)} result files")
     
+    print("Fitting scaling models...")
+    vendor_names = sorted(set(r['vendor'] for r in results))
+    scaling_models = fit_models(base_dir, vendor_names)
+    
     print("Generating HTML visualization...")
-    generate_html(results, output_path)
+    generate_html(results, output_path, scaling_models, plotly_bundle)
     
     print("Done!")
 
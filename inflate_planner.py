@@ -0,0 +1,285 @@
+#!/usr/bin/env python3
+"""
+Shared data-inflation planner for scale-up loading (1B -> 10B -> 100B rows).
+
+Replaces the per-vendor doubling-then-chunked `INSERT ... SELECT` loops
+(bigquery_extended/inflate_until.sh, clickhouse-cloud large/inflate_until.sh,
+redshift-serverless_extended/load_until.sh) with one planner:
+
+  - each step adds min(current, remaining, max_batch * streams) rows, split
+    into at most `streams` parallel `INSERT INTO t SELECT * FROM t LIMIT n`
+    statements of at most `max_batch` rows. Taking the largest step the
+    vendor allows minimises the number of steps, which bounds wall time and,
+    on vendors where LIMIT does not prune the scan (BigQuery), billed bytes;
+  - a step that doubles the table on one stream is a plain self-insert
+    without LIMIT; with no max_batch the step is split evenly across the
+    streams instead, each a LIMIT self-insert;
+  - where LIMIT does not prune the scan, chunks are copied from a seed table
+    of `max_batch` rows (created once, dropped at the end) instead of the
+    growing table, so each chunk bills max_batch rows rather than the table;
+  - steps run through the drivers in drivers.py, one connection per stream.
+
+The plan is recomputed from the live row count before every step, so a
+failed or interrupted step never double-inserts. A checkpoint file records
+settings, back-offs and completed steps; re-running the same command resumes
+where the load stopped and uses the measured throughput for its estimates.
+On a failed step the batch size is halved, as the bash loops did.
+
+Usage:
+    python inflate_planner.py <vendor> --table <table> --target <rows> [driver options]
+
+Examples:
+    python inflate_planner.py bigquery --table test.hits --target 100000000000 --dry-run
+    python inflate_planner.py clickhouse-cloud --table default.hits --target 10000000000
+    python inflate_planner.py redshift-serverless --table public.hits --target 10000000000 --streams 1
+"""
+
+import argparse
+import json
+import math
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Dict, List, Any, Optional
+
+from drivers import DRIVERS
+
+# Per-vendor limits for self-inserts:
+#   max_batch  - rows per INSERT before it hits resource limits (None = unbounded)
+#   streams    - concurrent INSERTs into the same table that do not serialise
+#   scan_full  - LIMIT does not reduce the rows scanned (and billed); chunks
+#                are copied from a seed table instead
+#   quote      - identifier quote for the table name
+VENDOR_LIMITS: Dict[str, Dict[str, Any]] = {
+    # 100M cap from inflate_until.sh (shuffle limits); INSERT DML is not
+    # subject to the mutating-DML concurrency limit
+    'bigquery': {'max_batch': 100_000_000, 'streams': 4, 'scan_full': True, 'quote': '`'},
+    'clickhouse-cloud': {'max_batch': None, 'streams': 2, 'scan_full': False, 'quote': ''},
+    # Concurrent writes to one table serialise on Redshift
+    'redshift-serverless': {'max_batch': 2_000_000_000, 'streams': 1, 'scan_full': False, 'quote': ''},
+    'snowflake': {'max_batch': None, 'streams': 4, 'scan_full': False, 'quote': ''},
+    'firebolt': {'max_batch': 1_000_000_000, 'streams': 1, 'scan_full': False, 'quote': ''},
+    # Blind appends do not conflict in Delta, but INSERT ... SELECT reads the target
+    'databricks': {'max_batch': None, 'streams': 1, 'scan_full': False, 'quote': ''},
+}
+
+
+def plan_steps(current: int, target: int, max_batch: Optional[int], streams: int) -> List[List[int]]:
+    """Insert schedule from `current` to `target` rows: one list of per-stream rows per step."""
+    if current <= 0:
+        raise ValueError('table is empty; seed it with at least one row')
+    steps = []
+    while current < target:
+        cap = max_batch * streams if max_batch else current
+        add = min(current, target - current, cap)
+        parts = math.ceil(add / max_batch) if max_batch else max(1, min(streams, add))
+        base, extra = divmod(add, parts)
+        steps.append([base + (1 if i < extra else 0) for i in range(parts)])
+        current += add
+    return steps
+
+
+def uses_seed(current: int, max_batch: Optional[int], scan_full: bool) -> bool:
+    """Copy chunks from a seed table once the table outgrows one batch."""
+    return bool(scan_full and max_batch and current > max_batch)
+
+
+def summarize(steps: List[List[int]], current: int, max_batch: Optional[int], scan_full: bool,
+              rows_per_sec: Optional[float] = None) -> Dict[str, Any]:
+    """Statements, rows scanned and (with a measured throughput) wall time for a plan."""
+    inserts = scanned = 0
+    seconds = 0.0
+    seeded = False
+    for step in steps:
+        inserts += len(step)
+        if uses_seed(current, max_batch, scan_full):
+            if not seeded:
+                scanned += current
+                seeded = True
+            scanned += max_batch * len(step)
+        else:
+            scanned += sum(current if scan_full else rows for rows in step)
+        if rows_per_sec:
+            seconds += max(step) / rows_per_sec
+        current += sum(step)
+    return {
+        'steps': len(steps),
+        'inserts': inserts,
+        'rows_scanned': scanned,
+        'est_seconds': round(seconds) if rows_per_sec else None,
+    }
+
+
+def quoted(table: str, quote: str) -> str:
+    return f'{quote}{table}{quote}'
+
+
+def insert_sql(table: str, source: str, rows: int, source_rows: int, quote: str) -> str:
+    sql = f'INSERT INTO {quoted(table, quote)} SELECT * FROM {quoted(source, quote)}'
+    return sql if rows >= source_rows else f'{sql} LIMIT {rows}'
+
+
+def load_checkpoint(path: Path, args) -> Dict[str, Any]:
+    if path.exists():
+        state = json.loads(path.read_text())
+        if state.get('table') != args.table or state.get('target') != args.target:
+            raise SystemExit(f'ERROR: {path} is for {state.get("table")} -> {state.get("target")}; '
+                             'remove it or pass a different --checkpoint')
+        print(f'Resuming from {path} ({len(state["steps"])} steps done)', file=sys.stderr)
+        return state
+    return {'vendor': args.vendor, 'table': args.table, 'target': args.target,
+            'max_batch': None, 'steps': []}
+
+
+def save_checkpoint(path: Path, state: Dict[str, Any]):
+    """Write atomically so an interrupt never leaves a truncated checkpoint."""
+    tmp = path.with_suffix(path.suffix + '.tmp')
+    tmp.write_text(json.dumps(state, indent=2) + '\n')
+    os.replace(tmp, path)
+
+
+def measured_rate(state: Dict[str, Any]) -> Optional[float]:
+    """Rows per second per stream over the completed steps."""
+    rows = sum(max(s['inserts']) for s in state['steps'])
+    seconds = sum(s['seconds'] for s in state['steps'])
+    return rows / seconds if seconds else None
+
+
+def print_plan(steps: List[List[int]], summary: Dict[str, Any], current: int, target: int):
+    print(f'Plan: {current:,} -> {target:,} rows', file=sys.stderr)
+    i = 0
+    while i < len(steps):
+        # Collapse runs of identical chunk steps into one line
+        j = i
+        while j + 1 < len(steps) and steps[j + 1] == steps[i]:
+            j += 1
+        after = current + sum(sum(step) for step in steps[i:j + 1])
+        label = f'Step {i + 1}' if i == j else f'Steps {i + 1}-{j + 1}'
+        print(f'  {label}: {len(steps[i])} x {max(steps[i]):,} rows  ({current:,} -> {after:,})',
+              file=sys.stderr)
+        current = after
+        i = j + 1
+    est = f", ~{summary['est_seconds']}s" if summary['est_seconds'] is not None else ''
+    print(f"  {summary['steps']} steps, {summary['inserts']} inserts, "
+          f"{summary['rows_scanned']:,} rows scanned{est}", file=sys.stderr)
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        description='Plan and run self-insert inflation of a benchmark table'
+    )
+    subparsers = parser.add_subparsers(dest='vendor', required=True)
+
+    for vendor, driver_cls in DRIVERS.items():
+        limits = VENDOR_LIMITS[vendor]
+        sub = subparsers.add_parser(vendor, help=f'Inflate a {driver_cls.system} table')
+        sub.add_argument('--table', required=True, help='Table to inflate (must contain >= 1 row)')
+        sub.add_argument('--target', type=int, default=1_000_000_000,
+                         help='Target row count (default: 1000000000)')
+        sub.add_argument('--max-batch', type=int, default=limits['max_batch'],
+                         help=f"Max rows per INSERT (default: {limits['max_batch'] or 'unbounded'})")
+        sub.add_argument('--streams', type=int, default=limits['streams'],
+                         help=f"Parallel INSERT streams (default: {limits['streams']})")
+        sub.add_argument('--checkpoint', help='Checkpoint file (default: inflate_<table>.json)')
+        sub.add_argument('--retries', type=int, default=6,
+                         help='Failed steps (halving the batch each time) before giving up (default: 6)')
+        sub.add_argument('--current', type=int,
+                         help='Plan from this row count without connecting (implies --dry-run)')
+        sub.add_argument('--dry-run', action='store_true', help='Print the plan and exit')
+        # Attributes some drivers read from the runner's common options
+        sub.set_defaults(machine='serverless', cluster_size=1, volume=None)
+        driver_cls.add_arguments(sub)
+
+    return parser
+
+
+def main():
+    args = build_parser().parse_args()
+    limits = VENDOR_LIMITS[args.vendor]
+    checkpoint = Path(args.checkpoint or f"inflate_{args.table.replace('.', '_')}.json")
+
+    if args.current is not None:
+        steps = plan_steps(args.current, args.target, args.max_batch, args.streams)
+        print_plan(steps, summarize(steps, args.current, args.max_batch, limits['scan_full']),
+                   args.current, args.target)
+        return
+
+    state = load_checkpoint(checkpoint, args)
+    max_batch = state['max_batch'] or args.max_batch
+    count_sql = f"SELECT COUNT(*) FROM {quoted(args.table, limits['quote'])}"
+    seed = f'{args.table}_inflate_seed'
+
+    drivers = [DRIVERS[args.vendor](args) for _ in range(max(1, args.streams))]
+    for driver in drivers:
+        driver.connect()
+    try:
+        current = int(drivers[0].fetch_value(count_sql))
+        steps = plan_steps(current, args.target, max_batch, args.streams)
+        print_plan(steps, summarize(steps, current, max_batch, limits['scan_full'], measured_rate(state)),
+                   current, args.target)
+        if args.dry_run:
+            return
+
+        failures = 0
+        with ThreadPoolExecutor(max_workers=len(drivers)) as pool:
+            while current < args.target:
+                step = plan_steps(current, args.target, max_batch, args.streams)[0]
+                if uses_seed(current, max_batch, limits['scan_full']):
+                    if not state.get('seed_rows'):
+                        print(f'>>> Creating seed table {seed} ({max_batch:,} rows)', file=sys.stderr)
+                        drivers[0].statement(
+                            f"CREATE TABLE {quoted(seed, limits['quote'])} AS "
+                            f"SELECT * FROM {quoted(args.table, limits['quote'])} LIMIT {max_batch}"
+                        )
+                        state['seed_rows'] = max_batch
+                        save_checkpoint(checkpoint, state)
+                    source, source_rows = seed, state['seed_rows']
+                else:
+                    source, source_rows = args.table, current
+                sqls = [insert_sql(args.table, source, rows, source_rows, limits['quote']) for rows in step]
+                print(f'>>> {len(step)} x {max(step):,} rows ({current:,} -> {current + sum(step):,})',
+                      file=sys.stderr)
+                start = time.perf_counter()
+                try:
+                    list(pool.map(lambda pair: pair[0].statement(pair[1]), zip(drivers, sqls)))
+                except Exception as e:
+                    failures += 1
+                    if failures > args.retries or (max_batch or current) <= 1:
+                        raise SystemExit(f'ERROR: giving up after {failures} failed steps: {e}')
+                    max_batch = max(1, (max_batch or max(step)) // 2)
+                    state['max_batch'] = max_batch
+                    save_checkpoint(checkpoint, state)
+                    print(f'  Step failed ({e}); retrying with max batch {max_batch:,}', file=sys.stderr)
+                    current = int(drivers[0].fetch_value(count_sql))
+                    continue
+
+                seconds = round(time.perf_counter() - start, 3)
+                after = int(drivers[0].fetch_value(count_sql))
+                state['steps'].append({
+                    'finished': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+                    'rows_before': current,
+                    'rows_after': after,
+                    'inserts': step,
+                    'seconds': seconds,
+                })
+                save_checkpoint(checkpoint, state)
+                print(f'  {after:,} rows after {seconds:.1f}s', file=sys.stderr)
+                if after <= current:
+                    raise SystemExit(f'ERROR: step added no rows ({after:,}); stopping')
+                current = after
+        if state.get('seed_rows'):
+            drivers[0].statement(f"DROP TABLE {quoted(seed, limits['quote'])}")
+            state['seed_rows'] = None
+            save_checkpoint(checkpoint, state)
+    finally:
+        for driver in drivers:
+            driver.close()
+
+    print(f'✅ Target reached: {current:,} rows (checkpoint {checkpoint})', file=sys.stderr)
+
+
+if __name__ == '__main__':
+    main()
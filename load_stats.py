@@ -0,0 +1,63 @@
+#!/usr/bin/env python3
+"""
+Load statistics file shared by every vendor's loader.
+
+Each load script writes one load_stats_<table>.json:
+
+    {"table": "hits", "rows": 1000000000, "bytes": 74807831229, "seconds": 812,
+     "rows_per_sec": 1231527.1, "bytes_per_sec": 92127870.9, "billed": {...}}
+
+"billed" is the only vendor-specific part: what that vendor's enrich script
+prices the load from (Firebolt engine_seconds, ClickHouse service_seconds,
+Redshift rpu_seconds, Databricks warehouse_seconds, BigQuery billed_slot_sec /
+billed_bytes). The bash loaders call the CLI with their billed fragment as
+JSON; Python loaders import load_stats() and write_load_stats().
+
+Usage:
+    python load_stats.py --output load_stats_hits.json --table hits --rows 1000000000 \\
+        --bytes 74807831229 --seconds 812 --billed '{"service_seconds": 812}'
+"""
+
+import argparse
+import json
+from pathlib import Path
+from typing import Dict, Any
+
+
+def load_stats(table: str, rows: int, num_bytes: int, seconds: float, billed: Dict[str, Any]) -> Dict[str, Any]:
+    """One load's statistics; throughput is None for a zero-length load."""
+    return {
+        'table': table,
+        'rows': rows,
+        'bytes': num_bytes,
+        'seconds': seconds,
+        'rows_per_sec': rows / seconds if seconds > 0 else None,
+        'bytes_per_sec': num_bytes / seconds if seconds > 0 else None,
+        'billed': billed,
+    }
+
+
+def write_load_stats(path: Path, stats: Dict[str, Any]):
+    Path(path).write_text(json.dumps(stats, indent=2) + '\n')
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Write a load_stats_<table>.json for enrich scripts')
+    parser.add_argument('--output', required=True, help='Load statistics file to write')
+    parser.add_argument('--table', required=True, help='Loaded table')
+    parser.add_argument('--rows', type=int, required=True, help='Rows added by the load')
+    parser.add_argument('--bytes', type=int, required=True, help='Bytes added by the load')
+    parser.add_argument('--seconds', type=float, required=True, help='Wall time of the load')
+    parser.add_argument('--billed', type=json.loads, required=True,
+                        help='Vendor billed fragment as a JSON object, e.g. \'{"rpu_seconds": 5400}\'')
+    args = parser.parse_args()
+    if not isinstance(args.billed, dict):
+        parser.error('--billed must be a JSON object')
+
+    seconds = int(args.seconds) if args.seconds.is_integer() else args.seconds
+    write_load_stats(args.output, load_stats(args.table, args.rows, args.bytes, seconds, args.billed))
+    print(f'Load stats: {args.output}')
+
+
+if __name__ == '__main__':
+    main()
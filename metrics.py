@@ -0,0 +1,224 @@
+#!/usr/bin/env python3
+"""
+Normalized per-run resource metrics.
+
+Every vendor records different side metrics next to "result" (BigQuery
+billed_bytes / billed_slot_sec, Databricks read_bytes / task_sec, Redshift
+queue_sec / compile_sec, ...). This module maps them onto one optional block
+with the same [query][run] shape as "result":
+
+    "metrics": {
+        "bytes_scanned": [[...], ...],   bytes read from storage or cache
+        "rows_scanned":  [[...], ...],   rows read before filtering
+        "cpu_sec":       [[...], ...],   CPU-seconds (BigQuery: slot-seconds)
+        "queue_sec":     [[...], ...],   time queued before execution
+        "compile_sec":   [[...], ...],   planning / compilation time
+        "cache_hit":     [[...], ...]    fraction of scanned data served from cache (0..1)
+    }
+
+Every key is optional. A result file may carry the block itself; otherwise it
+is derived from the vendor fields listed in SOURCES. generate_visualization.py
+loads it into the explorer, which adds efficiency axes such as bytes scanned
+per second and rows per dollar.
+
+Run times are normalized the same way. "result" holds whatever the runner
+measured: client time for run_benchmark.py, snowsql and clickhouse-client;
+server time for Firebolt, Databricks, BigQuery and Redshift. timing_block()
+returns client_sec / server_sec / rtt_sec per run. It reads the "timing" block
+(written by run_benchmark.py and, for server_sec, the Snowflake, Redshift and
+ClickHouse collect_metrics.py) and falls back to "result" for the basis it
+holds. run_times() picks one basis, so files can be compared on equal terms.
+"net" is client time minus the SELECT 1 round trip.
+
+server_sec is the engine's total for the run, never execution alone; the
+phases it covers (queue, compile, execution) are recorded in
+"timing.server_includes", or follow SERVER_INCLUDES for older files.
+
+Usage:
+    python metrics.py <result.json> [<result.json> ...]          # print best-run totals
+    python metrics.py --write <result.json> [<result.json> ...]  # store the block in the file
+"""
+
+import argparse
+import json
+from pathlib import Path
+from typing import Dict, List, Any, Optional
+
+NORMALIZED_METRICS = ['bytes_scanned', 'rows_scanned', 'cpu_sec', 'queue_sec', 'compile_sec', 'cache_hit']
+
+# Normalized metric -> vendor per-run fields, first match wins
+SOURCES = {
+    'bytes_scanned': [
+        'scanned_bytes',    # Firebolt / ClickHouse collect_metrics.py
+        'bytes_scanned',    # Snowflake collect_metrics.py
+        'read_bytes',       # Databricks summarize_results.py
+        'billed_bytes',     # BigQuery (bytes billed, i.e. scanned with the 10 MiB minimum)
+    ],
+    'rows_scanned': ['scanned_rows', 'read_rows'],
+    'cpu_sec': ['cpu_time_sec', 'task_sec', 'billed_slot_sec'],
+    'queue_sec': ['queue_sec', 'queued_sec'],
+    'compile_sec': ['compile_sec', 'compilation_sec'],
+    'cache_hit': ['scan_cache_ratio', 'io_cache_ratio'],
+}
+
+# How best-run values are combined across queries
+WEIGHTED_BY_BYTES = {'cache_hit'}
+
+TIMING_BASES = ['client', 'server', 'net']
+
+# What "result" measures in files without a "timing" block, by system prefix
+RESULT_BASIS = {
+    'Snowflake': 'client',      # snowsql "Time Elapsed"
+    'ClickHouse': 'client',     # clickhouse-client --time
+    'Firebolt': 'server',       # REST response statistics.elapsed
+    'Databricks': 'server',     # system.query.history total_duration_ms
+    'BigQuery': 'server',       # INFORMATION_SCHEMA.JOBS end_time - start_time
+    'Redshift': 'server',       # SYS_QUERY_HISTORY elapsed_time
+}
+
+# Phases the server time of each system covers, for files without
+# "timing.server_includes"
+SERVER_INCLUDES = {
+    'Snowflake': ['queue', 'compile', 'execution'],    # QUERY_HISTORY total_elapsed_time
+    'ClickHouse': ['compile', 'execution'],            # query_log query_duration_ms
+    'Firebolt': ['compile', 'execution'],              # statistics.elapsed
+    'Databricks': ['queue', 'compile', 'execution'],   # total_duration_ms
+    'BigQuery': ['compile', 'execution'],              # job start to end, after PENDING
+    'Redshift': ['queue', 'compile', 'execution'],     # SYS_QUERY_HISTORY elapsed_time
+}
+
+
+def has_values(values: Any) -> bool:
+    """True for a [query][run] array with at least one non-null value."""
+    return isinstance(values, list) and any(v is not None for runs in values if runs for v in runs)
+
+
+def normalize_metrics(result_data: Dict[str, Any]) -> Dict[str, List[List[Any]]]:
+    """Return the normalized metrics block, deriving missing keys from vendor fields."""
+    block = dict(result_data.get('metrics') or {})
+    for name in NORMALIZED_METRICS:
+        if name in block:
+            continue
+        for field in SOURCES[name]:
+            values = result_data.get(field)
+            if has_values(values):
+                block[name] = values
+                break
+    return block
+
+
+def result_basis(result_data: Dict[str, Any]) -> Optional[str]:
+    """'client' or 'server': what "result" measures (None for an unknown system)."""
+    timing = result_data.get('timing') or {}
+    if timing.get('result_basis'):
+        return timing['result_basis']
+    system = result_data.get('system', '')
+    return next((basis for prefix, basis in RESULT_BASIS.items() if system.startswith(prefix)), None)
+
+
+def timing_block(result_data: Dict[str, Any]) -> Dict[str, List[List[Optional[float]]]]:
+    """client_sec / server_sec / rtt_sec per run, each only if some run has a value."""
+    timing = result_data.get('timing') or {}
+    block = {key: timing[key] for key in ('client_sec', 'server_sec', 'rtt_sec') if has_values(timing.get(key))}
+    basis = result_basis(result_data)
+    if basis and f'{basis}_sec' not in block and has_values(result_data.get('result')):
+        block[f'{basis}_sec'] = result_data['result']
+    return block
+
+
+def server_includes(result_data: Dict[str, Any]) -> Optional[List[str]]:
+    """Phases (queue, compile, execution) the file's server time covers; None if unknown."""
+    timing = result_data.get('timing') or {}
+    if timing.get('server_includes'):
+        return timing['server_includes']
+    system = result_data.get('system', '')
+    return next((phases for prefix, phases in SERVER_INCLUDES.items() if system.startswith(prefix)), None)
+
+
+def run_times(result_data: Dict[str, Any], basis: str) -> Optional[List[List[Optional[float]]]]:
+    """[query][run] seconds on one timing basis, or None if the file lacks it.
+
+    Runs that failed in "result" stay failed on every basis.
+    """
+    block = timing_block(result_data)
+    if basis == 'net':
+        if 'client_sec' not in block or 'rtt_sec' not in block:
+            return None
+        values = [
+            [round(max(c - r, 0.0), 3) if c is not None and r is not None else None
+             for c, r in zip(client, rtt)]
+            for client, rtt in zip(block['client_sec'], block['rtt_sec'])
+        ]
+    elif f'{basis}_sec' in block:
+        values = block[f'{basis}_sec']
+    else:
+        return None
+    result = result_data.get('result', [])
+    return [
+        [v if q < len(result) and r < len(result[q]) and result[q][r] is not None else None
+         for r, v in enumerate(runs or [])]
+        for q, runs in enumerate(values)
+    ]
+
+
+def best_run_indices(result: List[List[Optional[float]]]) -> List[Optional[int]]:
+    """Index of the fastest run per query (None if every run failed)."""
+    indices = []
+    for runs in result:
+        valid = [(t, i) for i, t in enumerate(runs or []) if t is not None]
+        indices.append(min(valid)[1] if valid else None)
+    return indices
+
+
+def best_run_totals(result_data: Dict[str, Any]) -> Dict[str, Optional[float]]:
+    """Sum each normalized metric over the best run of every query.
+
+    cache_hit is averaged, weighted by bytes_scanned when available. Metrics
+    with no value for any query are None.
+    """
+    block = normalize_metrics(result_data)
+    best = best_run_indices(result_data.get('result', []))
+
+    def best_value(name, q_idx):
+        runs = block.get(name) or []
+        idx = best[q_idx]
+        if idx is None or q_idx >= len(runs) or not runs[q_idx] or idx >= len(runs[q_idx]):
+            return None
+        return runs[q_idx][idx]
+
+    totals = {}
+    for name in NORMALIZED_METRICS:
+        values = [(q, best_value(name, q)) for q in range(len(best))]
+        values = [(q, v) for q, v in values if v is not None]
+        if not values:
+            totals[name] = None
+        elif name in WEIGHTED_BY_BYTES:
+            weights = [best_value('bytes_scanned', q) or 0 for q, _ in values]
+            if sum(weights):
+                totals[name] = sum(w * v for w, (_, v) in zip(weights, values)) / sum(weights)
+            else:
+                totals[name] = sum(v for _, v in values) / len(values)
+        else:
+            totals[name] = sum(v for _, v in values)
+    return totals
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Normalized per-run resource metrics')
+    parser.add_argument('files', nargs='+', help='Result JSON files')
+    parser.add_argument('--write', action='store_true', help='Store the "metrics" block in each file')
+
+    args = parser.parse_args()
+
+    for path in args.files:
+        result_data = json.loads(Path(path).read_text())
+        if args.write:
+            result_data['metrics'] = normalize_metrics(result_data)
+            Path(path).write_text(json.dumps(result_data, indent=2) + '\n')
+        totals = best_run_totals(result_data)
+        found = ', '.join(f'{k}={v:.6g}' for k, v in totals.items() if v is not None) or 'no metrics'
+        print(f'{path}: {found}')
+
+
+if __name__ == '__main__':
+    main()
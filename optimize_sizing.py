@@ -0,0 +1,229 @@
+#!/usr/bin/env python3
+"""
+SLA-constrained sizing optimizer across all priced configurations.
+
+Searches every result file x cost tier of a scale for the cheapest
+configurations that run a weighted query mix within a latency SLA:
+
+  - per-query: every query with a non-zero weight finishes within the SLA
+    (--sla-sec, or per query from --query-sla);
+  - p95: the weighted 95th percentile of per-query runtimes (--percentile to
+    change it) is within --sla-sec.
+
+The cost of a configuration is the weighted sum of its per-query costs, i.e.
+the price of one execution of the mix (weights act as counts). A query that
+failed on a configuration rules it out whenever its weight is non-zero.
+
+Runtimes depend only on the result file, so the search is indexed by file:
+each file's runtime vector is checked against the SLA once, and only the
+files that pass have their tiers priced. The SLA margin is reported as
+seconds and as a share of the SLA.
+
+--billing picks which cost tiers are compared: the measured runtime x rate
+tiers (default), or the "(session)" / "(isolated)" tiers from cost_engine.py
+that include minimum charges and idle time.
+
+Usage:
+    python optimize_sizing.py --scale 10B --sla-sec 2 --mode p95
+    python optimize_sizing.py --scale 100B --sla-sec 10 --weights mix.json \\
+        --vendors Snowflake,Firebolt --billing session --top 5 --json
+    python optimize_sizing.py --scale 1B --query-sla sla.json --mode per-query
+"""
+
+import argparse
+import json
+import sys
+from pathlib import Path
+from typing import Dict, List, Any, Optional
+
+from cost_engine import VENDOR_DIRS, apply_rules, load_rules
+from simulate_workload import load_weights, parse_list, pick_run
+
+
+def load_candidates(base_dir: Path, scale: str, vendors: Optional[List[str]] = None) -> List[Dict[str, Any]]:
+    """Every result file of a scale with its runtimes and cost tiers."""
+    candidates = []
+    for vendor, directory in VENDOR_DIRS.items():
+        if vendors and not any(v.lower().startswith(vendor.lower()) for v in vendors):
+            continue
+        for path in sorted((base_dir / directory / f'results_{scale}').glob('*.json')):
+            result_data = json.loads(path.read_text())
+            if not result_data.get('costs'):
+                continue
+            apply_rules(result_data, load_rules(vendor))
+            candidates.append({
+                'vendor': vendor,
+                'config': path.stem,
+                'path': str(path),
+                'result': result_data['result'],
+                'costs': result_data['costs'],
+            })
+    return candidates
+
+
+def weighted_percentile(values: List[float], weights: List[float], p: float) -> float:
+    """Smallest value whose cumulative weight reaches p of the total."""
+    pairs = sorted(zip(values, weights))
+    total = sum(weights)
+    cumulative = 0.0
+    for value, weight in pairs:
+        cumulative += weight
+        if cumulative >= p * total - 1e-12:
+            return value
+    return pairs[-1][0]
+
+
+def check_sla(runtimes: List[Optional[float]], weights: List[float], sla: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    """SLA verdict for one runtime vector; None if a weighted query failed."""
+    active = [q for q, w in enumerate(weights) if w > 0]
+    if any(q >= len(runtimes) or runtimes[q] is None for q in active):
+        return None
+
+    if sla['mode'] == 'per-query':
+        # Tightest query: smallest margin relative to its own SLA
+        margins = [(sla['limits'][q] - runtimes[q], q) for q in active]
+        margin, q_idx = min(margins, key=lambda m: m[0] / sla['limits'][m[1]])
+        limit, achieved = sla['limits'][q_idx], runtimes[q_idx]
+        binding = f'Q{q_idx}'
+    else:
+        achieved = weighted_percentile([runtimes[q] for q in active], [weights[q] for q in active], sla['percentile'])
+        limit = sla['limits'][0]
+        margin = limit - achieved
+        binding = f"p{sla['percentile'] * 100:g}"
+    return {
+        'passes': margin >= 0,
+        'achieved_sec': achieved,
+        'limit_sec': limit,
+        'margin_sec': margin,
+        'margin_pct': margin / limit if limit else None,
+        'binding': binding,
+    }
+
+
+def optimize(candidates: List[Dict[str, Any]], weights: List[float], sla: Dict[str, Any],
+             billing: str = 'measured', runtime_mode: str = 'best',
+             tiers: Optional[List[str]] = None) -> Dict[str, Any]:
+    """Rank the config x tier pairs that meet the SLA by weighted mix cost."""
+    passing, failing, evaluated = [], [], 0
+    for cand in candidates:
+        # One chosen run per query; costs use the same run
+        runs = [pick_run(q, runtime_mode, None) if q else None for q in cand['result']]
+        runtimes = [cand['result'][q][r] if r is not None else None for q, r in enumerate(runs)]
+        verdict = check_sla(runtimes, weights, sla)
+        for tier in cand['costs']:
+            variant = tier.get('billing_variant', 'measured')
+            base = tier.get('base_tier', tier['tier'])
+            if variant != billing or (tiers and base not in tiers):
+                continue
+            evaluated += 1
+            row = {'vendor': cand['vendor'], 'config': cand['config'], 'tier': base, 'billing': variant}
+            if verdict is None or not verdict['passes']:
+                failing.append(dict(row, **(verdict or {'binding': 'failed query'})))
+                continue
+            costs = tier['compute_costs']
+            mix_cost = 0.0
+            for q, w in enumerate(weights):
+                if w <= 0:
+                    continue
+                cost = costs[q][runs[q]] if q < len(costs) and runs[q] is not None else None
+                if cost is None:
+                    break
+                mix_cost += w * cost
+            else:
+                passing.append(dict(row, mix_cost=mix_cost, **verdict))
+                continue
+            failing.append(dict(row, binding='unpriced query'))
+
+    passing.sort(key=lambda r: (r['mix_cost'], -r['margin_sec']))
+    if passing:
+        cheapest = passing[0]['mix_cost']
+        for rank, row in enumerate(passing, 1):
+            row['rank'] = rank
+            row['vs_cheapest'] = row['mix_cost'] / cheapest if cheapest else None
+    return {'evaluated': evaluated, 'passing': passing, 'failing': failing}
+
+
+def build_sla(args, query_count: int) -> Dict[str, Any]:
+    if args.mode == 'per-query':
+        limits = [args.sla_sec] * query_count
+        if args.query_sla:
+            for k, v in json.loads(Path(args.query_sla).read_text()).items():
+                limits[int(k)] = float(v)
+                if limits[int(k)] <= 0:
+                    raise ValueError(f'--query-sla limit for Q{k} must be positive, got {v}')
+        if any(l is None for l in limits):
+            raise ValueError('per-query mode needs --sla-sec or a limit for every query in --query-sla')
+        return {'mode': 'per-query', 'limits': limits}
+    if args.sla_sec is None:
+        raise ValueError(f'{args.mode} mode needs --sla-sec')
+    return {'mode': args.mode, 'limits': [args.sla_sec], 'percentile': args.percentile}
+
+
+def render_markdown(report: Dict[str, Any], top: int) -> str:
+    lines = [
+        f"{len(report['passing'])} of {report['evaluated']} configurations meet the SLA.",
+        '',
+        '| # | Vendor | Config | Tier | Mix cost $ | vs cheapest | Binding | Achieved s | SLA s | Margin s | Margin |',
+        '|---' * 11 + '|',
+    ]
+    for r in report['passing'][:top]:
+        lines.append(
+            f"| {r['rank']} | {r['vendor']} | {r['config']} | {r['tier']} | {r['mix_cost']:.6f} | "
+            f"{r['vs_cheapest']:.2f}x | {r['binding']} | {r['achieved_sec']:.3f} | {r['limit_sec']:.3f} | "
+            f"{r['margin_sec']:.3f} | {'-' if r['margin_pct'] is None else format(r['margin_pct'], '.0%')} |"
+        )
+    return '\n'.join(lines)
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='Find the cheapest configurations that run a query mix within a latency SLA'
+    )
+    parser.add_argument('--scale', default='1B', choices=['1B', '10B', '100B'], help='Data scale (default: 1B)')
+    parser.add_argument('--mode', choices=['per-query', 'p95'], default='p95',
+                        help='SLA on every query or on a weighted percentile (default: p95)')
+    parser.add_argument('--sla-sec', type=float, help='Latency SLA in seconds')
+    parser.add_argument('--query-sla', help='Per-query SLAs: JSON {query_index: seconds} (per-query mode)')
+    parser.add_argument('--percentile', type=float, default=0.95, help='Percentile for p95 mode (default: 0.95)')
+    parser.add_argument('--weights', help='Query mix: JSON list or {query_index: weight} (default: uniform)')
+    parser.add_argument('--vendors', type=lambda v: parse_list(v, str), help='Comma-separated vendors (default: all)')
+    parser.add_argument('--tiers', type=lambda v: parse_list(v, str), help='Comma-separated tiers (default: all)')
+    parser.add_argument('--billing', choices=['measured', 'session', 'isolated'], default='measured',
+                        help='Cost tiers to compare (default: measured runtime x rate)')
+    parser.add_argument('--runtime', choices=['best', 'median'], default='best',
+                        help='Which measured run represents a query (default: best)')
+    parser.add_argument('--top', type=int, default=10, help='Configurations to show (default: 10)')
+    parser.add_argument('--json', action='store_true', help='Emit JSON instead of markdown')
+
+    args = parser.parse_args()
+    if args.sla_sec is not None and args.sla_sec <= 0:
+        parser.error(f'--sla-sec must be positive, got {args.sla_sec:g}')
+
+    candidates = load_candidates(Path(__file__).parent, args.scale, args.vendors)
+    if not candidates:
+        print(f'No results for scale {args.scale}', file=sys.stderr)
+        sys.exit(1)
+    query_count = max(len(c['result']) for c in candidates)
+    try:
+        weights = load_weights(args.weights, query_count)
+        sla = build_sla(args, query_count)
+    except (OSError, ValueError) as e:
+        print(f'Error: {e}', file=sys.stderr)
+        sys.exit(1)
+
+    report = optimize(candidates, weights, sla, args.billing, args.runtime, args.tiers)
+    if args.json:
+        print(json.dumps(dict(report, passing=report['passing'][:args.top]), indent=2))
+    else:
+        print(render_markdown(report, args.top))
+        if not report['passing']:
+            closest = sorted((r for r in report['failing'] if 'margin_sec' in r),
+                             key=lambda r: (r['margin_pct'] is not None, r['margin_pct'] or 0),
+                             reverse=True)[:3]
+            for r in closest:
+                print(f"  closest: {r['vendor']} {r['config']} {r['tier']} "
+                      f"({r['binding']} {r['achieved_sec']:.3f}s vs {r['limit_sec']:.3f}s)")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,421 @@
+#!/usr/bin/env python3
+"""
+Multi-cloud, multi-region price matrix for every benchmark result.
+
+clickhouse-cloud/generate_pricings_file.sh expands pricing_metadata.csv into
+one pricing JSON per provider/replicas/memory combination, and enrichment runs
+jq once per file and tier for a single region. This loads each vendor's price
+table once into a list of price rows (provider, region, tier) indexed by
+(provider, region), then prices every result against every row in one pass:
+
+    cost per second = size units of the result x compute rate of the row
+
+Size units depend only on the result (ClickHouse: GiB per replica x replicas;
+Firebolt: FBU per node x nodes; Snowflake: credits per hour of the warehouse)
+and compute rates only on the row, so each result's runtimes are summed once
+and broadcast across all rows.
+
+Price tables:
+    clickhouse-cloud/pricing_metadata.csv   provider,region,tier,compute_price,compute_price_unit,...,effective_date
+    firebolt/pricing_metadata.csv           provider,region,tier,fbu_rate_per_hour,storage_per_tib_month,effective_date
+    snowflake/pricings/standard_warehouse.json  ("pricing": cloud/region/plan[/effective_date] entries)
+
+Every row may carry an effective_date; rows are kept as a history indexed by
+(vendor, provider, region, tier) and each result is priced with the row in
+effect on its "date" (latest effective_date <= date; results older than every
+row use the earliest). --as-of prices the whole corpus at one date instead, and
+--compare-to reports how that moves the total cost per column.
+
+Add regions by adding rows, and price changes by appending rows with a later
+effective_date. BigQuery, Redshift Serverless and Databricks
+price billed metrics (bytes, RPU-seconds, DBUs) in their own enrich scripts
+and have no multi-region tables yet.
+
+Outputs, rewritten only when their content changes:
+    <vendor>/price_matrix.json   best-run compute, load and storage cost of every
+                                 result x (provider, region, tier)
+    result files (--apply)       "costs" recomputed for one provider/region, keeping
+                                 cost_engine.py variants if the file had them;
+                                 unchanged values keep their original text
+
+Usage:
+    python price_matrix.py                                    # all vendors, all regions
+    python price_matrix.py --vendors clickhouse-cloud --show  # print the matrix
+    python price_matrix.py --vendors clickhouse-cloud --apply gcp/us-east1
+    python price_matrix.py --as-of 2026-01-01                 # reprice everything at one date
+    python price_matrix.py --compare-to 2026-01-01            # result dates vs 2026-01-01
+"""
+
+import argparse
+import bisect
+import csv
+import json
+import re
+import sys
+from pathlib import Path
+from typing import Dict, List, Any, Optional, Tuple
+
+from cost_engine import apply_rules, load_rules
+
+RESULT_DIRS = ['results', 'results_1B', 'results_10B', 'results_100B']
+
+# FBU per node by engine family and node type (firebolt/enrich_large.sh)
+FBU_MAP = {
+    'STORAGE_OPTIMIZED': {'S': 8, 'M': 16, 'L': 32, 'XL': 64},
+    'COMPUTE_OPTIMIZED': {'S': 4, 'M': 8, 'L': 16, 'XL': 32},
+}
+TIB = 1024 ** 4
+
+# Results without a date are priced with the latest prices
+LATEST = '9999-12-31'
+
+
+def read_csv(path: Path) -> List[Dict[str, str]]:
+    with open(path, newline='') as f:
+        return [row for row in csv.DictReader(f) if row.get('provider')]
+
+
+def clickhouse_prices(vendor_dir: Path) -> List[Dict[str, Any]]:
+    return [{
+        'provider': row['provider'],
+        'region': row['region'],
+        'tier': row['tier'],
+        # compute_price is per compute_price_unit GiB of memory per hour
+        'compute_rate': float(row['compute_price']) / 3600 / float(row['compute_price_unit']),
+        'storage_per_byte': float(row['storage_price']) / float(row['storage_price_unit']),
+        'effective_date': row.get('effective_date') or '',
+    } for row in read_csv(vendor_dir / 'pricing_metadata.csv')]
+
+
+def clickhouse_units(result_data: Dict[str, Any], prices: List[Dict[str, Any]]) -> Tuple[float, float, float]:
+    """(compute units, load seconds, load units): GiB per replica x replicas."""
+    memory = result_data.get('memory_size')
+    if memory is None:
+        digits = re.sub(r'[^0-9.]', '', str(result_data.get('machine', '')))
+        memory = float(digits) if digits else 0
+    units = float(memory) * float(result_data.get('cluster_size') or 1)
+    return units, float(result_data.get('load_time') or 0), units
+
+
+def firebolt_prices(vendor_dir: Path) -> List[Dict[str, Any]]:
+    return [{
+        'provider': row['provider'],
+        'region': row['region'],
+        'tier': row['tier'],
+        'compute_rate': float(row['fbu_rate_per_hour']) / 3600,
+        'storage_per_byte': float(row['storage_per_tib_month']) / TIB,
+        'effective_date': row.get('effective_date') or '',
+    } for row in read_csv(vendor_dir / 'pricing_metadata.csv')]
+
+
+def firebolt_units(result_data: Dict[str, Any], prices: List[Dict[str, Any]]) -> Tuple[float, float, float]:
+    """FBU of the engine; load uses the engine that ran it (load.billed) when recorded."""
+    engine = result_data.get('engine') or {}
+    family = FBU_MAP.get(engine.get('family', 'STORAGE_OPTIMIZED'), {})
+    per_node = family.get(engine.get('type', 'L'), 32)
+    units = per_node * float(engine.get('nodes') or result_data.get('cluster_size') or 1)
+    billed = (result_data.get('load') or {}).get('billed') or {}
+    load_units = units
+    if billed.get('type') and billed.get('family'):
+        load_units = FBU_MAP.get(billed['family'], {}).get(billed['type'], per_node) * (billed.get('nodes') or 1)
+    load_sec = float(billed.get('engine_seconds') or result_data.get('load_time') or 0)
+    return units, load_sec, load_units
+
+
+def snowflake_prices(vendor_dir: Path) -> List[Dict[str, Any]]:
+    table = json.loads((vendor_dir / 'pricings' / 'standard_warehouse.json').read_text())
+    return [{
+        'provider': plan['cloud'],
+        'region': plan['region'],
+        'tier': plan['plan'],
+        'compute_rate': float(plan['credit_price_per_hour']) / 3600,
+        'storage_per_byte': float(plan['storage']['storage']) / float(plan['storage']['storage_price_unit']),
+        'warehouses': {w['name']: w['credits_per_hour'] for w in plan['warehouses']},
+        'effective_date': plan.get('effective_date', ''),
+    } for plan in table['pricing']]
+
+
+def snowflake_units(result_data: Dict[str, Any], prices: List[Dict[str, Any]]) -> Tuple[float, float, float]:
+    """Credits per hour of the warehouse size the result ran on."""
+    size = result_data.get('machine')
+    credits = next((p['warehouses'][size] for p in prices if size in p.get('warehouses', {})), None)
+    if credits is None:
+        raise ValueError(f'unknown warehouse size {size!r}')
+    return float(credits), float(result_data.get('load_time') or 0), float(credits)
+
+
+ADAPTERS = {
+    'clickhouse-cloud': {'prices': clickhouse_prices, 'units': clickhouse_units},
+    'firebolt': {'prices': firebolt_prices, 'units': firebolt_units},
+    'snowflake': {'prices': snowflake_prices, 'units': snowflake_units},
+}
+
+
+def build_history(vendor: str, prices: List[Dict[str, Any]]) -> Dict[Tuple[str, str, str, str], List[Dict[str, Any]]]:
+    """Price rows by (vendor, provider, region, tier), sorted by effective date, keys in table order."""
+    history = {}
+    for row in prices:
+        history.setdefault((vendor, row['provider'], row['region'], row['tier']), []).append(row)
+    for rows in history.values():
+        rows.sort(key=lambda r: r['effective_date'])
+    return history
+
+
+def price_as_of(rows: List[Dict[str, Any]], date: str) -> Dict[str, Any]:
+    """Row in effect on `date` (latest effective_date <= date); dates before the first entry get the oldest."""
+    i = bisect.bisect_right([r['effective_date'] for r in rows], date)
+    return rows[max(i - 1, 0)]
+
+
+def prices_as_of(history: Dict[Tuple[str, str, str, str], List[Dict[str, Any]]], date: str) -> List[Dict[str, Any]]:
+    """One row per (provider, region, tier), as in effect on `date`."""
+    return [price_as_of(rows, date) for rows in history.values()]
+
+
+def best_seconds(result: List[List[Optional[float]]]) -> float:
+    return sum(min(t for t in runs if t is not None) for runs in result if runs and any(t is not None for t in runs))
+
+
+def price_result(result_data: Dict[str, Any], units: Tuple[float, float, float],
+                 prices: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """Best-run compute, load and storage cost of one result against every price row."""
+    compute_units, load_sec, load_units = units
+    seconds = best_seconds(result_data.get('result', []))
+    data_size = float(result_data.get('data_size') or 0)
+    return {
+        'units': compute_units,
+        'best_seconds': seconds,
+        'compute': [seconds * compute_units * p['compute_rate'] for p in prices],
+        'load': [load_sec * load_units * p['compute_rate'] for p in prices],
+        'storage': [data_size * p['storage_per_byte'] for p in prices],
+    }
+
+
+def tier_costs(result_data: Dict[str, Any], units: Tuple[float, float, float], row: Dict[str, Any],
+               existing: Dict[str, Any]) -> Dict[str, Any]:
+    """One "costs" entry for a price row, keeping the other fields of the existing entry."""
+    compute_units, load_sec, load_units = units
+    rate = compute_units * row['compute_rate']
+    storage = float(result_data.get('data_size') or 0) * row['storage_per_byte']
+    entry = dict(existing, tier=row['tier'], provider=row['provider'], region=row['region'])
+    if row['effective_date']:
+        entry['price_effective_date'] = row['effective_date']
+    if 'cloud' in existing:
+        entry['cloud'] = row['provider']
+    entry['compute_costs'] = [[t * rate if t is not None else None for t in runs] for runs in result_data['result']]
+    entry['storage_cost'] = storage
+    if 'load_cost' in existing or result_data.get('load_time') or result_data.get('load'):
+        entry['load_cost'] = load_sec * load_units * row['compute_rate']
+    if 'storage_costs' in existing:
+        entry['storage_costs'] = [dict(sc, price_per_byte=row['storage_per_byte'], estimated_cost=storage)
+                                  for sc in existing['storage_costs']]
+    return entry
+
+
+def same(a: Any, b: Any) -> bool:
+    """Structural equality with a relative float tolerance (jq and Python print floats differently)."""
+    if isinstance(a, float) or isinstance(b, float):
+        if not isinstance(a, (int, float)) or not isinstance(b, (int, float)):
+            return False
+        return abs(a - b) <= 1e-9 * max(abs(a), abs(b), 1e-300)
+    if isinstance(a, dict) and isinstance(b, dict):
+        return a.keys() == b.keys() and all(same(a[k], b[k]) for k in a)
+    if isinstance(a, list) and isinstance(b, list):
+        return len(a) == len(b) and all(same(x, y) for x, y in zip(a, b))
+    return a == b
+
+
+def write_if_changed(path: Path, data: Any) -> bool:
+    """Write JSON only when the content differs from what is on disk."""
+    if path.exists():
+        try:
+            if same(json.loads(path.read_text()), data):
+                return False
+        except json.JSONDecodeError:
+            pass
+    path.write_text(json.dumps(data, indent=2) + '\n')
+    return True
+
+
+JSON_DECODER = json.JSONDecoder()
+JSON_SPACE = re.compile(r'\s*')
+
+
+def splice_json(text: str, old: Any, new: Any, start: int = 0, indent: str = '') -> Tuple[str, int]:
+    """`new` as json.dumps(indent=2) would print it, reusing the text of every subtree of `old` it leaves unchanged.
+
+    `old` is the value parsed from `text` at `start`; also returns where it
+    ends. Result files carry jq-formatted literals (0.070, 25.30) that a full
+    json.dumps round trip would rewrite, so --apply only touches what it changed.
+    """
+    start = JSON_SPACE.match(text, start).end()
+    _, end = JSON_DECODER.raw_decode(text, start)
+    if same(old, new):
+        return text[start:end], end
+    inner = indent + '  '
+
+    def child(old_child, new_child, pos):
+        if pos is None:
+            return json.dumps(new_child, indent=2).replace('\n', '\n' + inner)
+        return splice_json(text, old_child, new_child, pos, inner)[0]
+
+    if isinstance(old, dict) and isinstance(new, dict) and new:
+        starts, pos = {}, JSON_SPACE.match(text, start + 1).end()
+        while text[pos] != '}':
+            key, pos = JSON_DECODER.raw_decode(text, pos)
+            starts[key] = JSON_SPACE.match(text, JSON_SPACE.match(text, pos).end() + 1).end()  # past ':'
+            _, pos = JSON_DECODER.raw_decode(text, starts[key])
+            pos = JSON_SPACE.match(text, pos).end()
+            if text[pos] == ',':
+                pos = JSON_SPACE.match(text, pos + 1).end()
+        members = [f'{inner}{json.dumps(k)}: {child(old.get(k), v, starts.get(k))}' for k, v in new.items()]
+        return '{\n' + ',\n'.join(members) + '\n' + indent + '}', end
+    if isinstance(old, list) and isinstance(new, list) and new and len(old) == len(new):
+        items, pos = [], start + 1
+        for old_item, new_item in zip(old, new):
+            text_item, pos = splice_json(text, old_item, new_item, pos, inner)
+            items.append(inner + text_item)
+            pos = JSON_SPACE.match(text, pos).end() + 1  # past ',' or ']'
+        return '[\n' + ',\n'.join(items) + '\n' + indent + ']', end
+    return json.dumps(new, indent=2).replace('\n', '\n' + indent), end
+
+
+def build_vendor(base_dir: Path, vendor: str, providers: Optional[List[str]], regions: Optional[List[str]],
+                 apply: Optional[Tuple[str, str]], as_of: Optional[str] = None,
+                 write: bool = True) -> Dict[str, Any]:
+    """Price every result of a vendor; write the matrix and, with apply, the result files.
+
+    Each result is priced with the prices in effect on its own "date", or on
+    `as_of` for the whole corpus.
+    """
+    adapter = ADAPTERS[vendor]
+    vendor_dir = base_dir / vendor
+    prices = [p for p in adapter['prices'](vendor_dir)
+              if (not providers or p['provider'] in providers) and (not regions or p['region'] in regions)]
+    history = build_history(vendor, prices)
+    if apply and not any(key[1:3] == apply for key in history):
+        have = sorted({'/'.join(key[1:3]) for key in history})
+        raise ValueError(f'{vendor}: no prices for {apply[0]}/{apply[1]} (has {", ".join(have)})')
+
+    matrix = {
+        'as_of': as_of,
+        'columns': [{'provider': k[1], 'region': k[2], 'tier': k[3]} for k in history],
+        'history': {
+            '/'.join(k[1:]): [{k2: v for k2, v in r.items() if k2 not in ('warehouses', 'provider', 'region', 'tier')}
+                              for r in rows]
+            for k, rows in history.items()
+        },
+        'results': {},
+    }
+    written = unchanged = 0
+    for result_dir in RESULT_DIRS:
+        for path in sorted((vendor_dir / result_dir).glob('*.json')):
+            text = path.read_text()
+            result_data = json.loads(text)
+            if 'result' not in result_data:
+                continue
+            date = as_of or result_data.get('date') or LATEST
+            in_effect = prices_as_of(history, date)
+            try:
+                units = adapter['units'](result_data, in_effect)
+            except ValueError as e:
+                print(f'⚠️  {path}: {e}', file=sys.stderr)
+                continue
+            entry = price_result(result_data, units, in_effect)
+            entry['priced_as_of'] = date
+            entry['effective_dates'] = [p['effective_date'] for p in in_effect]
+            matrix['results'][f'{result_dir}/{path.stem}'] = entry
+
+            if apply and write:
+                existing = {t['tier']: t for t in result_data.get('costs', []) if 'billing_variant' not in t}
+                had_variants = any('billing_variant' in t for t in result_data.get('costs', []))
+                rows = [p for p in in_effect if (p['provider'], p['region']) == apply]
+                updated = dict(result_data, costs=[
+                    tier_costs(result_data, units, row, existing.get(row['tier'], {})) for row in rows
+                ])
+                if had_variants:
+                    apply_rules(updated, load_rules(vendor))
+                if same(result_data, updated):
+                    unchanged += 1
+                    continue
+                path.write_text(splice_json(text, result_data, updated)[0] + '\n')
+                written += 1
+
+    matrix_written = write and write_if_changed(vendor_dir / 'price_matrix.json', matrix)
+    return {'vendor': vendor, 'matrix': matrix, 'matrix_written': matrix_written,
+            'results_written': written, 'results_unchanged': unchanged}
+
+
+def compare_dates(current: Dict[str, Any], repriced: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """Best-run compute cost summed over all results, per column, under two pricings."""
+    rows = []
+    for i, column in enumerate(current['columns']):
+        before = sum(r['compute'][i] for r in current['results'].values())
+        after = sum(r['compute'][i] for r in repriced['results'].values())
+        rows.append(dict(column, at_result_dates=before, at_as_of=after,
+                         change=(after - before) / before if before else None))
+    return rows
+
+
+def render_matrix(report: Dict[str, Any]) -> str:
+    columns = report['matrix']['columns']
+    header = ' | '.join(f"{c['provider']}/{c['region']} {c['tier']}" for c in columns)
+    lines = [f"{report['vendor']} best-run compute cost ($):", '',
+             f'| Result | {header} |', '|---' * (len(columns) + 1) + '|']
+    for key, entry in report['matrix']['results'].items():
+        lines.append(f'| {key} | ' + ' | '.join(f'{c:.4f}' for c in entry['compute']) + ' |')
+    return '\n'.join(lines)
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='Price every result against every provider/region/tier in one pass'
+    )
+    parser.add_argument('--vendors', type=lambda v: [s for s in v.split(',') if s.strip()],
+                        default=list(ADAPTERS), help=f'Comma-separated vendors (default: {",".join(ADAPTERS)})')
+    parser.add_argument('--providers', type=lambda v: v.split(','), help='Only these providers (e.g. aws,gcp)')
+    parser.add_argument('--regions', type=lambda v: v.split(','), help='Only these regions')
+    parser.add_argument('--apply', help='Recompute the result files\' costs for PROVIDER/REGION')
+    parser.add_argument('--as-of', help='Price the whole corpus as of this date (YYYY-MM-DD; default: each result\'s date)')
+    parser.add_argument('--compare-to', metavar='DATE',
+                        help='Report how costs change from each result\'s date to DATE (writes nothing)')
+    parser.add_argument('--show', action='store_true', help='Print the best-run compute cost matrix')
+
+    args = parser.parse_args()
+    unknown = set(args.vendors) - set(ADAPTERS)
+    if unknown:
+        parser.error(f'no price table for: {", ".join(sorted(unknown))}')
+    apply = tuple(args.apply.split('/', 1)) if args.apply else None
+    if apply and len(apply) != 2:
+        parser.error('--apply takes PROVIDER/REGION, e.g. gcp/us-east1')
+
+    base_dir = Path(__file__).parent
+    for vendor in args.vendors:
+        try:
+            if args.compare_to:
+                current = build_vendor(base_dir, vendor, args.providers, args.regions, None, write=False)
+                repriced = build_vendor(base_dir, vendor, args.providers, args.regions, None,
+                                        as_of=args.compare_to, write=False)
+                print(f'{vendor}: best-run compute cost, all results, priced at result dates vs {args.compare_to}')
+                for row in compare_dates(current['matrix'], repriced['matrix']):
+                    change = '-' if row['change'] is None else f"{row['change']:+.1%}"
+                    print(f"  {row['provider']}/{row['region']} {row['tier']}: "
+                          f"${row['at_result_dates']:.4f} -> ${row['at_as_of']:.4f} ({change})")
+                continue
+            report = build_vendor(base_dir, vendor, args.providers, args.regions, apply, args.as_of)
+        except (OSError, ValueError) as e:
+            print(f'❌ {e}', file=sys.stderr)
+            sys.exit(1)
+        matrix = report['matrix']
+        status = 'written' if report['matrix_written'] else 'unchanged'
+        print(f"{vendor}: {len(matrix['results'])} results x {len(matrix['columns'])} prices, "
+              f"price_matrix.json {status}", end='')
+        if apply:
+            print(f", results {report['results_written']} written / {report['results_unchanged']} unchanged", end='')
+        print()
+        if args.show:
+            print(render_matrix(report) + '\n')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,338 @@
+#!/usr/bin/env python3
+"""
+Local read-only HTTP query service for the benchmark results.
+
+generate_visualization.py bakes every data point into benchmark_explorer.html,
+so new data means regenerating the page and the page carries the whole corpus.
+This loads the results once (the same loader, billing variants included),
+precomputes the aggregates the explorer needs and answers JSON queries:
+
+    GET /api/meta                          data version, vendors, scales, configs per vendor/scale
+    GET /api/results?scale=&vendor=&config=&tier=&nodes=&memory_gib=
+                                           explorer data points (tiers trimmed to tier=);
+                                           nodes/memory_gib match the config descriptor
+    GET /api/queries?vendor=&scale=&config=[&tier=]
+                                           per-query drilldown: runs, best run, cost of the best run per tier
+    GET /api/rankings?scale=[&by=cost|runtime|cost_perf][&billing=measured|isolated|session]
+                     [&vendor=][&tier=][&limit=]
+                                           config x tier rows, best first
+    GET /api/models                        scaling_model.py fits, keyed by explorer vendor
+    GET /                                  the explorer, fetching results per scale from this service
+
+Filters take comma-separated values. Every response carries an ETag derived
+from the data version and the body; requests with a matching If-None-Match get
+304 Not Modified, and serialized bodies are cached per query. The data is not
+reloaded while the server runs: restart it after enriching new results.
+
+A static benchmark_explorer.html also uses the service when opened with
+?api=http://host:port.
+
+Usage:
+    python query_server.py                             # http://127.0.0.1:8765/
+    python query_server.py --host 0.0.0.0 --port 9000 --cors-origin https://portal.example.com
+    curl 'http://127.0.0.1:8765/api/rankings?scale=100B&by=cost_perf&limit=5'
+"""
+
+import argparse
+import gzip
+import hashlib
+import json
+import sys
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Dict, List, Any, Optional, Tuple
+from urllib.parse import parse_qs, urlsplit
+
+from cost_engine import VARIANTS
+from generate_visualization import SCALES, extract_data_point, fit_models, iter_results, render_html
+
+RANKINGS = {
+    'cost': lambda r: r['cost'],
+    'runtime': lambda r: r['runtime'],
+    'cost_perf': lambda r: r['score'],
+}
+
+# Serialized responses kept per (path, query); cleared when full
+CACHE_SIZE = 1024
+# Bodies smaller than this are not worth compressing
+GZIP_MIN_BYTES = 1024
+
+
+def best_runs(result: List[List[Optional[float]]]) -> List[Optional[int]]:
+    """Index of the fastest run of every query (None if every run failed)."""
+    best = []
+    for runs in result:
+        valid = [(t, i) for i, t in enumerate(runs or []) if t is not None]
+        best.append(min(valid)[1] if valid else None)
+    return best
+
+
+def query_drilldown(result_data: Dict[str, Any]) -> Dict[str, Any]:
+    """Per-query runs and the cost of each query's best run per tier."""
+    result = result_data.get('result', [])
+    best = best_runs(result)
+    costs = {}
+    for tier in result_data.get('costs', []):
+        compute = tier.get('compute_costs', [])
+        costs[tier['tier']] = [
+            compute[q][r] if r is not None and q < len(compute) and r < len(compute[q] or []) else None
+            for q, r in enumerate(best)
+        ]
+    return {
+        'runs': result,
+        'best_run': best,
+        'best_runtime': [result[q][r] if r is not None else None for q, r in enumerate(best)],
+        'best_cost': costs,
+    }
+
+
+def billing_of(tier: str) -> str:
+    for variant in VARIANTS:
+        if tier.endswith(f' ({variant})'):
+            return variant
+    return 'measured'
+
+
+def build_index(base_dir: Path) -> Dict[str, Any]:
+    """Load every result once and precompute the aggregates the endpoints serve."""
+    points, queries = [], {}
+    for vendor, scale, config, result_data in iter_results(base_dir):
+        try:
+            point = extract_data_point(result_data, scale, vendor, config)
+        except Exception as e:
+            print(f'⚠️  {vendor} {scale} {config}: {e}', file=sys.stderr)
+            continue
+        points.append(point)
+        queries[(vendor, scale, config)] = query_drilldown(result_data)
+    points.sort(key=lambda p: (p['scale'], p['vendor'], p['config']))
+
+    rankings = {}
+    for scale in SCALES:
+        rows = [{
+            'vendor': p['vendor'], 'config': p['config'], 'tier': t['name'], 'billing': billing_of(t['name']),
+            'runtime': p['runtime'], 'cost': t['compute_cost'], 'score': p['runtime'] * t['compute_cost'],
+        } for p in points if p['scale'] == scale for t in p['tiers']]
+        rankings[scale] = {by: sorted(rows, key=key) for by, key in RANKINGS.items()}
+
+    vendor_names = sorted({p['vendor'] for p in points})
+    models = fit_models(base_dir, vendor_names)
+
+    configs = {}
+    for p in points:
+        configs.setdefault(p['vendor'], {}).setdefault(p['scale'], []).append(p['config'])
+    version = hashlib.sha1(json.dumps([points, models], sort_keys=True).encode()).hexdigest()[:16]
+    return {
+        'version': version,
+        'points': points,
+        'queries': queries,
+        'rankings': rankings,
+        'models': models,
+        'meta': {'version': version, 'count': len(points), 'vendors': vendor_names,
+                 'scales': SCALES, 'configs': configs},
+        'page': render_html([], models, api_base='', vendors=vendor_names).encode(),
+    }
+
+
+def values(params: Dict[str, List[str]], name: str) -> Optional[List[str]]:
+    """Comma-separated (or repeated) query parameter as a list; None when absent."""
+    if name not in params:
+        return None
+    return [v for raw in params[name] for v in raw.split(',') if v]
+
+
+def single(params: Dict[str, List[str]], name: str, default: Optional[str] = None) -> Optional[str]:
+    return params[name][-1] if params.get(name) else default
+
+
+class QueryError(Exception):
+    def __init__(self, status: int, message: str):
+        super().__init__(message)
+        self.status = status
+
+
+def query_results(index: Dict[str, Any], params: Dict[str, List[str]]) -> List[Dict[str, Any]]:
+    vendors, scales = values(params, 'vendor'), values(params, 'scale')
+    configs, tiers = values(params, 'config'), values(params, 'tier')
+    try:
+        descriptor_filters = {key: [float(v) for v in values(params, key)]
+                              for key in ('nodes', 'memory_gib') if values(params, key)}
+    except ValueError:
+        raise QueryError(400, 'nodes and memory_gib must be numbers')
+    matches = []
+    for p in index['points']:
+        if (vendors and p['vendor'] not in vendors) or (scales and p['scale'] not in scales) \
+                or (configs and p['config'] not in configs):
+            continue
+        if any(p['descriptor'][key] not in wanted for key, wanted in descriptor_filters.items()):
+            continue
+        if tiers:
+            kept = [t for t in p['tiers'] if t['name'] in tiers]
+            if not kept:
+                continue
+            p = dict(p, tiers=kept)
+        matches.append(p)
+    return matches
+
+
+def query_queries(index: Dict[str, Any], params: Dict[str, List[str]]) -> Dict[str, Any]:
+    key = tuple(single(params, name) for name in ('vendor', 'scale', 'config'))
+    if None in key:
+        raise QueryError(400, 'vendor, scale and config are required')
+    drilldown = index['queries'].get(key)
+    if drilldown is None:
+        raise QueryError(404, f'no result for {"/".join(key)}')
+    tiers = values(params, 'tier')
+    if tiers:
+        drilldown = dict(drilldown, best_cost={t: c for t, c in drilldown['best_cost'].items() if t in tiers})
+    return dict(zip(('vendor', 'scale', 'config'), key), **drilldown)
+
+
+def query_rankings(index: Dict[str, Any], params: Dict[str, List[str]]) -> List[Dict[str, Any]]:
+    scale, by = single(params, 'scale'), single(params, 'by', 'cost_perf')
+    if scale not in index['rankings']:
+        raise QueryError(400, f'scale must be one of {", ".join(SCALES)}')
+    if by not in RANKINGS:
+        raise QueryError(400, f'by must be one of {", ".join(RANKINGS)}')
+    billing = single(params, 'billing', 'measured')
+    vendors, tiers = values(params, 'vendor'), values(params, 'tier')
+    try:
+        limit = int(single(params, 'limit', '0'))
+    except ValueError:
+        raise QueryError(400, 'limit must be an integer')
+    rows = []
+    for row in index['rankings'][scale][by]:
+        if row['billing'] != billing or (vendors and row['vendor'] not in vendors) \
+                or (tiers and row['tier'] not in tiers):
+            continue
+        rows.append(dict(row, rank=len(rows) + 1))
+        if limit and len(rows) == limit:
+            break
+    return rows
+
+
+ENDPOINTS = {
+    '/api/meta': lambda index, params: index['meta'],
+    '/api/results': query_results,
+    '/api/queries': query_queries,
+    '/api/rankings': query_rankings,
+    '/api/models': lambda index, params: index['models'],
+}
+
+
+class QueryHandler(BaseHTTPRequestHandler):
+    """GET/HEAD only; the index and response cache live on the server."""
+
+    server_version = 'Bench2CostQuery/1.0'
+
+    def do_GET(self):
+        self.respond(send_body=True)
+
+    def do_HEAD(self):
+        self.respond(send_body=False)
+
+    def respond(self, send_body: bool):
+        url = urlsplit(self.path)
+        try:
+            body, etag, content_type = self.lookup(url.path, url.query)
+            status = 200
+        except QueryError as e:
+            status, etag, content_type = e.status, None, 'application/json'
+            body = json.dumps({'error': str(e)}).encode()
+
+        if etag and etag in [t.strip() for t in self.headers.get('If-None-Match', '').split(',')]:
+            self.send_response(304)
+            self.send_common_headers(etag)
+            self.end_headers()
+            return
+
+        gzipped = len(body) >= GZIP_MIN_BYTES and 'gzip' in self.headers.get('Accept-Encoding', '')
+        if gzipped:
+            body = self.server.compressed(etag, body) if etag else gzip.compress(body)
+        self.send_response(status)
+        self.send_common_headers(etag)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(body)))
+        if gzipped:
+            self.send_header('Content-Encoding', 'gzip')
+        self.end_headers()
+        if send_body:
+            self.wfile.write(body)
+
+    def send_common_headers(self, etag: Optional[str]):
+        if etag:
+            self.send_header('ETag', etag)
+        # Cached copies are revalidated on every use, which costs a 304 at most
+        self.send_header('Cache-Control', 'no-cache')
+        self.send_header('Vary', 'Accept-Encoding')
+        self.send_header('Access-Control-Allow-Origin', self.server.cors_origin)
+        self.send_header('Access-Control-Expose-Headers', 'ETag')
+
+    def lookup(self, path: str, query: str) -> Tuple[bytes, str, str]:
+        """(body, ETag, content type) of a request, serialized once per distinct query."""
+        params = parse_qs(query)
+        key = (path, tuple(sorted((k, tuple(v)) for k, v in params.items())))
+        cached = self.server.responses.get(key)
+        if cached:
+            return cached
+
+        index = self.server.index
+        if path in ('/', '/benchmark_explorer.html'):
+            body, content_type = index['page'], 'text/html; charset=utf-8'
+        elif path in ENDPOINTS:
+            body = json.dumps(ENDPOINTS[path](index, params)).encode()
+            content_type = 'application/json'
+        else:
+            raise QueryError(404, f'unknown path {path}')
+
+        etag = f'"{index["version"]}-{hashlib.sha1(body).hexdigest()[:12]}"'
+        if len(self.server.responses) >= CACHE_SIZE:
+            self.server.responses.clear()
+        self.server.responses[key] = (body, etag, content_type)
+        return body, etag, content_type
+
+
+class QueryServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, address: Tuple[str, int], index: Dict[str, Any], cors_origin: str = '*'):
+        super().__init__(address, QueryHandler)
+        self.index = index
+        self.cors_origin = cors_origin
+        self.responses = {}
+        self.gzipped = {}
+
+    def compressed(self, etag: str, body: bytes) -> bytes:
+        if etag not in self.gzipped:
+            if len(self.gzipped) >= CACHE_SIZE:
+                self.gzipped.clear()
+            self.gzipped[etag] = gzip.compress(body)
+        return self.gzipped[etag]
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='Serve the benchmark results as read-only JSON queries (and the explorer that uses them)'
+    )
+    parser.add_argument('--host', default='127.0.0.1', help='Address to bind (default: 127.0.0.1)')
+    parser.add_argument('--port', type=int, default=8765, help='Port (default: 8765)')
+    parser.add_argument('--cors-origin', default='*',
+                        help='Access-Control-Allow-Origin for pages embedding the explorer (default: *)')
+
+    args = parser.parse_args()
+
+    print('Loading benchmark results...')
+    index = build_index(Path(__file__).parent)
+    print(f"Indexed {index['meta']['count']} results (data version {index['version']})")
+
+    server = QueryServer((args.host, args.port), index, args.cors_origin)
+    print(f'Serving on http://{args.host}:{server.server_address[1]}/ (Ctrl+C to stop)')
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,284 @@
+#!/usr/bin/env python3
+# -----------------------------------------------------------------------------
+# collect_metrics.py — Attribute Redshift Serverless charged RPU-seconds per run
+#
+# Replacement for get_metrics.sh, which spreads a whole day of
+# SYS_SERVERLESS_USAGE.charged_seconds over queries by their share of elapsed
+# time. That badly overcharges long queries and undercharges short ones.
+#
+# This collector works per usage window instead (SYS_SERVERLESS_USAGE has one
+# row per interval, typically one minute):
+#   1. each run's busy interval is [end_time - execution_time, end_time];
+#      queue time is excluded (nothing runs) and compile time is reported
+#      separately;
+#   2. a window's charged RPU-seconds are split between the runs busy in it,
+#      proportionally to their overlap with the window, so concurrent runs
+#      share the charge;
+#   3. charged windows with no busy run (the 60-second minimum charge after a
+#      short query, idle scale-down) are carried back to the runs of the last
+#      busy window if they start within --min-charge-sec of it; anything else
+#      is reported as unattributed.
+#
+# Runs are found by the per-run "query_ids" run_benchmark.py records. Files
+# without ids fall back to query_group (SYS_QUERY_HISTORY.query_label, the
+# "query_groups" in the result file); that label is shared by every statement
+# the session sent for the run, e.g. the driver's pg_last_query_id() probe.
+# Older run.sh results without either can be resolved with --start/--end:
+# SELECT statements in the window are assigned to runs in start-time order,
+# as get_metrics.sh did.
+#
+# Per-run arrays merged into the result JSON ([query][run], like "result"):
+#   billed_times   – attributed RPU-seconds (consumed by ../../enrich.sh)
+#   queue_sec, compile_sec, execution_sec
+# plus "rpu_attribution": totals for charged / attributed / unattributed, and,
+# in the "timing" block, server_sec = elapsed_time (queue + compile +
+# execution), the engine total compare_results.py --timing server uses.
+# -----------------------------------------------------------------------------
+
+import os
+import json
+import time
+import argparse
+from datetime import timedelta
+import redshift_connector
+
+
+# Phases SYS_QUERY_HISTORY.elapsed_time covers (timing.server_includes, see metrics.py)
+SERVER_INCLUDES = ["queue", "compile", "execution"]
+
+
+def escape_literal(s: str) -> str:
+    """Escape single quotes for safe inclusion in an IN (...) list."""
+    return s.replace("'", "''")
+
+
+def overlap_sec(a_start, a_end, b_start, b_end) -> float:
+    return max(0.0, (min(a_end, b_end) - max(a_start, b_start)).total_seconds())
+
+
+def attribute(runs, windows, min_charge_sec):
+    """Split each window's charged RPU-seconds across the runs busy in it.
+
+    runs:    {key: (busy_start, busy_end)}
+    windows: [(start, end, charged_rpu_seconds)] sorted by start
+    Returns ({key: rpu_seconds}, unattributed_rpu_seconds).
+    """
+    attributed = {key: 0.0 for key in runs}
+    unattributed = 0.0
+    last_shares, last_busy_end = None, None
+
+    for w_start, w_end, charged in windows:
+        busy = {
+            key: overlap_sec(start, end, w_start, w_end)
+            for key, (start, end) in runs.items()
+            if start < w_end and end > w_start
+        }
+        busy = {key: sec for key, sec in busy.items() if sec > 0}
+        total = sum(busy.values())
+
+        if total > 0:
+            shares = {key: sec / total for key, sec in busy.items()}
+            last_shares = shares
+            last_busy_end = max(runs[key][1] for key in busy)
+        elif last_shares and (w_start - last_busy_end).total_seconds() < min_charge_sec:
+            # Minimum charge / scale-down tail of the previous busy window
+            shares = last_shares
+        else:
+            unattributed += charged or 0
+            continue
+
+        for key, share in shares.items():
+            attributed[key] += (charged or 0) * share
+
+    return attributed, unattributed
+
+
+def fetch_runs(cur, key_column, keys, chunk_size, max_wait, interval):
+    """Look up runs by query_id or query_label, polling until SYS_QUERY_HISTORY has them all."""
+    pending = set(keys)
+    rows = []
+    start_ts = time.time()
+
+    while pending:
+        batch = sorted(pending)
+        for i in range(0, len(batch), chunk_size):
+            in_list = ",".join(f"'{escape_literal(k)}'" for k in batch[i : i + chunk_size])
+            cur.execute(f"""
+                SELECT {key_column}, start_time, end_time,
+                       queue_time, compile_time, execution_time, elapsed_time, status
+                FROM sys_query_history
+                WHERE {key_column} IN ({in_list})
+                  AND query_type = 'SELECT'
+                  AND query_text NOT ILIKE '%pg_last_query_id%'
+                  AND status IN ('success', 'failed', 'canceled')
+            """)
+            for row in cur.fetchall():
+                if row[0] in pending:
+                    pending.discard(row[0])
+                    rows.append(row)
+        if not pending or (time.time() - start_ts) >= max_wait:
+            break
+        print(f"  Waiting on {len(pending)} runs in SYS_QUERY_HISTORY (sleeping {interval}s)...")
+        time.sleep(interval)
+
+    if pending:
+        print(f"⚠️  {len(pending)} runs not found after {max_wait}s; they get null metrics.")
+    return rows
+
+
+def fetch_runs_in_window(cur, start, end, user):
+    cur.execute(f"""
+        SELECT h.query_id::varchar, h.start_time, h.end_time,
+               h.queue_time, h.compile_time, h.execution_time, h.elapsed_time, h.status
+        FROM sys_query_history h
+        JOIN pg_user u ON u.usesysid = h.user_id
+        WHERE h.start_time >= '{escape_literal(start)}'::timestamp
+          AND h.start_time <  '{escape_literal(end)}'::timestamp
+          AND u.usename = '{escape_literal(user)}'
+          AND h.query_type = 'SELECT'
+        ORDER BY h.start_time
+    """)
+    return cur.fetchall()
+
+
+def fetch_windows(cur, start, end):
+    cur.execute(f"""
+        SELECT start_time, end_time, charged_seconds
+        FROM sys_serverless_usage
+        WHERE end_time   > '{start}'::timestamp
+          AND start_time < '{end}'::timestamp
+        ORDER BY start_time
+    """)
+    return cur.fetchall()
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Attribute Redshift Serverless charged RPU-seconds to benchmark runs"
+    )
+    parser.add_argument(
+        "input",
+        help="Result JSON (query_ids / query_groups from run_benchmark.py, or use --start/--end)",
+    )
+    parser.add_argument(
+        "--output",
+        help="Where to write the merged result JSON (default: overwrite input)",
+    )
+    parser.add_argument("--start", help='Window start for results without query_groups ("YYYY-MM-DD HH:MM:SS" UTC)')
+    parser.add_argument("--end", help="Window end for results without query_groups")
+    parser.add_argument("--database", default="dev", help="Database (default: dev)")
+    parser.add_argument("--user", default="dev", help="User that ran the benchmark (default: dev)")
+    parser.add_argument(
+        "--min-charge-sec",
+        type=int,
+        default=60,
+        help="Minimum charge carried back to the last busy window (default: 60)",
+    )
+    parser.add_argument(
+        "--chunk-size",
+        type=int,
+        default=200,
+        help="Runs per lookup (default: 200)",
+    )
+    parser.add_argument("--max-wait-sec", type=int, default=300, help="Max wait for runs to appear (default: 300)")
+    parser.add_argument("--poll-interval-sec", type=int, default=10, help="Polling interval (default: 10)")
+
+    args = parser.parse_args()
+    output_path = args.output or args.input
+
+    with open(args.input, "r", encoding="utf-8") as f:
+        bench = json.load(f)
+
+    query_ids = bench.get("query_ids")
+    if query_ids and any(i is not None for runs in query_ids for i in runs):
+        id_keys = [[None if i is None else str(i) for i in runs] for runs in query_ids]
+    else:
+        id_keys = None
+    query_groups = bench.get("query_groups")
+    if not id_keys and not query_groups and not (args.start and args.end):
+        raise SystemExit(f"❌ {args.input} has no query_ids or query_groups; pass --start and --end")
+
+    conn = redshift_connector.connect(
+        host=os.environ["FQDN"],
+        port=5439,
+        database=args.database,
+        user=args.user,
+        password=os.environ["PASSWORD"],
+    )
+    try:
+        cur = conn.cursor()
+        if id_keys:
+            rows = fetch_runs(
+                cur, "query_id::varchar", [k for runs in id_keys for k in runs if k],
+                args.chunk_size, args.max_wait_sec, args.poll_interval_sec,
+            )
+            keys = id_keys
+        elif query_groups:
+            labels = [l for runs in query_groups for l in runs if l]
+            rows = fetch_runs(
+                cur, "TRIM(query_label)", labels, args.chunk_size, args.max_wait_sec, args.poll_interval_sec
+            )
+            keys = query_groups
+        else:
+            rows = fetch_runs_in_window(cur, args.start, args.end, args.user)
+            tries = len(bench["result"][0])
+            ids = [row[0] for row in rows]
+            keys = [ids[i : i + tries] for i in range(0, len(ids), tries)]
+            if len(keys) != len(bench["result"]):
+                print(f"⚠️  Found {len(ids)} queries in the window, expected {len(bench['result']) * tries}")
+        print(f"Resolved {len(rows)} runs in SYS_QUERY_HISTORY")
+
+        details = {}
+        for key, start, end, queue_us, compile_us, exec_us, elapsed_us, status in rows:
+            if status.strip().lower() != "success":
+                continue
+            details[key] = {
+                "busy": (end - timedelta(microseconds=exec_us), end),
+                "queue_sec": queue_us / 1e6,
+                "compile_sec": compile_us / 1e6,
+                "execution_sec": exec_us / 1e6,
+                "server_sec": elapsed_us / 1e6,
+            }
+        if not details:
+            raise SystemExit("❌ No successful runs found")
+
+        first = min(d["busy"][0] for d in details.values())
+        # Include the minimum-charge tail after the last run
+        last = max(d["busy"][1] for d in details.values()) + timedelta(seconds=args.min_charge_sec)
+        windows = fetch_windows(cur, first.strftime("%Y-%m-%d %H:%M:%S"), last.strftime("%Y-%m-%d %H:%M:%S"))
+    finally:
+        conn.close()
+
+    print(f"Attributing {len(windows)} usage windows across {len(details)} runs")
+    rpu, unattributed = attribute(
+        {key: d["busy"] for key, d in details.items()}, windows, args.min_charge_sec
+    )
+
+    bench["billed_times"] = [[round(rpu[k], 3) if k in rpu else None for k in runs] for runs in keys]
+    for metric in ("queue_sec", "compile_sec", "execution_sec"):
+        bench[metric] = [[(details.get(k) or {}).get(metric) for k in runs] for runs in keys]
+    bench["timing"] = dict(
+        bench.get("timing") or {},
+        server_sec=[[(details.get(k) or {}).get("server_sec") for k in runs] for runs in keys],
+        server_includes=SERVER_INCLUDES,
+    )
+
+    charged = sum(w[2] or 0 for w in windows)
+    bench["rpu_attribution"] = {
+        "charged_rpu_seconds": charged,
+        "attributed_rpu_seconds": round(sum(rpu.values()), 3),
+        "unattributed_rpu_seconds": round(unattributed, 3),
+        "windows": len(windows),
+        "min_charge_sec": args.min_charge_sec,
+    }
+
+    with open(output_path, "w", encoding="utf-8") as f:
+        json.dump(bench, f, indent=2)
+
+    print(f"\n✅ {sum(rpu.values()):.1f} of {charged} charged RPU-seconds attributed "
+          f"({unattributed:.1f} unattributed)")
+    print(f"Wrote merged metrics to {output_path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -15,6 +15,14 @@ TRIES="$4"
 CURRENT_DATE=$(echo "$START_TIME" | cut -d' ' -f1)
 OUTPUT_FILE="results/serverless_100b.json"
 
+# Optional: LOAD_STATS=load_stats_<table>.json from load_until.sh
+LOAD_TIME=1889
+LOAD_JSON="null"
+if [ -n "${LOAD_STATS:-}" ]; then
+    LOAD_JSON=$(jq -c . "$LOAD_STATS")
+    LOAD_TIME=$(jq -r '.seconds // 0' <<< "$LOAD_JSON")
+fi
+
 mkdir -p results
 
 TEMP_FILE=$(mktemp)
@@ -144,7 +152,8 @@ cat > "$OUTPUT_FILE" << EOF
     "tuned": "no",
     "comment": "",
     "tags": ["serverless", "column-oriented", "aws", "managed"],
-    "load_time": 1889,
+    "load_time": $LOAD_TIME,
+    "load": $LOAD_JSON,
     "data_size": 30300000000,
     "result": $result,
     "billed_times": $billed_result
@@ -18,6 +18,12 @@ set -euo pipefail
 #   CSV_HAS_HEADER=1  (treat first row as header)
 #   S3_PREFIX=""      (optional S3 prefix)
 #   REGION="us-west-2" (AWS region)
+#   LOAD_STATS=load_stats_<table>.json  (where load statistics are written)
+#   USAGE_MAX_WAIT_SEC=900  (how long to wait for the last usage window to be published)
+#
+# Load statistics (wall time, rows/s, bytes/s and the RPU-seconds charged in
+# SYS_SERVERLESS_USAGE over the load window) go to $LOAD_STATS; pass the same
+# LOAD_STATS to get_metrics.sh so enrich.sh can price the load.
 
 TABLE="${1:?Usage: $0 <schema.table> [csv_file] [target_rows] }"
 CSV="${2:-hits.csv.gz}"
@@ -25,7 +31,9 @@ TARGET="${3:-1000000000}"
 
 # -------- helpers ---------
 need() { command -v "$1" >/dev/null 2>&1 || { echo "ERROR: '$1' not found in PATH" >&2; exit 1; }; }
-need aws; need jq
+need aws; need jq; need python3
+# Shared load-stats writer (repository root), so every loader writes one schema
+LOAD_STATS_PY="$(cd "$(dirname "$0")/../../.." && pwd)/load_stats.py"
 
 # CSV is now set from command line args
 : "${REDSHIFT_WORKGROUP:?Set REDSHIFT_WORKGROUP}"
@@ -34,6 +42,8 @@ need aws; need jq
 : "${S3_BUCKET:?Set S3_BUCKET}"
 
 S3_PREFIX="${S3_PREFIX:-}"
+LOAD_STATS="${LOAD_STATS:-load_stats_${TABLE//./_}.json}"
+USAGE_MAX_WAIT_SEC="${USAGE_MAX_WAIT_SEC:-900}"
 CSV_HAS_HEADER="${CSV_HAS_HEADER:-0}"
 
 SCHEMA="${TABLE%%.*}"
@@ -106,6 +116,36 @@ row_count() {
   echo "${val:-0}"
 }
 
+table_bytes() {
+  # SVV_TABLE_INFO.size is in 1 MB blocks
+  local val
+  val="$(aws_redshift_sql_value "SELECT size FROM svv_table_info WHERE \"schema\" = '$SCHEMA' AND \"table\" = '$NAME'")"
+  echo $(( ${val:-0} * 1048576 ))
+}
+
+charged_rpu_seconds() {
+  # RPU-seconds charged (60 s minimum included) in every usage window overlapping
+  # two UTC timestamps, matched like collect_metrics.py fetch_windows
+  aws_redshift_sql_value "SELECT COALESCE(SUM(charged_seconds), 0)::bigint FROM sys_serverless_usage
+                          WHERE end_time > '$1'::timestamp AND start_time < '$2'::timestamp"
+}
+
+wait_for_usage() {
+  # SYS_SERVERLESS_USAGE publishes windows with a delay; wait (bounded) until
+  # one ending at or after the given UTC timestamp exists
+  local waited=0
+  until [[ "$(aws_redshift_sql_value "SELECT COUNT(*) FROM sys_serverless_usage
+                                       WHERE end_time >= '$1'::timestamp")" -gt 0 ]]; do
+    if (( waited >= USAGE_MAX_WAIT_SEC )); then
+      echo "WARNING: no usage window ending after $1 after ${waited}s; load RPU-seconds may be low" >&2
+      return 0
+    fi
+    echo "  Waiting for SYS_SERVERLESS_USAGE to reach $1 (${waited}s)..." >&2
+    sleep 30
+    waited=$(( waited + 30 ))
+  done
+}
+
 run_copy() {
   # Extract schema and table name
   IFS='.' read -r SCHEMA NAME <<< "$TABLE"
@@ -183,6 +223,11 @@ if (( current >= TARGET )); then
   exit 0
 fi
 
+rows_before=$current
+bytes_before=$(table_bytes)
+load_start=$(date +%s)
+load_start_ts="$(date -u '+%Y-%m-%d %H:%M:%S')"
+
 iter=0
 while (( current < TARGET )); do
   iter=$((iter+1))
@@ -233,6 +278,14 @@ while (( current < TARGET )); do
 done
 
 echo "Load process completed. Final row count: $current"
+
+# --- Load statistics ---
+load_seconds=$(( $(date +%s) - load_start ))
+load_end_ts="$(date -u '+%Y-%m-%d %H:%M:%S')"
+wait_for_usage "$load_end_ts"
+python3 "$LOAD_STATS_PY" --output "$LOAD_STATS" --table "$TABLE" \
+  --rows "$(( current - rows_before ))" --bytes "$(( $(table_bytes) - bytes_before ))" \
+  --seconds "$load_seconds" --billed "{\"rpu_seconds\": $(charged_rpu_seconds "$load_start_ts" "$load_end_ts")}"
 if (( current >= TARGET )); then
   echo "Successfully reached target of $TARGET rows!"
 else
@@ -100,9 +100,15 @@ jq -n \
     comment: $r.comment,
     tags: $r.tags,
     load_time: $r.load_time,
+    load: $r.load,
     data_size: $r.data_size,
     result: $r.result,
     billed_times: $r.billed_times,
+    queue_sec: $r.queue_sec,
+    compile_sec: $r.compile_sec,
+    execution_sec: $r.execution_sec,
+    metrics: $r.metrics,
+    timing: $r.timing,
     costs:
       (
         # Capacity: one entry per (variant x period x tier)
@@ -121,6 +127,7 @@ jq -n \
                       pricing_variant: $cp.variant,
                       billing_period: $cp.period,
                       compute_costs: map2d($r.billed_times; ($t.price_usd / $t.price_unit_seconds)),
+                      load_cost: (($r.load.billed.rpu_seconds // 0) * ($t.price_usd / $t.price_unit_seconds)),
                       pricing_base: {
                         price_usd: $t.price_usd,
                         price_unit: $t.price_unit,
@@ -149,6 +156,7 @@ jq -n \
                 region: $region,
                 compute_model: "on_demand",
                 billing_period: "monthly",
+                # No load_cost: COPY is billed in RPU-seconds and the load stats record no scanned bytes
                 compute_costs: map2d($r.billed_bytes; ($on_demand.price_usd / $on_demand.price_unit_bytes)),
                 pricing_base: {
                   price_usd: $on_demand.price_usd,
@@ -0,0 +1,222 @@
+#!/usr/bin/env python3
+"""
+Unified ClickBench runner for every vendor.
+
+Replaces the per-vendor bash runners (snowsql, bq, curl, clickhouse-client,
+psql) with one loop over a driver from drivers.py. The driver keeps a single
+persistent connection and each run is timed in-process, so short queries are
+no longer dominated by CLI start-up and login.
+
+Output is the usual ClickBench result JSON (system, date, machine, ...,
+result) plus per-run `query_ids` and any vendor extras (BigQuery
+billed_slot_sec / billed_bytes, Firebolt query_labels, Snowflake query_tags,
+Redshift query_groups), so the existing enrich.sh scripts work unchanged.
+
+Each run is also timed three ways, in one "timing" block with the same
+[query][run] shape as "result" (which holds client_sec):
+
+    "timing": {
+        "result_basis": "client",
+        "client_sec": [[...], ...],   submit to last result byte, in-process
+        "server_sec": [[...], ...],   total server time reported by the engine (null if none)
+        "server_includes": [...],     phases server_sec covers (queue, compile, execution)
+        "rtt_sec":    [[...], ...]    SELECT 1 round trip just before the run
+    }
+
+Engines that report no server time in the response get server_sec from their
+collect_metrics.py (Snowflake, Redshift, ClickHouse).
+
+compare_results.py --timing compares files on any of these bases.
+
+--only 3,17 runs just those queries (0-based, as in "result"); the output then
+lists them in "query_indices" and every per-query array follows that order.
+variance.py uses it to rerun noisy queries and merge them back.
+
+Usage:
+    python run_benchmark.py <vendor> --queries queries.sql --output out.json [options]
+
+Examples:
+    python run_benchmark.py snowflake --queries snowflake/clickbench/queries.sql \
+        --database HITS --warehouse TEST --machine X-Small --cluster-size 1 \
+        --output snowflake/clickbench/results_1b/xs.json
+
+    python run_benchmark.py firebolt --queries firebolt/clickbench/large/queries.sql \
+        --engine bench2cost_xl_co_3n --table hits_10b --volume 10B \
+        --output firebolt/clickbench/large/results_10B/bench2cost_xl_co_3n.json
+"""
+
+import argparse
+import json
+import sys
+from datetime import date
+from pathlib import Path
+from typing import Dict, List, Any, Optional
+
+from drivers import DRIVERS, load_queries, rewrite_table
+from tracing import add_profile_argument, span, start_profile
+
+# Plural key used in the result file for each driver extra field
+EXTRA_KEYS = {'query_label': 'query_labels', 'query_tag': 'query_tags', 'query_group': 'query_groups'}
+
+
+def probe_rtt(driver, label: Dict[str, Any]) -> Optional[float]:
+    """SELECT 1 round trip just before a run; None if the probe fails."""
+    with span('rtt'):
+        try:
+            return driver.rtt(label)
+        except Exception as e:
+            print(f'  RTT probe failed: {e}', file=sys.stderr)
+            return None
+
+
+def run_queries(driver, queries: List[str], tries: int, rtt: bool = True,
+                indices: Optional[List[int]] = None) -> Dict[str, Any]:
+    """Run every query `tries` times and collect per-run arrays.
+
+    indices are the queries' positions in the full query file (default: 0..n-1);
+    they label the runs, so tags and query labels match a full round.
+    """
+    result = []
+    query_ids = []
+    extras = {field: [] for field in driver.extra_fields}
+    server_sec, rtt_sec = [], []
+
+    for q_idx, query in zip(indices or range(len(queries)), queries):
+        print(f'[Q{q_idx}] {query}', file=sys.stderr)
+        times, ids, servers, rtts = [], [], [], []
+        extra_runs = {field: [] for field in driver.extra_fields}
+
+        for attempt in range(1, tries + 1):
+            label = {'query': q_idx, 'attempt': attempt}
+            rtts.append(probe_rtt(driver, label) if rtt else None)
+            try:
+                with span('query.execute', query=q_idx, attempt=attempt):
+                    info = driver.execute(query, label)
+            except Exception as e:
+                print(f'  Run {attempt}: ERROR {e}', file=sys.stderr)
+                info = {'elapsed': None, 'query_id': None}
+            else:
+                print(f"  Run {attempt}: {info['elapsed']:.3f}s", file=sys.stderr)
+            times.append(info['elapsed'])
+            servers.append(info.get('server_sec'))
+            ids.append(info.get('query_id'))
+            for field in driver.extra_fields:
+                extra_runs[field].append(info.get(field))
+
+        result.append(times)
+        query_ids.append(ids)
+        server_sec.append(servers)
+        rtt_sec.append(rtts)
+        for field in driver.extra_fields:
+            extras[field].append(extra_runs[field])
+
+    runs = {
+        'result': result,
+        'query_ids': query_ids,
+        'timing': {
+            'result_basis': 'client',
+            'client_sec': result,
+            'server_sec': server_sec,
+            'rtt_sec': rtt_sec,
+        },
+    }
+    if driver.server_includes:
+        runs['timing']['server_includes'] = driver.server_includes
+    for field, values in extras.items():
+        runs[EXTRA_KEYS.get(field, field)] = values
+    return runs
+
+
+def build_result(driver, args, runs: Dict[str, Any]) -> Dict[str, Any]:
+    """Assemble a ClickBench-compatible result document."""
+    output = {
+        'system': args.system or driver.system,
+        'date': str(date.today()),
+        'machine': args.machine,
+        'cluster_size': args.cluster_size,
+        'proprietary': 'yes',
+        'tuned': 'no',
+        'comment': args.comment,
+        'tags': driver.tags,
+        'load_time': args.load_time,
+        'data_size': args.data_size,
+    }
+    if args.load_stats:
+        load = json.loads(Path(args.load_stats).read_text())
+        output['load_time'] = load['seconds']
+        output['load'] = load
+    output.update(driver.describe())
+    output.update(runs)
+    return output
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        description='Run ClickBench queries against any vendor over one persistent connection'
+    )
+    subparsers = parser.add_subparsers(dest='vendor', required=True)
+
+    for vendor, driver_cls in DRIVERS.items():
+        sub = subparsers.add_parser(vendor, help=f'Run against {driver_cls.system}')
+        sub.add_argument('--queries', default='queries.sql',
+                         help='SQL file, queries separated by ";" (default: queries.sql)')
+        sub.add_argument('--output', '-o', help='Output result JSON (default: stdout)')
+        sub.add_argument('--tries', type=int, default=3, help='Runs per query (default: 3)')
+        sub.add_argument('--only', type=lambda v: [int(q) for q in v.split(',') if q.strip()],
+                         help='Comma-separated 0-based query indices to run (default: all)')
+        sub.add_argument('--no-rtt', action='store_true',
+                         help='Skip the SELECT 1 round-trip probe before each run')
+        sub.add_argument('--table', help='Replace "FROM hits" with this table (e.g. hits_10b)')
+        sub.add_argument('--system', help=f'System name (default: {driver_cls.system})')
+        sub.add_argument('--machine', default='serverless', help='Machine / warehouse size label')
+        sub.add_argument('--cluster-size', default=1,
+                         type=lambda v: int(v) if v.isdigit() else v,
+                         help='Cluster size (nodes, replicas or credits/hour)')
+        sub.add_argument('--comment', default='', help='Free-form comment')
+        sub.add_argument('--load-time', type=float, default=0, help='Load time in seconds')
+        sub.add_argument('--load-stats', help='load_stats_*.json from a load script (sets --load-time)')
+        sub.add_argument('--data-size', type=int, default=0, help='Data size in bytes')
+        driver_cls.add_arguments(sub)
+        add_profile_argument(sub)
+
+    return parser
+
+
+def main(argv: Optional[List[str]] = None):
+    args = build_parser().parse_args(argv)
+    start_profile(args)
+    driver = DRIVERS[args.vendor](args)
+
+    queries = [rewrite_table(q, args.table) for q in load_queries(args.queries)]
+    if not queries:
+        print(f'No queries found in {args.queries}', file=sys.stderr)
+        sys.exit(1)
+    if args.only:
+        missing = [q for q in args.only if not 0 <= q < len(queries)]
+        if missing:
+            print(f'--only {missing}: {args.queries} has queries 0..{len(queries) - 1}', file=sys.stderr)
+            sys.exit(1)
+        queries = [queries[q] for q in args.only]
+    print(f'Loaded {len(queries)} queries, {args.tries} runs each ({driver.system})', file=sys.stderr)
+
+    with span('connect'):
+        driver.connect()
+    try:
+        runs = run_queries(driver, queries, args.tries, not args.no_rtt, args.only)
+        output = build_result(driver, args, runs)
+        if args.only:
+            output['query_indices'] = args.only
+    finally:
+        driver.close()
+
+    doc = json.dumps(output, indent=2)
+    if args.output:
+        Path(args.output).parent.mkdir(parents=True, exist_ok=True)
+        Path(args.output).write_text(doc + '\n')
+        print(f'Results saved to {args.output}', file=sys.stderr)
+    else:
+        print(doc)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,385 @@
+#!/usr/bin/env python3
+"""
+Runtime scaling model: predict runtime and cost at unbenchmarked sizes.
+
+Benchmarks exist for 1B / 10B / 100B rows and a handful of cluster sizes.
+This fits, per vendor and per query, a power law on log-log axes over every
+available result file:
+
+    log(runtime) = b0 + b_rows * log(rows) + b_nodes * log(nodes)
+
+and the same form for the best-run cost of every tier. Fits are ordinary
+least squares. Queries that have values at the same points share one design
+matrix, so (X'X)^-1 is computed once per point set and reused for every query
+and tier. Each fit reports R^2 and the residual standard error, giving a 95%
+prediction interval at any (rows, nodes) point. Totals sum the per-query
+predictions, and their intervals sum the per-query bounds, which is
+conservative. Fits with fewer than MIN_INTERVAL_DOF residual degrees of
+freedom (three scales on a rows-only fit leave one) get no interval: t is
+12.7 at one degree of freedom and the bounds span orders of magnitude.
+
+"nodes" is the result's cluster_size: replicas (ClickHouse Cloud), nodes
+(Firebolt), credits per hour (Snowflake) or workers per warehouse size
+(Databricks, see WAREHOUSE_NODES). Serverless vendors (BigQuery, Redshift
+Serverless) and vendors benchmarked at a single size are fitted on rows only.
+
+Parallel scaling efficiency is derived from b_nodes: doubling the nodes
+speeds a query up by 2^-b_nodes, so the efficiency of a doubling is
+2^(-b_nodes - 1). 1.0 is a linear speedup and 0.5 means no speedup.
+
+generate_visualization.py embeds the fits in the explorer's "Predict" panel.
+
+Usage:
+    python scaling_model.py --rows 35e9 --nodes 12
+    python scaling_model.py --rows 35e9 --nodes 12 --vendors Firebolt,ClickHouse --per-query --json
+    python scaling_model.py --efficiency --vendors ClickHouse
+"""
+
+import argparse
+import json
+import math
+import statistics
+import sys
+from pathlib import Path
+from typing import Dict, List, Any, Optional, Tuple
+
+from cost_engine import VENDOR_DIRS
+
+SCALE_ROWS = {'1B': 1e9, '10B': 1e10, '100B': 1e11}
+
+# Databricks SQL warehouse sizes -> workers
+WAREHOUSE_NODES = {
+    '2X-Small': 1, 'X-Small': 2, 'Small': 4, 'Medium': 8, 'Large': 16,
+    'X-Large': 32, '2X-Large': 64, '3X-Large': 128, '4X-Large': 256,
+}
+
+# Two-sided 95% Student t critical values by degrees of freedom
+T_95 = [None, 12.706, 4.303, 3.182, 2.776, 2.571, 2.447, 2.365, 2.306, 2.262, 2.228,
+        2.201, 2.179, 2.160, 2.145, 2.131, 2.120, 2.110, 2.101, 2.093, 2.086]
+
+
+# Fewer residual degrees of freedom than this give no prediction interval
+MIN_INTERVAL_DOF = 3
+
+
+def t_critical(dof: int) -> float:
+    return T_95[dof] if dof < len(T_95) else 1.96
+
+
+def node_count(cluster_size: Any) -> Optional[float]:
+    """Numeric cluster size, or None for serverless results."""
+    if isinstance(cluster_size, (int, float)):
+        return float(cluster_size)
+    if isinstance(cluster_size, str):
+        if cluster_size in WAREHOUSE_NODES:
+            return float(WAREHOUSE_NODES[cluster_size])
+        try:
+            return float(cluster_size)
+        except ValueError:
+            return None
+    return None
+
+
+def best_values(result_data: Dict[str, Any]) -> Tuple[List[Optional[float]], Dict[str, List[Optional[float]]]]:
+    """Best runtime per query and the cost of that run for every base tier."""
+    runtimes, indices = [], []
+    for runs in result_data.get('result', []):
+        valid = [(t, i) for i, t in enumerate(runs or []) if t is not None]
+        best = min(valid) if valid else (None, None)
+        runtimes.append(best[0])
+        indices.append(best[1])
+    costs = {}
+    for tier in result_data.get('costs', []):
+        if 'billing_variant' in tier:
+            continue
+        compute = tier.get('compute_costs', [])
+        costs[tier['tier']] = [
+            compute[q][i] if i is not None and q < len(compute) and i < len(compute[q]) else None
+            for q, i in enumerate(indices)
+        ]
+    return runtimes, costs
+
+
+def load_points(base_dir: Path, vendors: Optional[List[str]] = None) -> Dict[str, List[Dict[str, Any]]]:
+    """Benchmark points (rows, nodes, per-query runtimes and costs) per vendor."""
+    points = {}
+    for vendor, directory in VENDOR_DIRS.items():
+        if vendors and not any(v.lower().startswith(vendor.lower()) for v in vendors):
+            continue
+        for scale, rows in SCALE_ROWS.items():
+            for path in sorted((base_dir / directory / f'results_{scale}').glob('*.json')):
+                result_data = json.loads(path.read_text())
+                runtimes, costs = best_values(result_data)
+                points.setdefault(vendor, []).append({
+                    'config': path.stem,
+                    'scale': scale,
+                    'rows': rows,
+                    'nodes': node_count(result_data.get('cluster_size')),
+                    'runtimes': runtimes,
+                    'costs': costs,
+                })
+    return points
+
+
+def invert(matrix: List[List[float]]) -> Optional[List[List[float]]]:
+    """Gauss-Jordan inverse of a small square matrix; None if singular."""
+    n = len(matrix)
+    aug = [list(row) + [1.0 if i == j else 0.0 for j in range(n)] for i, row in enumerate(matrix)]
+    for col in range(n):
+        pivot = max(range(col, n), key=lambda r: abs(aug[r][col]))
+        if abs(aug[pivot][col]) < 1e-12:
+            return None
+        aug[col], aug[pivot] = aug[pivot], aug[col]
+        scale = aug[col][col]
+        aug[col] = [v / scale for v in aug[col]]
+        for r in range(n):
+            if r != col and aug[r][col]:
+                factor = aug[r][col]
+                aug[r] = [a - factor * b for a, b in zip(aug[r], aug[col])]
+    return [row[n:] for row in aug]
+
+
+def design_row(features: List[str], rows: float, nodes: Optional[float]) -> List[float]:
+    x = [1.0, math.log(rows)]
+    if 'log_nodes' in features:
+        x.append(math.log(nodes))
+    return x
+
+
+def fit_columns(X: List[List[float]], columns: List[List[Optional[float]]]) -> List[Optional[Dict[str, Any]]]:
+    """Least-squares fit of log(value) for every column, sharing (X'X)^-1 per point set."""
+    p = len(X[0])
+    cache = {}
+    fits = []
+    for values in columns:
+        mask = tuple(i for i, v in enumerate(values) if v is not None and v > 0)
+        if len(mask) < p:
+            fits.append(None)
+            continue
+        if mask not in cache:
+            Xm = [X[i] for i in mask]
+            xtx = [[sum(r[a] * r[b] for r in Xm) for b in range(p)] for a in range(p)]
+            cache[mask] = (Xm, invert(xtx))
+        Xm, cov = cache[mask]
+        if cov is None:
+            fits.append(None)
+            continue
+        y = [math.log(values[i]) for i in mask]
+        xty = [sum(r[a] * yi for r, yi in zip(Xm, y)) for a in range(p)]
+        beta = [sum(cov[a][b] * xty[b] for b in range(p)) for a in range(p)]
+        fitted = [sum(b * x for b, x in zip(beta, r)) for r in Xm]
+        sse = sum((yi - fi) ** 2 for yi, fi in zip(y, fitted))
+        mean = sum(y) / len(y)
+        sst = sum((yi - mean) ** 2 for yi in y)
+        dof = len(y) - p
+        fits.append({
+            'beta': beta,
+            'cov': cov,
+            's': math.sqrt(sse / dof) if dof > 0 else None,
+            'dof': dof,
+            'n': len(y),
+            # Flat runtimes (sst ~ 0) have no variance to explain
+            'r2': 1 - sse / sst if sst > 1e-9 and dof > 0 else None,
+            't': t_critical(dof) if dof >= MIN_INTERVAL_DOF else None,
+        })
+    return fits
+
+
+def fit_vendor(vendor: str, points: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """Per-query runtime and cost fits for one vendor."""
+    nodes = {pt['nodes'] for pt in points}
+    features = ['log_rows']
+    if None not in nodes and len(nodes) > 1:
+        features.append('log_nodes')
+    X = [design_row(features, pt['rows'], pt['nodes']) for pt in points]
+    query_count = max(len(pt['runtimes']) for pt in points)
+
+    def column(values_of):
+        return [[(values_of(pt) or [])[q] if q < len(values_of(pt) or []) else None for pt in points]
+                for q in range(query_count)]
+
+    tiers = sorted({t for pt in points for t in pt['costs']})
+    return {
+        'vendor': vendor,
+        'features': features,
+        'rows_range': [min(pt['rows'] for pt in points), max(pt['rows'] for pt in points)],
+        'nodes_range': [min(nodes), max(nodes)] if 'log_nodes' in features else None,
+        'points': [{'config': pt['config'], 'scale': pt['scale'], 'nodes': pt['nodes']} for pt in points],
+        'runtime': fit_columns(X, column(lambda pt: pt['runtimes'])),
+        'costs': {tier: fit_columns(X, column(lambda pt, tier=tier: pt['costs'].get(tier))) for tier in tiers},
+    }
+
+
+def fit_all(base_dir: Path, vendors: Optional[List[str]] = None) -> Dict[str, Dict[str, Any]]:
+    return {vendor: fit_vendor(vendor, pts) for vendor, pts in load_points(base_dir, vendors).items()}
+
+
+def predict_fit(fit: Optional[Dict[str, Any]], x0: List[float]) -> Optional[Dict[str, Optional[float]]]:
+    """Point prediction with a 95% prediction interval, back on the linear scale.
+
+    lo and hi are None when the fit has too few points for an interval.
+    """
+    if fit is None:
+        return None
+    mid = sum(b * x for b, x in zip(fit['beta'], x0))
+    if fit['t'] is None:
+        return {'mid': math.exp(mid), 'lo': None, 'hi': None}
+    leverage = sum(x0[a] * fit['cov'][a][b] * x0[b] for a in range(len(x0)) for b in range(len(x0)))
+    half = fit['t'] * fit['s'] * math.sqrt(1 + leverage)
+    return {'mid': math.exp(mid), 'lo': math.exp(mid - half), 'hi': math.exp(mid + half)}
+
+
+def sum_predictions(preds: List[Optional[Dict[str, Optional[float]]]]) -> Dict[str, Any]:
+    """Totals over queries; bounds are None unless every query has one."""
+    known = [p for p in preds if p is not None]
+    bounded = known and all(p['lo'] is not None for p in known)
+    return {
+        'mid': sum(p['mid'] for p in known),
+        'lo': sum(p['lo'] for p in known) if bounded else None,
+        'hi': sum(p['hi'] for p in known) if bounded else None,
+        'queries': len(known),
+        'missing': len(preds) - len(known),
+    }
+
+
+def predict(model: Dict[str, Any], rows: float, nodes: Optional[float]) -> Dict[str, Any]:
+    """Predicted per-query and total runtime and cost per tier at (rows, nodes)."""
+    uses_nodes = 'log_nodes' in model['features']
+    if uses_nodes and not nodes:
+        raise ValueError(f"{model['vendor']} scales with nodes; pass a node count")
+    x0 = design_row(model['features'], rows, nodes)
+    runtimes = [predict_fit(f, x0) for f in model['runtime']]
+    costs = {tier: [predict_fit(f, x0) for f in fits] for tier, fits in model['costs'].items()}
+    lo_rows, hi_rows = model['rows_range']
+    extrapolated = not lo_rows <= rows <= hi_rows
+    if uses_nodes:
+        extrapolated = extrapolated or not model['nodes_range'][0] <= nodes <= model['nodes_range'][1]
+    r2 = [f['r2'] for f in model['runtime'] if f and f['r2'] is not None]
+    return {
+        'vendor': model['vendor'],
+        'rows': rows,
+        'nodes': nodes if uses_nodes else None,
+        'extrapolated': extrapolated,
+        'median_r2': statistics.median(r2) if r2 else None,
+        'runtime': sum_predictions(runtimes),
+        'costs': {tier: sum_predictions(preds) for tier, preds in costs.items()},
+        'per_query': [{'runtime': rt, 'costs': {tier: preds[q] for tier, preds in costs.items()}}
+                      for q, rt in enumerate(runtimes)],
+    }
+
+
+def scaling_efficiency(model: Dict[str, Any]) -> List[Optional[Dict[str, float]]]:
+    """Per-query data exponent, node exponent and efficiency of doubling the nodes."""
+    rows = []
+    for fit in model['runtime']:
+        if fit is None:
+            rows.append(None)
+            continue
+        entry = {'rows_exponent': fit['beta'][1], 'r2': fit['r2']}
+        if 'log_nodes' in model['features']:
+            b_nodes = fit['beta'][2]
+            entry['nodes_exponent'] = b_nodes
+            entry['doubling_speedup'] = 2 ** -b_nodes
+            entry['doubling_efficiency'] = 2 ** (-b_nodes - 1)
+        rows.append(entry)
+    return rows
+
+
+def fmt_range(pred: Dict[str, Any], spec: str) -> str:
+    if pred['lo'] is None:
+        return f"{pred['mid']:{spec}}"
+    return f"{pred['mid']:{spec}} [{pred['lo']:{spec}}–{pred['hi']:{spec}}]"
+
+
+def fmt_optional(value: Optional[float], spec: str) -> str:
+    return '-' if value is None else format(value, spec)
+
+
+def render_predictions(predictions: List[Dict[str, Any]], per_query: bool) -> str:
+    lines = ['| Vendor | Nodes | Runtime s (95% PI) | Tier | Cost $ (95% PI) | Median R² | Note |',
+             '|---' * 7 + '|']
+    for p in predictions:
+        note = 'extrapolated' if p['extrapolated'] else ''
+        if p['runtime']['missing']:
+            note = (note + f", {p['runtime']['missing']} queries unfitted").lstrip(', ')
+        if p['runtime']['queries'] and p['runtime']['lo'] is None:
+            note = (note + ', insufficient points for a 95% PI').lstrip(', ')
+        for i, (tier, cost) in enumerate(sorted(p['costs'].items())):
+            lines.append(
+                f"| {p['vendor'] if i == 0 else ''} | {fmt_optional(p['nodes'], 'g') if i == 0 else ''} | "
+                f"{fmt_range(p['runtime'], '.2f') if i == 0 else ''} | {tier} | {fmt_range(cost, '.4f')} | "
+                f"{fmt_optional(p['median_r2'], '.3f') if i == 0 else ''} | {note if i == 0 else ''} |"
+            )
+    if per_query:
+        for p in predictions:
+            lines += ['', f"{p['vendor']} per query:", '| Query | Runtime s (95% PI) |', '|---|---|']
+            for q, entry in enumerate(p['per_query']):
+                lines.append(f"| Q{q} | {fmt_range(entry['runtime'], '.3f') if entry['runtime'] else 'unfitted'} |")
+    return '\n'.join(lines)
+
+
+def render_efficiency(models: Dict[str, Dict[str, Any]]) -> str:
+    lines = []
+    for vendor, model in models.items():
+        eff = scaling_efficiency(model)
+        lines += ['', f'{vendor} ({len(model["points"])} points):',
+                  '| Query | Rows exponent | Nodes exponent | Doubling speedup | Doubling efficiency | R² |',
+                  '|---' * 6 + '|']
+        for q, e in enumerate(eff):
+            if e is None:
+                lines.append(f'| Q{q} | - | - | - | - | - |')
+                continue
+            lines.append(
+                f"| Q{q} | {e['rows_exponent']:.3f} | {fmt_optional(e.get('nodes_exponent'), '.3f')} | "
+                f"{fmt_optional(e.get('doubling_speedup'), '.2f')} | {fmt_optional(e.get('doubling_efficiency'), '.0%')} | "
+                f"{fmt_optional(e['r2'], '.3f')} |"
+            )
+    return '\n'.join(lines).lstrip()
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='Fit per-query log-log scaling curves and predict runtime and cost at any size'
+    )
+    parser.add_argument('--rows', type=float, help='Rows to predict for (e.g. 35e9)')
+    parser.add_argument('--nodes', type=float, help='Cluster size to predict for (replicas, nodes, credits, workers)')
+    parser.add_argument('--vendors', type=lambda v: [s for s in v.split(',') if s.strip()],
+                        help='Comma-separated vendors (default: all)')
+    parser.add_argument('--per-query', action='store_true', help='Also list per-query predictions')
+    parser.add_argument('--efficiency', action='store_true', help='Report per-query parallel scaling efficiency')
+    parser.add_argument('--json', action='store_true', help='Emit JSON instead of markdown')
+
+    args = parser.parse_args()
+    if not args.rows and not args.efficiency:
+        parser.error('pass --rows (and --nodes) to predict, or --efficiency')
+
+    models = fit_all(Path(__file__).parent, args.vendors)
+    if not models:
+        print('No results found', file=sys.stderr)
+        sys.exit(1)
+
+    if args.efficiency:
+        if args.json:
+            print(json.dumps({v: scaling_efficiency(m) for v, m in models.items()}, indent=2))
+        else:
+            print(render_efficiency(models))
+        if not args.rows:
+            return
+
+    predictions = []
+    for vendor, model in models.items():
+        try:
+            predictions.append(predict(model, args.rows, args.nodes))
+        except ValueError as e:
+            print(f'⚠️  {e}', file=sys.stderr)
+    if not args.per_query:
+        for p in predictions:
+            del p['per_query']
+    if args.json:
+        print(json.dumps(predictions, indent=2))
+    else:
+        print(render_predictions(predictions, args.per_query))
+
+
+if __name__ == '__main__':
+    main()
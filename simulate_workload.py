@@ -0,0 +1,411 @@
+#!/usr/bin/env python3
+"""
+Discrete-event workload cost simulator driven by measured per-query runtimes.
+
+The enriched result files price every query as runtime x rate, summed. This
+simulates how the systems are actually run instead: queries arrive (Poisson
+process or a replayed trace) following a weighted query mix, run on clusters
+with a concurrency limit, queue when every slot is busy, start extra clusters
+up to --max-clusters, and clusters auto-suspend after an idle window. Billed
+time follows each vendor's billing model (minimum charge per resume, billing
+increment), so idle tails and cold starts show up in the cost.
+
+Per-query runtimes and the per-second rate of every tier come from the result
+file (rate = total compute cost / total runtime of the tier). Measured
+runtimes used the whole cluster, so concurrent queries share it fairly: with k
+running, each progresses at 1/k speed (--sharing none disables this). BigQuery
+is billed per query (bytes or slot-seconds), so its cost is the measured
+per-query cost and only queueing is simulated.
+
+Billing models come from <vendor>/pricings/billing_rules.json (see
+cost_engine.py): minimum billed seconds, billing increment, idle seconds before
+auto-suspend and the default concurrency per cluster. Override them with
+--auto-suspend / --min-billed / --increment / --concurrency. The billing
+variant tiers added by cost_engine.py are skipped unless named in --tiers, as
+the simulation applies the billing rules itself.
+
+Every combination of result file x tier x --rates x --auto-suspend x
+--concurrency x --max-clusters is one scenario; scenarios run in parallel
+(--jobs). The report gives monthly cost (730 h) plus latency percentiles,
+where latency = queueing + cold start + runtime. When arrivals outpace the
+clusters, the queue drains after the --hours window; monthly cost is then
+spread over the whole span and the extra time is reported as the backlog.
+
+Usage:
+    python simulate_workload.py snowflake/results_100B/4xl_enriched.json --rates 60,600,3600
+    python simulate_workload.py firebolt/results_10B/*.json --rates 100 --auto-suspend 60,1200 \\
+        --weights mix.json --hours 24 --json
+    python simulate_workload.py bigquery/results_1B/result_enriched.json --trace trace.csv
+"""
+
+import argparse
+import csv
+import heapq
+import itertools
+import json
+import math
+import random
+import sys
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Dict, List, Any, Optional
+
+from cost_engine import load_rules, vendor_dir
+
+HOURS_PER_MONTH = 730
+
+def billing_model(system: str) -> Dict[str, Any]:
+    """Billing model for a result's system name (e.g. 'ClickHouse Cloud (AWS)')."""
+    rules = load_rules(system)
+    rule = rules['rules'].get('default', {})
+    return {
+        'vendor': vendor_dir(system),
+        'kind': rules['billing'],
+        'concurrency': rules['concurrency'],
+        'auto_suspend': rule.get('idle_seconds', 0),
+        'min_billed': rule.get('min_seconds', 0),
+        'increment': rule.get('increment_seconds', 1),
+    }
+
+
+def pick_run(runs: List[Optional[float]], mode: str, rng: random.Random) -> Optional[int]:
+    """Index of the run whose runtime/cost a simulated query uses."""
+    valid = sorted((t, i) for i, t in enumerate(runs) if t is not None)
+    if not valid:
+        return None
+    if mode == 'best':
+        return valid[0][1]
+    if mode == 'median':
+        return valid[len(valid) // 2][1]
+    return rng.choice(valid)[1]
+
+
+def load_workload(result_data: Dict[str, Any], tier_name: str) -> Dict[str, Any]:
+    """Per-query runtimes and costs for one tier, plus its per-second rate."""
+    tier = next(t for t in result_data['costs'] if t['tier'] == tier_name)
+    runtimes = result_data['result']
+    costs = tier['compute_costs']
+    total_time = sum(t for q in runtimes for t in q if t is not None)
+    total_cost = sum(c for q in costs for c in q if c is not None)
+    return {
+        'runtimes': runtimes,
+        'costs': costs,
+        'rate_per_sec': total_cost / total_time if total_time else 0,
+    }
+
+
+def poisson_arrivals(rate_per_hour: float, hours: float, rng: random.Random) -> List[float]:
+    """Arrival times (seconds) of a Poisson process."""
+    arrivals, t, horizon = [], 0.0, hours * 3600
+    while True:
+        t += rng.expovariate(rate_per_hour / 3600)
+        if t >= horizon:
+            return arrivals
+        arrivals.append(t)
+
+
+def load_trace(path: str) -> List[List[float]]:
+    """[[offset_sec, query_index], ...] from JSON or a CSV with optional header."""
+    text = Path(path).read_text()
+    if path.endswith('.json'):
+        return [[float(t), int(q)] for t, q in json.loads(text)]
+    rows = []
+    for row in csv.reader(text.splitlines()):
+        try:
+            rows.append([float(row[0]), int(row[1])])
+        except (ValueError, IndexError):
+            continue  # header / blank line
+    return sorted(rows)
+
+
+def load_weights(path: Optional[str], query_count: int) -> List[float]:
+    if not path:
+        return [1.0] * query_count
+    raw = json.loads(Path(path).read_text())
+    if isinstance(raw, list):
+        return [float(w) for w in raw] + [0.0] * (query_count - len(raw))
+    weights = [0.0] * query_count
+    for k, v in raw.items():
+        weights[int(k)] = float(v)
+    return weights
+
+
+def billed_seconds(active: float, model: Dict[str, Any]) -> float:
+    """Billed seconds for one resume..suspend period."""
+    increment = model['increment']
+    return max(model['min_billed'], math.ceil(active / increment) * increment)
+
+
+def percentile(sorted_values: List[float], p: float) -> Optional[float]:
+    if not sorted_values:
+        return None
+    k = (len(sorted_values) - 1) * p
+    lo, hi = math.floor(k), math.ceil(k)
+    return sorted_values[lo] + (sorted_values[hi] - sorted_values[lo]) * (k - lo)
+
+
+def simulate(scenario: Dict[str, Any]) -> Dict[str, Any]:
+    """Run one scenario; returns cost, utilisation and latency percentiles."""
+    rng = random.Random(scenario['seed'])
+    model = scenario['model']
+    workload = scenario['workload']
+    runtimes, costs = workload['runtimes'], workload['costs']
+    concurrency = scenario['concurrency']
+    max_clusters = scenario['max_clusters']
+    per_query = model['kind'] == 'per_query'
+    # Measured runtimes use the whole cluster; with fair sharing k concurrent
+    # queries each progress at 1/k speed, with 'none' they do not interfere
+    fair = scenario['sharing'] == 'fair' and not per_query
+
+    if scenario['trace']:
+        arrivals = scenario['trace']
+    else:
+        weights = scenario['weights']
+        times = poisson_arrivals(scenario['rate'], scenario['hours'], rng)
+        queries = rng.choices(range(len(weights)), weights=weights, k=len(times))
+        arrivals = list(zip(times, queries))
+
+    # Cluster state: running jobs [remaining isolated seconds, arrival time],
+    # resume time, end of cold start, start of the current busy stretch and
+    # generations that invalidate stale finish / suspend events. Per-query
+    # billing has no suspend, so its "cluster" is always up and only bounds
+    # concurrency.
+    clusters = [{'jobs': [], 'up_since': 0.0 if per_query else None, 'ready_at': 0.0,
+                 'updated': 0.0, 'busy_since': 0.0, 'finish_gen': 0, 'idle_gen': 0}
+                for _ in range(max_clusters)]
+    billed = busy = active = query_cost = 0.0
+    queue, latencies, waits = deque(), [], []
+    events = []  # (time, order, kind, payload)
+    order = itertools.count()
+    failed = 0
+
+    for t, q in arrivals:
+        heapq.heappush(events, (t, next(order), 'arrive', q))
+
+    def advance(cluster, now):
+        """Progress running jobs up to `now`."""
+        since = max(cluster['updated'], cluster['ready_at'])
+        if cluster['jobs'] and now > since:
+            step = (now - since) / (len(cluster['jobs']) if fair else 1)
+            for job in cluster['jobs']:
+                job[0] -= step
+        cluster['updated'] = now
+
+    def reschedule(c_idx, now):
+        """Schedule the next completion on a cluster."""
+        cluster = clusters[c_idx]
+        cluster['finish_gen'] += 1
+        if cluster['jobs']:
+            remaining = min(job[0] for job in cluster['jobs'])
+            at = max(now, cluster['ready_at']) + max(0.0, remaining) * (len(cluster['jobs']) if fair else 1)
+            heapq.heappush(events, (at, next(order), 'finish', (c_idx, cluster['finish_gen'])))
+
+    def start(now, arrived, q, c_idx):
+        nonlocal busy, query_cost, failed
+        cluster = clusters[c_idx]
+        run = pick_run(runtimes[q], scenario['runtime_mode'], rng)
+        if run is None:
+            failed += 1
+            return
+        if cluster['up_since'] is None:
+            cluster['up_since'] = now
+            cluster['ready_at'] = now + scenario['resume_sec']
+        advance(cluster, now)
+        if not cluster['jobs']:
+            cluster['busy_since'] = now
+        cluster['idle_gen'] += 1
+        runtime = runtimes[q][run]
+        cluster['jobs'].append([runtime, arrived])
+        busy += runtime
+        if per_query:
+            query_cost += costs[q][run] or 0
+        waits.append(now - arrived)
+
+    def free_cluster():
+        # Prefer a running cluster with a free slot, then a suspended one
+        for i, c in enumerate(clusters):
+            if c['up_since'] is not None and len(c['jobs']) < concurrency:
+                return i
+        for i, c in enumerate(clusters):
+            if c['up_since'] is None:
+                return i
+        return None
+
+    last_t = last_done = 0.0
+    while events:
+        now, _, kind, payload = heapq.heappop(events)
+        last_t = now
+        if kind == 'arrive':
+            c_idx = free_cluster()
+            if c_idx is None:
+                queue.append((now, payload))
+            else:
+                start(now, now, payload, c_idx)
+                reschedule(c_idx, now)
+        elif kind == 'finish':
+            c_idx, gen = payload
+            cluster = clusters[c_idx]
+            if gen != cluster['finish_gen']:
+                continue
+            advance(cluster, now)
+            done = [job for job in cluster['jobs'] if job[0] <= 1e-9]
+            cluster['jobs'] = [job for job in cluster['jobs'] if job[0] > 1e-9]
+            latencies.extend(now - job[1] for job in done)
+            if done:
+                last_done = now
+            while queue and len(cluster['jobs']) < concurrency:
+                queued_at, q = queue.popleft()
+                start(now, queued_at, q, c_idx)
+            reschedule(c_idx, now)
+            if not cluster['jobs']:
+                active += now - cluster['busy_since']
+                if not per_query:
+                    heapq.heappush(events, (now + scenario['auto_suspend'], next(order), 'suspend',
+                                            (c_idx, cluster['idle_gen'])))
+        elif kind == 'suspend':
+            c_idx, gen = payload
+            cluster = clusters[c_idx]
+            if not cluster['jobs'] and cluster['idle_gen'] == gen and cluster['up_since'] is not None:
+                billed += billed_seconds(now - cluster['up_since'], model)
+                cluster['up_since'] = None
+
+    for cluster in clusters:
+        if cluster['up_since'] is not None and not per_query:
+            billed += billed_seconds(last_t - cluster['up_since'], model)
+
+    # An overloaded scenario keeps draining its queue after the arrival window;
+    # the cost covers that time too, so spread it over the whole span
+    hours = max(scenario['hours'], last_done / 3600)
+    cost = query_cost if per_query else billed * workload['rate_per_sec']
+    naive = query_cost if per_query else busy * workload['rate_per_sec']
+    latencies.sort()
+    return {
+        'file': scenario['file'],
+        'vendor': model['vendor'],
+        'tier': scenario['tier'],
+        'rate_per_hour': scenario['rate'],
+        'auto_suspend': None if per_query else scenario['auto_suspend'],
+        'concurrency': concurrency,
+        'max_clusters': max_clusters,
+        'queries': len(latencies),
+        'failed': failed,
+        'busy_hours': busy / 3600,
+        'billed_hours': None if per_query else billed / 3600,
+        # Share of billed time with at least one query running
+        'utilization': None if per_query or not billed else active / billed,
+        'cost': cost,
+        'backlog_hours': hours - scenario['hours'],
+        'monthly_cost': cost * HOURS_PER_MONTH / hours,
+        'naive_monthly_cost': naive * HOURS_PER_MONTH / hours,
+        'p50': percentile(latencies, 0.5),
+        'p95': percentile(latencies, 0.95),
+        'p99': percentile(latencies, 0.99),
+        'max_wait': max(waits) if waits else 0,
+    }
+
+
+def parse_list(value: str, cast=float) -> List[Any]:
+    return [cast(v) for v in value.split(',') if v.strip()]
+
+
+def build_scenarios(args) -> List[Dict[str, Any]]:
+    trace = load_trace(args.trace) if args.trace else None
+    hours = args.hours or (max(t for t, _ in trace) / 3600 if trace else 24)
+    scenarios = []
+    for path in args.results:
+        result_data = json.loads(Path(path).read_text())
+        model = billing_model(result_data.get('system', ''))
+        for key in ('min_billed', 'increment'):
+            if getattr(args, key) is not None:
+                model[key] = getattr(args, key)
+        weights = load_weights(args.weights, len(result_data['result']))
+        available = [t['tier'] for t in result_data.get('costs', [])
+                     if args.tiers or 'billing_variant' not in t]
+        tiers = [t for t in available if not args.tiers or t in args.tiers]
+        if not tiers:
+            print(f'⚠️  {path}: none of the requested tiers (has {", ".join(available)})', file=sys.stderr)
+        auto_suspends = args.auto_suspend or [model.get('auto_suspend', 0)]
+        concurrencies = args.concurrency or [model['concurrency']]
+        rates = args.rates if not trace else [len(trace) / hours if hours else 0]
+        for tier in tiers:
+            workload = load_workload(result_data, tier)
+            for rate, suspend, conc, clusters in itertools.product(
+                    rates, auto_suspends, concurrencies, args.max_clusters):
+                scenarios.append({
+                    'file': path, 'tier': tier, 'model': model, 'workload': workload,
+                    'weights': weights, 'trace': trace, 'rate': rate, 'hours': hours,
+                    'auto_suspend': suspend, 'concurrency': int(conc), 'max_clusters': int(clusters),
+                    'resume_sec': args.resume_sec, 'runtime_mode': args.runtime, 'sharing': args.sharing,
+                    'seed': args.seed,  # same arrivals across scenarios, so they compare pairwise
+                })
+    return scenarios
+
+
+def fmt(value, spec='.2f', none='-'):
+    return none if value is None else format(value, spec)
+
+
+def render_markdown(rows: List[Dict[str, Any]]) -> str:
+    lines = ['| Config | Tier | Queries/h | Suspend | Conc. | Clusters | Monthly $ | Naive $ | '
+             'Billed h | Util. | Backlog h | p50 s | p95 s | p99 s | Max wait s |',
+             '|---' * 15 + '|']
+    for r in rows:
+        lines.append(
+            f"| {Path(r['file']).stem} | {r['tier']} | {fmt(r['rate_per_hour'], '.0f')} | "
+            f"{fmt(r['auto_suspend'], '.0f')} | {r['concurrency']} | {r['max_clusters']} | "
+            f"{fmt(r['monthly_cost'])} | {fmt(r['naive_monthly_cost'])} | {fmt(r['billed_hours'])} | "
+            f"{fmt(r['utilization'], '.1%')} | {fmt(r['backlog_hours'])} | {fmt(r['p50'], '.3f')} | {fmt(r['p95'], '.3f')} | "
+            f"{fmt(r['p99'], '.3f')} | {fmt(r['max_wait'], '.1f')} |"
+        )
+    return '\n'.join(lines)
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='Simulate a query workload on measured runtimes and report monthly cost and latency'
+    )
+    parser.add_argument('results', nargs='+', help='Enriched result JSON files')
+    parser.add_argument('--tiers', type=lambda v: parse_list(v, str), help='Comma-separated tiers (default: all)')
+    parser.add_argument('--rates', type=parse_list, default=[60.0],
+                        help='Comma-separated Poisson arrival rates in queries/hour (default: 60)')
+    parser.add_argument('--trace', help='Replay a trace instead: CSV/JSON of offset_sec,query_index')
+    parser.add_argument('--weights', help='Query mix: JSON list or {query_index: weight} (default: uniform)')
+    parser.add_argument('--hours', type=float,
+                        help='Simulated hours per scenario (default: 24, or the span of --trace)')
+    parser.add_argument('--auto-suspend', type=parse_list, help='Comma-separated idle seconds before suspend')
+    parser.add_argument('--concurrency', type=parse_list, help='Comma-separated queries per cluster')
+    parser.add_argument('--max-clusters', type=lambda v: parse_list(v, int), default=[1],
+                        help='Comma-separated cluster limits for autoscaling (default: 1)')
+    parser.add_argument('--min-billed', type=float, help='Override the minimum billed seconds per resume')
+    parser.add_argument('--increment', type=float, help='Override the billing increment in seconds')
+    parser.add_argument('--resume-sec', type=float, default=0, help='Cold-start delay on resume (default: 0)')
+    parser.add_argument('--runtime', choices=['best', 'median', 'sample'], default='sample',
+                        help='Which measured run a simulated query uses (default: sample)')
+    parser.add_argument('--sharing', choices=['fair', 'none'], default='fair',
+                        help='fair: k concurrent queries each run k times slower; none: no interference')
+    parser.add_argument('--seed', type=int, default=42, help='Random seed (default: 42)')
+    parser.add_argument('--jobs', type=int, help='Parallel scenario workers (default: CPU count)')
+    parser.add_argument('--json', action='store_true', help='Emit JSON instead of markdown')
+
+    args = parser.parse_args()
+
+    try:
+        scenarios = build_scenarios(args)
+    except Exception as e:
+        print(f'Error loading inputs: {e}', file=sys.stderr)
+        sys.exit(1)
+    print(f'Simulating {len(scenarios)} scenarios...', file=sys.stderr)
+
+    with ProcessPoolExecutor(max_workers=args.jobs) as pool:
+        rows = list(pool.map(simulate, scenarios))
+    rows.sort(key=lambda r: (r['file'], r['tier'], r['monthly_cost'] or 0))
+
+    if args.json:
+        print(json.dumps(rows, indent=2))
+    else:
+        print(render_markdown(rows))
+
+
+if __name__ == '__main__':
+    main()
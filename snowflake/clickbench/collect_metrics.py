@@ -0,0 +1,221 @@
+#!/usr/bin/env python3
+# -----------------------------------------------------------------------------
+# collect_metrics.py — Stage 2: Resolve Snowflake QUERY_HISTORY for a run
+#
+# Reads a result JSON written by run_benchmark.py (snowflake driver) and looks
+# every run up in SNOWFLAKE.ACCOUNT_USAGE.QUERY_HISTORY in batched IN (...)
+# lookups, by its unique id in "query_ids". Files without ids fall back to the
+# per-run QUERY_TAG in "query_tags", restricted to SELECT statements, since the
+# tag is shared by everything the session sent for that run.
+#
+# ACCOUNT_USAGE views lag behind execution (up to ~45 minutes), so, like the
+# Databricks collector, this polls until every tag resolves or --max-wait-sec
+# expires, and can be re-run without re-running the benchmark.
+#
+# Per-run arrays merged into the result JSON (same [query][run] shape as
+# "result", consumed unchanged by snowflake/enrich.sh):
+#   compilation_sec, queued_sec, execution_sec,
+#   bytes_scanned, partitions_scanned, partitions_total, scan_cache_ratio,
+#   credits_used
+# and, in the "timing" block, server_sec = TOTAL_ELAPSED_TIME (compilation +
+# queued + execution), the engine total compare_results.py --timing server uses.
+#
+# credits_used = cloud-services credits + warehouse credits attributed to the
+# query. QUERY_ATTRIBUTION_HISTORY lags QUERY_HISTORY by hours and skips very
+# short queries, so credits_used stays null until the attribution row exists:
+# re-run the collector later, or pass --wait-attribution to keep polling.
+# -----------------------------------------------------------------------------
+
+import os
+import time
+import json
+import argparse
+import snowflake.connector
+
+METRICS = [
+    "compilation_sec",
+    "queued_sec",
+    "execution_sec",
+    "bytes_scanned",
+    "partitions_scanned",
+    "partitions_total",
+    "scan_cache_ratio",
+    "credits_used",
+]
+
+# Phases TOTAL_ELAPSED_TIME covers (timing.server_includes, see metrics.py)
+SERVER_INCLUDES = ["queue", "compile", "execution"]
+
+
+def escape_literal(s: str) -> str:
+    """Escape single quotes for safe inclusion in an IN (...) list."""
+    return s.replace("'", "''")
+
+
+def fetch_chunk(cur, key_column, keys):
+    in_list = ",".join(f"'{escape_literal(k)}'" for k in keys)
+    # Another statement may carry a run's tag (ALTER SESSION, a retry); only
+    # the SELECT is the run
+    type_filter = "AND h.query_type = 'SELECT'" if key_column == "query_tag" else ""
+    cur.execute(f"""
+        SELECT
+            h.{key_column},
+            h.compilation_time,
+            h.queued_provisioning_time + h.queued_repair_time + h.queued_overload_time,
+            h.execution_time,
+            h.total_elapsed_time,
+            h.bytes_scanned,
+            h.partitions_scanned,
+            h.partitions_total,
+            h.percentage_scanned_from_cache,
+            CASE WHEN a.query_id IS NOT NULL
+                 THEN COALESCE(h.credits_used_cloud_services, 0)
+                      + COALESCE(a.credits_attributed_compute, 0)
+            END,
+            h.execution_status
+        FROM snowflake.account_usage.query_history h
+        LEFT JOIN snowflake.account_usage.query_attribution_history a
+            ON a.query_id = h.query_id
+        WHERE h.{key_column} IN ({in_list})
+          {type_filter}
+        ORDER BY h.start_time
+    """)
+    return cur.fetchall()
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Collect Snowflake QUERY_HISTORY metrics for benchmark runs"
+    )
+    parser.add_argument(
+        "input",
+        help="Result JSON from run_benchmark.py (query_ids or query_tags)",
+    )
+    parser.add_argument(
+        "--output",
+        help="Where to write the merged result JSON (default: overwrite input)",
+    )
+    parser.add_argument(
+        "--max-wait-sec",
+        type=int,
+        default=3600,
+        help="Max seconds to wait for history entries (default: 3600)",
+    )
+    parser.add_argument(
+        "--poll-interval-sec",
+        type=int,
+        default=60,
+        help="Polling interval in seconds (default: 60)",
+    )
+    parser.add_argument(
+        "--chunk-size",
+        type=int,
+        default=200,
+        help="Runs per lookup (default: 200)",
+    )
+    parser.add_argument(
+        "--wait-attribution",
+        action="store_true",
+        help="Keep polling until QUERY_ATTRIBUTION_HISTORY has every run (lags by hours)",
+    )
+
+    args = parser.parse_args()
+    output_path = args.output or args.input
+
+    with open(args.input, "r", encoding="utf-8") as f:
+        bench = json.load(f)
+
+    query_ids = bench.get("query_ids")
+    if query_ids and any(i for runs in query_ids for i in runs):
+        key_column, keys = "query_id", query_ids
+    elif bench.get("query_tags"):
+        key_column, keys = "query_tag", bench["query_tags"]
+    else:
+        raise SystemExit(f"❌ {args.input} has no query_ids or query_tags; run it with run_benchmark.py")
+
+    pending = {k for runs in keys for k in runs if k}
+    found = {}  # query_id / query_tag -> metrics dict
+    print(f"Loaded {len(pending)} runs from {args.input} (matching on {key_column})")
+
+    start_ts = time.time()
+    attempts = 0
+
+    conn = snowflake.connector.connect(
+        account=os.environ["SNOWSQL_ACCOUNT"],
+        user=os.environ["SNOWSQL_USER"],
+        password=os.environ["SNOWSQL_PWD"],
+    )
+    try:
+        cur = conn.cursor()
+        while pending and (time.time() - start_ts) < args.max_wait_sec:
+            attempts += 1
+            print(f"\nPolling attempt {attempts} (pending {len(pending)} runs)...")
+
+            batch = sorted(pending)
+            seen = set()
+            for i in range(0, len(batch), args.chunk_size):
+                for row in fetch_chunk(cur, key_column, batch[i : i + args.chunk_size]):
+                    key, compile_ms, queued_ms, exec_ms, total_ms, bytes_scanned, \
+                        parts_scanned, parts_total, cache_ratio, credits, status = row
+                    if key in seen:
+                        # Tag fallback: the first SELECT with the tag is the run
+                        continue
+                    seen.add(key)
+                    if status != "SUCCESS":
+                        found[key] = None
+                        continue
+                    found[key] = {
+                        "compilation_sec": compile_ms / 1000.0,
+                        "queued_sec": queued_ms / 1000.0,
+                        "execution_sec": exec_ms / 1000.0,
+                        "server_sec": total_ms / 1000.0,
+                        "bytes_scanned": bytes_scanned,
+                        "partitions_scanned": parts_scanned,
+                        "partitions_total": parts_total,
+                        "scan_cache_ratio": cache_ratio,
+                        "credits_used": None if credits is None else float(credits),
+                    }
+
+            pending -= seen
+            if args.wait_attribution:
+                # Poll those again; the next attempt replaces their entries
+                pending |= {k for k in seen if found[k] and found[k]["credits_used"] is None}
+            if pending:
+                elapsed = int(time.time() - start_ts)
+                print(
+                    f"  Still waiting on {len(pending)} runs "
+                    f"(elapsed {elapsed}s, sleeping {args.poll_interval_sec}s)..."
+                )
+                time.sleep(args.poll_interval_sec)
+    finally:
+        conn.close()
+
+    elapsed = int(time.time() - start_ts)
+    if pending:
+        print(f"\n⚠️  Timeout after {elapsed}s, {len(pending)} runs still missing or unattributed.")
+    else:
+        print(f"\n✅ All runs resolved in {elapsed}s.")
+    unattributed = sum(1 for m in found.values() if m and m["credits_used"] is None)
+    if unattributed:
+        print(f"⚠️  {unattributed} runs not yet in QUERY_ATTRIBUTION_HISTORY; credits_used is null "
+              "for them (re-run later)")
+
+    for metric in METRICS:
+        bench[metric] = [
+            [(found.get(key) or {}).get(metric) for key in runs]
+            for runs in keys
+        ]
+    bench["timing"] = dict(
+        bench.get("timing") or {},
+        server_sec=[[(found.get(key) or {}).get("server_sec") for key in runs] for runs in keys],
+        server_includes=SERVER_INCLUDES,
+    )
+
+    with open(output_path, "w", encoding="utf-8") as f:
+        json.dump(bench, f, indent=2)
+
+    print(f"Wrote merged metrics to {output_path}")
+
+
+if __name__ == "__main__":
+    main()
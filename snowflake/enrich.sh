@@ -7,7 +7,7 @@ set -euo pipefail
 #
 # Usage:
 #   ./enrich.sh <clickbench_json> <pricing_json> <output_json> \
-#       [--cloud <val>] [--region <val>]
+#       [--cloud <val>] [--region <val>] [--as-of <YYYY-MM-DD>]
 #
 # Example:
 #   ./enrich.sh clickbench/results/4xl.json \
@@ -18,13 +18,17 @@ set -euo pipefail
 # This computes costs for *all* matching pricing plans
 # (standard, enterprise, business_critical, …) and writes
 # them into the .costs[] array, one entry per plan.
+#
+# Plans may carry an "effective_date"; each plan is priced as in
+# effect on the benchmark's "date" (or on --as-of).
 # ---------------------------------------------
 
 CLOUD="aws"
 REGION="us-east-1"
+AS_OF=""
 
 if [ "$#" -lt 3 ]; then
-  echo "Usage: $0 <clickbench_json> <pricing_json> <output_json> [--cloud <val>] [--region <val>]" >&2
+  echo "Usage: $0 <clickbench_json> <pricing_json> <output_json> [--cloud <val>] [--region <val>] [--as-of <YYYY-MM-DD>]" >&2
   exit 1
 fi
 
@@ -37,6 +41,7 @@ while [[ $# -gt 0 ]]; do
   case "$1" in
     --cloud) CLOUD="$2"; shift 2 ;;
     --region) REGION="$2"; shift 2 ;;
+    --as-of) AS_OF="$2"; shift 2 ;;
     *)
       echo "Unknown option: $1" >&2
       exit 1
@@ -59,7 +64,8 @@ echo
 
 jq -s \
   --arg cloud "$CLOUD" \
-  --arg region "$REGION" '
+  --arg region "$REGION" \
+  --arg as_of "$AS_OF" '
   .[0] as $bench |
   .[1] as $pricing |
 
@@ -67,10 +73,23 @@ jq -s \
   # e.g. 128 → 4X-Large entry in pricing.warehouses[]
   ($bench.cluster_size) as $cluster_credits |
 
+  # plans in effect on the benchmark date: per plan, the entry with the
+  # latest effective_date <= date (entries without one always apply);
+  # a date before every entry of a plan falls back to its earliest entry
+  (if $as_of != "" then $as_of else ($bench.date // "9999-12-31") end) as $date |
+  def supersedes($old):
+    (.effective_date // "") as $new_date | ($old.effective_date // "") as $old_date |
+    if $new_date <= $date then ($old_date > $date or $new_date >= $old_date)
+    else ($old_date > $date and $new_date < $old_date) end;
+  (reduce ($pricing.pricing[] | select(.cloud == $cloud and .region == $region)) as $p ([];
+     if any(.[]; .plan == $p.plan)
+     then map(if .plan == $p.plan and (. as $old | $p | supersedes($old)) then $p else . end)
+     else . + [$p] end)
+  ) as $in_effect |
+
   # build one cost entry per matching pricing block (plan)
   [
-    $pricing.pricing[]
-    | select(.cloud == $cloud and .region == $region)
+    $in_effect[]
     | . as $block
 
     # find warehouse entry whose credits_per_hour == cluster_size
@@ -96,6 +115,9 @@ jq -s \
          )
       ) as $compute_costs
 
+    # load cost: load seconds on the same warehouse
+    | (($bench.load_time // 0) * ($credits_per_hour * $credit_price / 3600.0)) as $load_cost
+
     # storage cost: bytes / unit * price
     | ($bench.data_size / $storage_unit * $storage_price) as $storage_cost
 
@@ -129,6 +151,7 @@ jq -s \
         ],
 
         compute_costs: $compute_costs,
+        load_cost: $load_cost,
 
         pricing_base: {
           credits_per_hour:      $credits_per_hour,
@@ -141,6 +164,9 @@ jq -s \
   | $bench + { costs: $all_costs }
 ' "$BENCH_FILE" "$PRICING_FILE" > "$OUT_FILE"
 
+# Billing variants: "<tier> (isolated)" / "<tier> (session)" with minimum charges
+python3 "$(dirname "$0")/../cost_engine.py" --write "$OUT_FILE" > /dev/null
+
 echo "✅ Written to $OUT_FILE"
 echo "💰 Total compute cost per tier:"
 jq -r '.costs[]
@@ -0,0 +1,311 @@
+#!/usr/bin/env python3
+"""
+Lightweight timing spans for the bench2cost CLIs.
+
+Every CLI accepts --profile [PATH]. With it, hot paths (load, parse, enrich,
+extract, render, query.execute, fetch, poll, sleep, ...) are wrapped in spans
+and each finished span is appended to a JSONL trace file:
+
+    {"span": 7, "parent": 3, "name": "parse", "start_ms": 12.4,
+     "wall_ms": 3.1, "cpu_ms": 3.0, "max_rss_kb": 61240, "rss_growth_kb": 512,
+     "thread": "MainThread", "attrs": {"file": "results_1B/s.json"}}
+
+wall_ms vs cpu_ms separates our own work from waiting: a poll or fetch span
+with cpu_ms near zero was spent on the warehouse or the network. cpu_ms is the
+CPU time of the span's own thread, so spans running in parallel threads do not
+count each other's work; only the root span reports the whole process. max_rss_kb is
+the process high-water mark when the span ended; rss_growth_kb is how much
+the span raised it. The whole run is one root span named after the command,
+so the trace also shows how much time no span accounts for.
+
+Without --profile, span() returns a shared no-op context, so instrumented code
+pays one function call per span.
+
+Usage:
+    python generate_visualization.py --profile                  # generate_visualization.trace.jsonl
+    python tracing.py summary generate_visualization.trace.jsonl  # time by span name
+    python tracing.py folded generate_visualization.trace.jsonl > out.folded
+    flamegraph.pl out.folded > out.svg                           # or open out.folded in speedscope
+"""
+
+import argparse
+import atexit
+import json
+import os
+import sys
+import threading
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Dict, List, Any, Optional
+
+try:
+    import resource
+except ImportError:  # Windows: no peak RSS
+    resource = None
+
+
+def max_rss_kb() -> Optional[int]:
+    """Process peak resident set size in KiB (ru_maxrss is bytes on macOS)."""
+    if resource is None:
+        return None
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return rss // 1024 if sys.platform == 'darwin' else rss
+
+
+class NullSpan:
+    """Stand-in returned by span() when tracing is off."""
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def set(self, **attrs):
+        pass
+
+
+NULL_SPAN = NullSpan()
+
+
+class Tracer:
+    """Writes finished spans of every thread to one JSONL file."""
+
+    def __init__(self, path: Path, command: str):
+        self.path = path
+        self.lock = threading.Lock()
+        self.local = threading.local()
+        self.next_id = 0
+        self.origin = time.perf_counter()
+        self.file = open(path, 'w', buffering=1)
+        self.write({
+            'trace': command,
+            'argv': sys.argv,
+            'pid': os.getpid(),
+            'started': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+        })
+
+    def write(self, record: Dict[str, Any]):
+        line = json.dumps(record, default=str)
+        with self.lock:
+            if not self.file.closed:
+                self.file.write(line + '\n')
+
+    def new_id(self) -> int:
+        with self.lock:
+            self.next_id += 1
+            return self.next_id
+
+    def stack(self) -> List['Span']:
+        if not hasattr(self.local, 'stack'):
+            self.local.stack = []
+        return self.local.stack
+
+    def close(self):
+        with self.lock:
+            self.file.close()
+
+
+class Span:
+    """One timed region; nest them with `with`.
+
+    cpu_clock is time.thread_time for every span but the root, which measures
+    all threads with time.process_time.
+    """
+
+    def __init__(self, tracer: Tracer, name: str, attrs: Dict[str, Any], cpu_clock=time.thread_time):
+        self.tracer = tracer
+        self.name = name
+        self.attrs = attrs
+        self.cpu_clock = cpu_clock
+
+    def set(self, **attrs):
+        """Attach attributes known only inside the span (row counts, sizes, ...)."""
+        self.attrs.update(attrs)
+
+    def __enter__(self):
+        stack = self.tracer.stack()
+        self.id = self.tracer.new_id()
+        self.parent = stack[-1].id if stack else None
+        stack.append(self)
+        self.rss = max_rss_kb()
+        self.cpu = self.cpu_clock()
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        wall = time.perf_counter() - self.start
+        cpu = self.cpu_clock() - self.cpu
+        rss = max_rss_kb()
+        stack = self.tracer.stack()
+        if stack and stack[-1] is self:
+            stack.pop()
+        if exc_type is not None:
+            self.attrs['error'] = exc_type.__name__
+        record = {
+            'span': self.id,
+            'parent': self.parent,
+            'name': self.name,
+            'start_ms': round((self.start - self.tracer.origin) * 1000, 3),
+            'wall_ms': round(wall * 1000, 3),
+            'cpu_ms': round(cpu * 1000, 3),
+            'max_rss_kb': rss,
+            'rss_growth_kb': rss - self.rss if rss is not None else None,
+            'thread': threading.current_thread().name,
+        }
+        if self.attrs:
+            record['attrs'] = self.attrs
+        self.tracer.write(record)
+        return False
+
+
+_tracer: Optional[Tracer] = None
+
+
+def span(name: str, **attrs):
+    """Context manager timing a region; a no-op unless enable() was called."""
+    if _tracer is None:
+        return NULL_SPAN
+    return Span(_tracer, name, attrs)
+
+
+def enabled() -> bool:
+    return _tracer is not None
+
+
+def enable(path: Path, command: Optional[str] = None):
+    """Start writing spans to path; the run itself becomes the root span."""
+    global _tracer
+    if _tracer is not None:
+        return
+    command = command or Path(sys.argv[0]).stem
+    _tracer = Tracer(Path(path), command)
+    root = Span(_tracer, command, {}, cpu_clock=time.process_time).__enter__()
+
+    def finish():
+        global _tracer
+        root.__exit__(None, None, None)
+        _tracer.close()
+        print(f'Trace written to {_tracer.path}', file=sys.stderr)
+        _tracer = None
+
+    atexit.register(finish)
+
+
+def add_profile_argument(parser: argparse.ArgumentParser):
+    """--profile [PATH]; PATH defaults to <command>.trace.jsonl in the working directory."""
+    default = f'{Path(sys.argv[0]).stem}.trace.jsonl'
+    parser.add_argument('--profile', nargs='?', const=default, metavar='PATH',
+                        help=f'Write timing spans as JSONL (default path: {default}); '
+                             'see tracing.py to summarize or convert to a flamegraph')
+
+
+def start_profile(args: argparse.Namespace):
+    """Enable tracing if --profile was given."""
+    if getattr(args, 'profile', None):
+        enable(Path(args.profile))
+
+
+def load_spans(path: Path) -> List[Dict[str, Any]]:
+    """Span records of a trace file; a torn last line (killed run) is skipped."""
+    spans = []
+    with open(path) as f:
+        for line in f:
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError:
+                continue
+            if 'span' in record:
+                spans.append(record)
+    return spans
+
+
+def self_times(spans: List[Dict[str, Any]]) -> Dict[int, float]:
+    """Wall time of each span not covered by its children, in ms."""
+    own = {s['span']: s['wall_ms'] for s in spans}
+    for s in spans:
+        if s['parent'] in own:
+            own[s['parent']] -= s['wall_ms']
+    return {k: max(v, 0.0) for k, v in own.items()}
+
+
+def to_folded(spans: List[Dict[str, Any]]) -> List[str]:
+    """Folded stacks ("root;child;leaf <microseconds>") of self time, for flamegraph.pl or speedscope.
+
+    Spans whose parent never finished (interrupted run) start their own stack.
+    """
+    by_id = {s['span']: s for s in spans}
+    own = self_times(spans)
+    totals: Dict[str, int] = {}
+    for s in spans:
+        names, node = [], s
+        while node is not None:
+            names.append(node['name'].replace(';', ':').replace(' ', '_'))
+            node = by_id.get(node['parent'])
+        stack = ';'.join(reversed(names))
+        totals[stack] = totals.get(stack, 0) + round(own[s['span']] * 1000)
+    return [f'{stack} {us}' for stack, us in sorted(totals.items()) if us > 0]
+
+
+def summarize(spans: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Per span name: count, total and self wall time, CPU time, and time spent waiting."""
+    own = self_times(spans)
+    rows: Dict[str, Dict[str, Any]] = {}
+    for s in spans:
+        row = rows.setdefault(s['name'], {'name': s['name'], 'count': 0, 'wall_ms': 0.0,
+                                          'self_ms': 0.0, 'cpu_ms': 0.0, 'max_rss_kb': None})
+        row['count'] += 1
+        row['wall_ms'] += s['wall_ms']
+        row['self_ms'] += own[s['span']]
+        row['cpu_ms'] += s['cpu_ms']
+        if s.get('max_rss_kb') is not None:
+            row['max_rss_kb'] = max(row['max_rss_kb'] or 0, s['max_rss_kb'])
+    for row in rows.values():
+        row['wait_ms'] = max(row['wall_ms'] - row['cpu_ms'], 0.0)
+    return sorted(rows.values(), key=lambda r: r['self_ms'], reverse=True)
+
+
+def render_summary(rows: List[Dict[str, Any]]) -> str:
+    lines = [
+        '| Span | Count | Wall s | Self s | CPU s | Waiting s | Peak RSS MiB |',
+        '|---' * 7 + '|',
+    ]
+    for r in rows:
+        rss = f"{r['max_rss_kb'] / 1024:.0f}" if r['max_rss_kb'] is not None else 'N/A'
+        lines.append(
+            f"| {r['name']} | {r['count']} | {r['wall_ms'] / 1000:.3f} | {r['self_ms'] / 1000:.3f} | "
+            f"{r['cpu_ms'] / 1000:.3f} | {r['wait_ms'] / 1000:.3f} | {rss} |"
+        )
+    return '\n'.join(lines)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Summarize or convert a --profile trace')
+    parser.add_argument('format', choices=['summary', 'folded'],
+                        help='summary: time per span name; folded: flamegraph.pl / speedscope input')
+    parser.add_argument('trace', type=Path, help='JSONL trace written with --profile')
+    parser.add_argument('--output', '-o', type=Path, help='Output file (default: stdout)')
+    args = parser.parse_args()
+
+    try:
+        spans = load_spans(args.trace)
+    except OSError as e:
+        print(f'❌ {e}', file=sys.stderr)
+        sys.exit(1)
+    if not spans:
+        print(f'⚠️  No spans in {args.trace}', file=sys.stderr)
+        sys.exit(1)
+
+    if args.format == 'folded':
+        text = '\n'.join(to_folded(spans)) + '\n'
+    else:
+        text = render_summary(summarize(spans)) + '\n'
+    if args.output:
+        args.output.write_text(text)
+    else:
+        sys.stdout.write(text)
+
+
+if __name__ == '__main__':
+    main()
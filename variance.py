@@ -0,0 +1,349 @@
+#!/usr/bin/env python3
+"""
+Run-to-run variance checks with targeted reruns.
+
+A round runs every query --tries times (3 by default). Totals and comparisons
+use the best run, so a noisy-neighbour spike or an unnoticed result-cache hit
+skews them silently. `check` flags the queries whose runs do not agree:
+
+  - spread:  slowest / fastest warm run above --max-spread, and at least
+             --min-delta-sec apart. The first run is cold by design, so it is
+             left out unless --include-cold is given;
+  - history: the median run is off the median of earlier rounds of the same
+             configuration (--history) by more than --max-history-ratio
+             either way;
+  - cache:   a run under --cache-floor-sec while another run of the query is
+             --cache-ratio times slower, or a run flagged from_result_cache
+             (Databricks summarize_results.py);
+  - failed:  some, but not all, runs of the query failed.
+
+`rerun` runs just the flagged queries again through run_benchmark.py --only
+and merges the fresh runs into the result file. `merge` does the same for a
+rerun made separately. Merging replaces every per-run array of a rerun query
+and records the replaced runs under "reruns". It keeps "result" on the file's
+timing basis (metrics.py): a server-time file takes the rerun's server_sec.
+Costs of an enriched file are not recomputed; run the vendor's enrich.sh again.
+
+Usage:
+    python variance.py check snowflake/clickbench/results_1b/xs.json \\
+        --history 'snowflake/clickbench/results_1b/archive/xs*.json'
+    python variance.py check results_10B/bench2cost_l_so_3n.json --plan rerun_plan.json
+    python variance.py rerun snowflake/clickbench/results_1b/xs.json -- \\
+        snowflake --queries snowflake/clickbench/queries.sql --database HITS --warehouse TEST
+    python variance.py merge results_1B/xs.json results_1B/xs.rerun.json
+"""
+
+import argparse
+import glob
+import json
+import shlex
+import statistics
+import sys
+from datetime import date
+from pathlib import Path
+from typing import Dict, List, Any, Optional
+
+from drivers import DRIVERS
+from metrics import has_values, result_basis, run_times
+
+# Per-run arrays nested one level down; merged like top-level ones
+NESTED_BLOCKS = ['timing', 'metrics']
+
+
+def warm_runs(runs: List[Optional[float]], include_cold: bool) -> List[float]:
+    """Successful runs, without the cold first run when there are warm ones."""
+    if not include_cold and len(runs) > 1:
+        runs = runs[1:]
+    return [t for t in runs if t is not None]
+
+
+def history_medians(paths: List[str], include_cold: bool = False) -> List[Optional[float]]:
+    """Per query, the median warm run over earlier result files of the same configuration."""
+    pooled: List[List[float]] = []
+    for path in paths:
+        result = json.loads(Path(path).read_text()).get('result', [])
+        for q, runs in enumerate(result):
+            if q >= len(pooled):
+                pooled.append([])
+            pooled[q].extend(warm_runs(runs or [], include_cold))
+    return [statistics.median(times) if times else None for times in pooled]
+
+
+def check_query(runs: List[Optional[float]], cached: List[Any], history: Optional[float],
+                thresholds: Dict[str, float], include_cold: bool = False) -> List[Dict[str, Any]]:
+    """Reasons to distrust one query's runs (empty if they agree)."""
+    reasons = []
+    valid = [(t, r) for r, t in enumerate(runs) if t is not None]
+    if not valid:
+        return reasons
+    if len(valid) < len(runs):
+        reasons.append({'reason': 'failed', 'runs': [r for r, t in enumerate(runs) if t is None]})
+
+    hits = [r for r, flag in enumerate(cached) if flag]
+    slowest = max(t for t, _ in valid)
+    for t, r in valid:
+        if t < thresholds['cache_floor_sec'] and slowest >= thresholds['cache_ratio'] * max(t, 1e-6):
+            hits.append(r)
+    if hits:
+        timed = [runs[r] for r in hits if r < len(runs) and runs[r] is not None]
+        reasons.append({'reason': 'cache', 'runs': sorted(set(hits)),
+                        'detail': f'{min(timed):.4f}s vs {slowest:.3f}s' if timed else 'from_result_cache'})
+
+    # Cache hits would dominate the spread; judge the other runs
+    warm = warm_runs([None if r in hits else t for r, t in enumerate(runs)], include_cold)
+    if len(warm) >= 2:
+        fastest, slowest_warm = min(warm), max(warm)
+        spread = slowest_warm / fastest if fastest > 0 else float('inf')
+        if spread > thresholds['max_spread'] and slowest_warm - fastest >= thresholds['min_delta_sec']:
+            reasons.append({'reason': 'spread', 'ratio': round(spread, 2),
+                            'detail': f'{fastest:.3f}s .. {slowest_warm:.3f}s'})
+
+    if history and warm:
+        ratio = statistics.median(warm) / history
+        if max(ratio, 1 / ratio if ratio else float('inf')) > thresholds['max_history_ratio']:
+            reasons.append({'reason': 'history', 'ratio': round(ratio, 2),
+                            'detail': f'median {statistics.median(warm):.3f}s vs {history:.3f}s before'})
+    return reasons
+
+
+def analyze(result_data: Dict[str, Any], thresholds: Dict[str, float],
+            history: Optional[List[Optional[float]]] = None, include_cold: bool = False) -> Dict[str, Any]:
+    """Flagged queries of one result file: {query index: reasons}."""
+    result = result_data.get('result', [])
+    cached = result_data.get('from_result_cache') or []
+    flagged = {}
+    for q, runs in enumerate(result):
+        reasons = check_query(
+            runs or [],
+            cached[q] if q < len(cached) and cached[q] else [],
+            history[q] if history and q < len(history) else None,
+            thresholds, include_cold,
+        )
+        if reasons:
+            flagged[q] = reasons
+    return {'queries': len(result), 'flagged': flagged}
+
+
+def vendor_of(result_data: Dict[str, Any]) -> Optional[str]:
+    """run_benchmark.py vendor whose driver wrote this system's results."""
+    system = (result_data.get('system') or '').split()
+    return next((vendor for vendor, driver in DRIVERS.items()
+                 if system and driver.system.split()[0] == system[0]), None)
+
+
+def rerun_plan(path: Path, result_data: Dict[str, Any], report: Dict[str, Any]) -> Dict[str, Any]:
+    """Which queries to run again, and the run_benchmark.py command that does it."""
+    queries = sorted(report['flagged'])
+    tries = max((len(runs) for runs in result_data.get('result', []) if runs), default=3)
+    vendor = vendor_of(result_data) or '<vendor>'
+    rerun_path = path.with_suffix('.rerun.json')
+    command = (f"python run_benchmark.py {vendor} --only {','.join(map(str, queries))} --tries {tries} "
+               f"--output {shlex.quote(str(rerun_path))} --queries <queries.sql> ...")
+    return {
+        'result': str(path),
+        'vendor': vendor,
+        'queries': queries,
+        'tries': tries,
+        'reasons': {str(q): [r['reason'] for r in report['flagged'][q]] for q in queries},
+        'command': command,
+        'merge': f'python variance.py merge {shlex.quote(str(path))} {shlex.quote(str(rerun_path))}',
+    }
+
+
+def per_run_keys(doc: Dict[str, Any], count: int) -> List[str]:
+    """Keys of doc holding a [query][run] array over `count` queries."""
+    return [
+        key for key, value in doc.items()
+        if isinstance(value, list) and len(value) == count
+        and all(v is None or isinstance(v, list) for v in value)
+    ]
+
+
+def merge_runs(base: Dict[str, Any], rerun: Dict[str, Any], allow_mixed: bool = False) -> Dict[str, Any]:
+    """base with the runs of every query in rerun["query_indices"] replaced."""
+    indices = rerun.get('query_indices')
+    if indices is None:
+        raise ValueError('rerun file has no "query_indices" (was it written with run_benchmark.py --only?)')
+    count = len(base.get('result', []))
+    if any(not 0 <= q < count for q in indices):
+        raise ValueError(f'rerun queries {indices} outside the {count} queries of the result file')
+
+    rerun = dict(rerun)
+    base_basis, rerun_basis = result_basis(base), result_basis(rerun)
+    if base_basis and rerun_basis and base_basis != rerun_basis:
+        # Keep "result" on one basis: take the rerun's own measurement of the base's basis
+        times = run_times(rerun, base_basis)
+        if times is not None and all(
+            t is not None for new, runs in zip(times, rerun['result']) for t, c in zip(new, runs) if c is not None
+        ):
+            rerun['result'] = times
+            rerun['timing'] = dict(rerun['timing'], result_basis=base_basis)
+        elif not allow_mixed:
+            raise ValueError(f'result holds {base_basis} time but the rerun has only {rerun_basis} time; '
+                             'pass --allow-mixed to merge anyway')
+
+    merged = dict(base)
+    tries = max((len(runs) for runs in rerun['result'] if runs), default=0)
+    replaced = {q: base['result'][q] for q in indices}
+
+    def merge_block(target: Dict[str, Any], source: Dict[str, Any], own_keys: List[str]):
+        source_keys = per_run_keys(source, len(indices))
+        for key in set(own_keys) | set(source_keys):
+            values = list(target[key]) if key in own_keys else [[None] * len(runs or []) for runs in base['result']]
+            for i, q in enumerate(indices):
+                # Runs of a key the rerun lacks (e.g. collector metrics) are unknown now
+                values[q] = source[key][i] if key in source_keys else [None] * tries
+            target[key] = values
+
+    merge_block(merged, rerun, per_run_keys(base, count))
+    base_timing = base.get('timing') if isinstance(base.get('timing'), dict) else {}
+    if base_basis and not has_values(base_timing.get(f'{base_basis}_sec')) and isinstance(rerun.get('timing'), dict):
+        # Older file (or only a collector's server_sec): "result" is the only
+        # timing on its basis the other queries have
+        base = dict(base, timing=dict(base_timing, **{f'{base_basis}_sec': [list(runs or []) for runs in base['result']]}))
+    for block in NESTED_BLOCKS:
+        if isinstance(base.get(block), dict) or isinstance(rerun.get(block), dict):
+            nested = dict(base.get(block) or {})
+            source = rerun.get(block) if isinstance(rerun.get(block), dict) else {}
+            merge_block(nested, source, per_run_keys(nested, count))
+            for key, value in source.items():
+                nested.setdefault(key, value)
+            merged[block] = nested
+    if isinstance(merged.get('timing'), dict) and base_basis:
+        merged['timing']['result_basis'] = base_basis
+
+    merged['reruns'] = list(base.get('reruns') or []) + [{
+        'date': rerun.get('date') or str(date.today()),
+        'queries': indices,
+        'replaced': [replaced[q] for q in indices],
+    }]
+    return merged
+
+
+def render_report(path: str, report: Dict[str, Any]) -> str:
+    flagged = report['flagged']
+    lines = [f"{path}: {len(flagged)} of {report['queries']} queries flagged"]
+    for q, reasons in sorted(flagged.items()):
+        described = '; '.join(
+            r['reason'] + (f" {r['detail']}" if r.get('detail') else '') +
+            (f" (runs {', '.join(map(str, r['runs']))})" if r.get('runs') else '')
+            for r in reasons
+        )
+        lines.append(f'  Q{q}: {described}')
+    return '\n'.join(lines)
+
+
+def write_result(path: Path, doc: Dict[str, Any]):
+    path.write_text(json.dumps(doc, indent=2) + '\n')
+
+
+def add_threshold_arguments(parser: argparse.ArgumentParser):
+    parser.add_argument('--max-spread', type=float, default=1.5,
+                        help='Flag when slowest / fastest warm run exceeds this (default: 1.5)')
+    parser.add_argument('--min-delta-sec', type=float, default=0.1,
+                        help='Ignore spreads smaller than this many seconds (default: 0.1)')
+    parser.add_argument('--max-history-ratio', type=float, default=2.0,
+                        help='Flag when the median is this many times off the history median (default: 2)')
+    parser.add_argument('--cache-floor-sec', type=float, default=0.001,
+                        help='Runs faster than this are suspected result-cache hits (default: 0.001)')
+    parser.add_argument('--cache-ratio', type=float, default=20.0,
+                        help='...when another run of the query is this many times slower (default: 20)')
+    parser.add_argument('--include-cold', action='store_true', help='Include the first (cold) run in the spread')
+    parser.add_argument('--history', action='append', default=[],
+                        help='Earlier result files of the same configuration (glob; repeatable)')
+
+
+def run_check(args) -> Dict[str, Any]:
+    thresholds = {
+        'max_spread': args.max_spread,
+        'min_delta_sec': args.min_delta_sec,
+        'max_history_ratio': args.max_history_ratio,
+        'cache_floor_sec': args.cache_floor_sec,
+        'cache_ratio': args.cache_ratio,
+    }
+    history_paths = sorted({p for pattern in args.history for p in glob.glob(pattern)} - {str(args.result)})
+    if args.history and not history_paths:
+        print(f"⚠️  --history matched no files: {', '.join(args.history)}", file=sys.stderr)
+    history = history_medians(history_paths, args.include_cold) if history_paths else None
+    return analyze(args.result_data, thresholds, history, args.include_cold)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Flag noisy benchmark runs and rerun just those queries')
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    check = subparsers.add_parser('check', help='Report queries whose runs disagree')
+    check.add_argument('result', type=Path, help='Result JSON')
+    add_threshold_arguments(check)
+    check.add_argument('--plan', type=Path, help='Write the rerun plan as JSON')
+    check.add_argument('--json', action='store_true', help='Emit the report as JSON')
+
+    rerun = subparsers.add_parser('rerun', help='Rerun the flagged queries with run_benchmark.py and merge them')
+    rerun.add_argument('result', type=Path, help='Result JSON')
+    add_threshold_arguments(rerun)
+    rerun.add_argument('--output', '-o', type=Path, help='Merged result (default: overwrite the result file)')
+    rerun.add_argument('--allow-mixed', action='store_true',
+                       help='Merge even if the rerun lacks the timing basis of the result file')
+    rerun.add_argument('runner_args', nargs=argparse.REMAINDER,
+                       help='After --: run_benchmark.py vendor and connection arguments')
+
+    merge = subparsers.add_parser('merge', help='Merge a run_benchmark.py --only rerun into a result file')
+    merge.add_argument('result', type=Path, help='Result JSON')
+    merge.add_argument('rerun', type=Path, help='Rerun JSON with "query_indices"')
+    merge.add_argument('--output', '-o', type=Path, help='Merged result (default: overwrite the result file)')
+    merge.add_argument('--allow-mixed', action='store_true',
+                       help='Merge even if the rerun lacks the timing basis of the result file')
+
+    args = parser.parse_args()
+    try:
+        args.result_data = json.loads(args.result.read_text())
+    except (OSError, ValueError) as e:
+        print(f'❌ {args.result}: {e}', file=sys.stderr)
+        sys.exit(1)
+
+    if args.command == 'check':
+        report = run_check(args)
+        plan = rerun_plan(args.result, args.result_data, report) if report['flagged'] else None
+        if args.json:
+            print(json.dumps(dict(report, plan=plan), indent=2))
+        else:
+            print(render_report(str(args.result), report))
+            if plan:
+                print(f"\nRerun plan:\n  {plan['command']}\n  {plan['merge']}")
+        if args.plan and plan:
+            args.plan.write_text(json.dumps(plan, indent=2) + '\n')
+        return
+
+    if args.command == 'rerun':
+        report = run_check(args)
+        print(render_report(str(args.result), report), file=sys.stderr)
+        if not report['flagged']:
+            return
+        runner_args = [a for a in args.runner_args if a != '--']
+        if not runner_args:
+            rerun.error('pass the run_benchmark.py vendor and its arguments after --')
+        plan = rerun_plan(args.result, args.result_data, report)
+        rerun_path = args.result.with_suffix('.rerun.json')
+        if '--tries' not in runner_args:
+            runner_args += ['--tries', str(plan['tries'])]
+        runner_args += ['--only', ','.join(map(str, plan['queries'])), '--output', str(rerun_path)]
+        import run_benchmark
+        run_benchmark.main(runner_args)
+        rerun_file = rerun_path
+    else:
+        rerun_file = args.rerun
+
+    try:
+        merged = merge_runs(args.result_data, json.loads(rerun_file.read_text()), args.allow_mixed)
+    except (OSError, ValueError) as e:
+        print(f'❌ {e}', file=sys.stderr)
+        sys.exit(1)
+    output = args.output or args.result
+    write_result(output, merged)
+    print(f"Merged {len(merged['reruns'][-1]['queries'])} rerun queries into {output}", file=sys.stderr)
+    if merged.get('costs'):
+        print('⚠️  costs still reflect the replaced runs; run the enrich script again', file=sys.stderr)
+
+
+if __name__ == '__main__':
+    main()